@@ -14,21 +14,62 @@ export const taskService = {
   // Obtener todas las tareas
   getAllTasks: () => api.get('/tasks/'),
 
+  // Obtener tareas que se solapan con una ventana de fechas (YYYY-MM-DD)
+  getTasksInRange: (from, to) => api.get('/tasks/', { params: { from, to } }),
+
   // Obtener tarea por ID
   getTaskById: (id) => api.get(`/tasks/${id}`),
 
   // Crear tarea
   createTask: (taskData) => api.post('/tasks/', taskData),
 
+  // Crear tarea en segundo plano (202 con el trabajo; consultar con getJob)
+  createTaskAsync: (taskData) => api.post('/tasks/', taskData, { headers: { Prefer: 'respond-async' } }),
+
+  // Estado y progreso de un trabajo en segundo plano
+  getJob: (jobId) => api.get(`/jobs/${jobId}`),
+
+  // Marcar como completadas (o pendientes) varias tareas: { ids } o { fecha, prioridad, tipo, group_id }
+  setTasksCompletion: (selection, completada = true) => api.patch('/tasks/completion', { ...selection, completada }),
+
+  // Aplicar varias operaciones create/update/delete/toggle en una transacción
+  batchTasks: (operations) => api.post('/tasks/batch', { operations }),
+
+  // Vista previa de las fechas de una recurrencia (no crea tareas)
+  previewRecurrence: (data) => api.post('/tasks/recurrence/preview', data),
+
   // Actualizar tarea
   updateTask: (id, taskData) => api.put(`/tasks/${id}`, taskData),
 
   // Eliminar tarea
   deleteTask: (id) => api.delete(`/tasks/${id}`),
 
+  // Actualizar todas las tareas de un grupo periódico
+  updateTaskGroup: (groupId, taskData) => api.patch(`/tasks/group/${groupId}`, taskData),
+
+  // Actualizar una ocurrencia y las siguientes (split: true crea un nuevo grupo)
+  updateFollowingTasks: (id, taskData) => api.patch(`/tasks/${id}/following`, taskData),
+
+  // Eliminar todas las tareas de un grupo periódico
+  deleteTaskGroup: (groupId) => api.delete(`/tasks/group/${groupId}`),
+
   // Toggle completada
   toggleTask: (id) => api.patch(`/tasks/${id}/toggle`),
 
+  // Toggle sin representación en la respuesta: solo { id, version }
+  toggleTaskMinimal: (id) => api.patch(`/tasks/${id}/toggle`, null, { headers: { Prefer: 'return=minimal' } }),
+
+  // Añadir, editar y eliminar subtareas sueltas
+  createSubtask: (taskId, subtaskData) => api.post(`/tasks/${taskId}/subtasks`, subtaskData),
+  updateSubtask: (taskId, subtaskId, subtaskData) => api.patch(`/tasks/${taskId}/subtasks/${subtaskId}`, subtaskData),
+  deleteSubtask: (taskId, subtaskId) => api.delete(`/tasks/${taskId}/subtasks/${subtaskId}`),
+
+  // Marcar todas las subtareas de una tarea como completadas (o pendientes)
+  setSubtasksCompletion: (taskId, completada = true) => api.patch(`/tasks/${taskId}/subtasks/completion`, { completada }),
+
+  // Reordenar las subtareas (lista completa de ids en el nuevo orden)
+  reorderSubtasks: (taskId, ids) => api.put(`/tasks/${taskId}/subtasks/order`, { ids }),
+
   // Tareas pendientes
   getPendingTasks: () => api.get('/tasks/pending'),
 
@@ -36,4 +77,27 @@ export const taskService = {
   getTasksByDate: (date) => api.get(`/tasks/date/${date}`),
 };
 
+// Series periódicas virtuales: sus ocurrencias no aparecen en los listados de
+// taskService y hay que pedirlas aparte con getOccurrences
+export const seriesService = {
+  // Crear serie (la regla se guarda una vez; no crea tareas)
+  createSeries: (seriesData) => api.post('/series/', seriesData),
+
+  // Obtener la regla y la plantilla de una serie
+  getSeries: (id) => api.get(`/series/${id}`),
+
+  // Eliminar una serie
+  deleteSeries: (id) => api.delete(`/series/${id}`),
+
+  // Ocurrencias de todas las series virtuales en una ventana (máximo 366 días)
+  getOccurrences: (from, to) => api.get('/series/occurrences', { params: { from, to } }),
+
+  // Toggle completada de una ocurrencia
+  toggleOccurrence: (id, fecha) => api.patch(`/series/${id}/occurrences/${fecha}/toggle`),
+
+  // Cancelar y restaurar una ocurrencia
+  cancelOccurrence: (id, fecha) => api.delete(`/series/${id}/occurrences/${fecha}`),
+  restoreOccurrence: (id, fecha) => api.post(`/series/${id}/occurrences/${fecha}/restore`),
+};
+
 export default api;
\ No newline at end of file
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los índices de tasks/subtasks.
+
+Genera una base de datos SQLite temporal con N tareas (por defecto 100k) y
+3 subtareas por tarea, y mide las consultas más habituales de la API
+antes y después de crear los índices, mostrando el plan de ejecución.
+
+Uso:
+    python benchmarks/bench_indexes.py [--rows 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from sqlalchemy import text
+
+from app import create_app
+from database.db import db
+from models.task import Task
+from models.subtask import Subtask
+
+
+QUERIES = {
+    'duración máxima': (
+        "SELECT MAX(julianday(fecha_fin) - julianday(fecha_inicio)) FROM tasks",
+        {},
+    ),
+    # fecha_inicio >= from - duración máxima acota el rango del índice por
+    # abajo: el coste no depende del historial anterior a la ventana
+    'ventana (1 mes)': (
+        "SELECT id FROM tasks WHERE fecha_inicio <= :to AND fecha_fin >= :from "
+        "AND fecha_inicio >= :lower ORDER BY fecha_inicio DESC",
+        None,  # se rellena con la duración máxima real
+    ),
+    'group_id': (
+        "SELECT id FROM tasks WHERE group_id = :group_id ORDER BY fecha_inicio",
+        None,  # se rellena con un group_id real
+    ),
+    'pendientes': (
+        "SELECT id FROM tasks WHERE completada = 0 ORDER BY fecha_inicio LIMIT 50",
+        {},
+    ),
+    'subtareas de una tarea': (
+        "SELECT id FROM subtasks WHERE task_id = :task_id",
+        None,  # se rellena con un task_id real
+    ),
+}
+
+
+def populate(rows):
+    """Insertar tareas (en series de 30) y subtareas con executemany"""
+    start = date(2020, 1, 1)
+    tasks = []
+    group_id = None
+    for i in range(rows):
+        if i % 30 == 0:
+            group_id = str(uuid.uuid4())
+        day = start + timedelta(days=random.randint(0, 365 * 8))
+        tasks.append({
+            'titulo': f'Tarea {i}',
+            'fecha_inicio': day,
+            'fecha_fin': day + timedelta(days=random.choice([0, 0, 0, 1, 6])),
+            'completada': random.random() < 0.8,
+            'group_id': group_id,
+        })
+    db.session.execute(Task.__table__.insert(), tasks)
+    db.session.execute(
+        Subtask.__table__.insert(),
+        [{'task_id': task_id, 'titulo': f'Subtarea {j}'}
+         for task_id in range(1, rows + 1) for j in range(3)]
+    )
+    db.session.commit()
+    return group_id
+
+
+def run_queries(label, params_by_query, repeat):
+    print(f"\n=== {label} ===")
+    with db.engine.connect() as conn:
+        for name, (sql, _) in QUERIES.items():
+            params = params_by_query[name]
+            plan = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+            started = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(text(sql), params).fetchall()
+            elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+            print(f"{name:<24} {elapsed_ms:9.3f} ms")
+            for row in plan:
+                print(f"    {row[-1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        })
+        with app.app_context():
+            db.create_all()
+            indexes = list(Task.__table__.indexes) + list(Subtask.__table__.indexes)
+            for index in indexes:
+                index.drop(bind=db.engine)
+
+            print(f"Insertando {args.rows} tareas...")
+            group_id = populate(args.rows)
+
+            params_by_query = {name: params for name, (_, params) in QUERIES.items()}
+            params_by_query['group_id'] = {'group_id': group_id}
+            params_by_query['subtareas de una tarea'] = {'task_id': args.rows // 2}
+            with db.engine.connect() as conn:
+                max_span = conn.execute(text(QUERIES['duración máxima'][0])).scalar()
+            window_from = date(2027, 3, 1)
+            params_by_query['ventana (1 mes)'] = {
+                'from': window_from.isoformat(), 'to': '2027-03-31',
+                'lower': (window_from - timedelta(days=max_span)).isoformat()
+            }
+
+            run_queries('Sin índices', params_by_query, args.repeat)
+
+            for index in indexes:
+                index.create(bind=db.engine)
+            with db.engine.connect() as conn:
+                conn.execute(text('ANALYZE'))
+
+            run_queries('Con índices', params_by_query, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
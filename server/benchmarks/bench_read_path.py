@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark del listado de tareas: ORM + to_dict() frente a task_reader (Core).
+
+Para cada tamaño genera una base de datos SQLite temporal con N tareas y
+2 subtareas por tarea, serializa el listado completo con ambos caminos y
+comprueba que el JSON resultante es idéntico byte a byte.
+
+Uso:
+    python benchmarks/bench_read_path.py [--sizes 10000 100000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from sqlalchemy.orm import selectinload
+
+from app import create_app
+from database.db import db
+from models.task import Task
+from models.subtask import Subtask
+from services import task_reader
+
+
+def populate(rows):
+    start = date(2024, 1, 1)
+    db.session.execute(Task.__table__.insert(), [
+        {
+            'titulo': f'Tarea {i}',
+            'descripcion': 'Descripción de la tarea' if i % 3 else None,
+            'fecha_inicio': start + timedelta(days=i % 730),
+            'fecha_fin': start + timedelta(days=i % 730),
+            'completada': i % 2 == 0,
+        }
+        for i in range(rows)
+    ])
+    db.session.execute(Subtask.__table__.insert(), [
+        {'task_id': task_id, 'titulo': f'Subtarea {j}'}
+        for task_id in range(1, rows + 1) for j in range(2)
+    ])
+    db.session.commit()
+
+
+def orm_path(app):
+    tasks = (
+        Task.query.options(selectinload(Task.subtasks))
+        .order_by(Task.fecha_inicio.desc(), Task.id.desc())
+        .all()
+    )
+    body = app.json.dumps([task.to_dict() for task in tasks])
+    db.session.expunge_all()
+    return body
+
+
+def core_path(app):
+    stmt = task_reader.select_tasks().order_by(Task.fecha_inicio.desc(), Task.id.desc())
+    _, items = task_reader.read_tasks(stmt, subtask_ids=stmt.with_only_columns(Task.id).order_by(None))
+    return app.json.dumps(items)
+
+
+def measure(label, func, app, repeat):
+    best = None
+    body = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func(app)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"  {label:<22} {best * 1000:10.1f} ms")
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = create_app({
+                'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+            })
+            with app.app_context():
+                db.create_all()
+                populate(size)
+
+                print(f"\n=== {size} tareas ===")
+                orm_time, orm_body = measure('ORM + to_dict()', orm_path, app, args.repeat)
+                core_time, core_body = measure('task_reader (Core)', core_path, app, args.repeat)
+                print(f"  {'aceleración':<22} {orm_time / core_time:10.2f}x")
+
+                if orm_body != core_body:
+                    print("  ✗ La salida NO es idéntica")
+                    sys.exit(1)
+                print(f"  ✓ Salida idéntica ({len(core_body)} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la expansión de reglas de recurrencia: recurrence_engine
+(ordinales enteros) frente a rrule de dateutil.
+
+Mide dos escenarios y comprueba que ambos caminos devuelven las mismas
+fechas:
+  - horizonte largo: una regla expandida durante --years años
+  - muchas series: --series reglas distintas expandidas en una ventana de un mes
+
+Uso:
+    python benchmarks/bench_recurrence.py [--years 50] [--series 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import time as timer
+from datetime import date, datetime, time, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from services import recurrence_engine
+from services.recurrence import RecurrenceRule, to_rrule
+
+RULES = {
+    'diaria': RecurrenceRule('daily', 1, None, None, date(2026, 1, 1), None, None, 0),
+    'cada 3 días': RecurrenceRule('daily', 3, None, None, date(2026, 1, 1), None, None, 0),
+    'semanal L-X-V': RecurrenceRule('weekly', 1, ('MO', 'WE', 'FR'), None, date(2026, 1, 1), None, None, 0),
+    'mensual día 15': RecurrenceRule('monthly', 1, None, None, date(2026, 1, 15), None, None, 0),
+}
+
+
+def rrule_between(rule, window_from, window_to):
+    return tuple(
+        dt.date() for dt in to_rrule(rule).between(
+            datetime.combine(window_from, time.min), datetime.combine(window_to, time.max), inc=True
+        )
+    )
+
+
+def engine_between(rule, window_from, window_to):
+    return recurrence_engine.dates(rule, window_to.toordinal(), start=window_from)
+
+
+def measure(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = timer.perf_counter()
+        result = func()
+        elapsed = timer.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def report(label, rrule_time, engine_time, rrule_result, engine_result):
+    if rrule_result != engine_result:
+        print(f"  ✗ {label}: las fechas NO coinciden")
+        sys.exit(1)
+    print(f"  {label:<18} rrule {rrule_time * 1000:9.2f} ms   motor {engine_time * 1000:9.2f} ms"
+          f"   {rrule_time / engine_time:7.1f}x")
+
+
+def long_horizon(years, repeat):
+    print(f"\n=== Horizonte largo ({years} años) ===")
+    for label, rule in RULES.items():
+        window_to = rule.dtstart + timedelta(days=365 * years)
+        rrule_time, rrule_result = measure(lambda: rrule_between(rule, rule.dtstart, window_to), repeat)
+        engine_time, engine_result = measure(lambda: engine_between(rule, rule.dtstart, window_to), repeat)
+        report(label, rrule_time, engine_time, rrule_result, engine_result)
+
+
+def many_series(count, repeat):
+    print(f"\n=== {count} series, ventana de un mes ===")
+    random.seed(42)
+    rules = []
+    for _ in range(count):
+        template = random.choice(list(RULES.values()))
+        rules.append(template._replace(
+            dtstart=date(2020, 1, 1) + timedelta(days=random.randint(0, 2000)),
+            interval=random.randint(1, 3)
+        ))
+    window_from, window_to = date(2027, 3, 1), date(2027, 3, 31)
+
+    rrule_time, rrule_result = measure(
+        lambda: [rrule_between(rule, window_from, window_to) for rule in rules], repeat)
+    engine_time, engine_result = measure(
+        lambda: [engine_between(rule, window_from, window_to) for rule in rules], repeat)
+    report('todas las series', rrule_time, engine_time, rrule_result, engine_result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, default=50)
+    parser.add_argument('--series', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    long_horizon(args.years, args.repeat)
+    many_series(args.series, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
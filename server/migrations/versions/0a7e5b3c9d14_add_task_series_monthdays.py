@@ -0,0 +1,26 @@
+"""Add monthdays to task_series
+
+Revision ID: 0a7e5b3c9d14
+Revises: f6c3d9e1a2b8
+Create Date: 2026-10-18 16:48:03.552914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a7e5b3c9d14'
+down_revision = 'f6c3d9e1a2b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('task_series', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('monthdays', sa.String(length=90), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('task_series', schema=None) as batch_op:
+        batch_op.drop_column('monthdays')
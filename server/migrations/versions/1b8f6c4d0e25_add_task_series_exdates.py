@@ -0,0 +1,26 @@
+"""Add exdates bitmap to task_series
+
+Revision ID: 1b8f6c4d0e25
+Revises: 0a7e5b3c9d14
+Create Date: 2026-10-18 17:36:19.804127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b8f6c4d0e25'
+down_revision = '0a7e5b3c9d14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('task_series', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('exdates', sa.LargeBinary(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('task_series', schema=None) as batch_op:
+        batch_op.drop_column('exdates')
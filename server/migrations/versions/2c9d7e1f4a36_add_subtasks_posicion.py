@@ -0,0 +1,33 @@
+"""Add posicion to subtasks
+
+Revision ID: 2c9d7e1f4a36
+Revises: 1b8f6c4d0e25
+Create Date: 2026-10-18 19:04:51.392618
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c9d7e1f4a36'
+down_revision = '1b8f6c4d0e25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('subtasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('posicion', sa.Integer(), server_default='0', nullable=False))
+
+    # Las subtareas existentes conservan su orden actual (por id) dentro de cada tarea
+    op.execute(
+        'UPDATE subtasks SET posicion = ('
+        'SELECT COUNT(*) FROM subtasks AS previous '
+        'WHERE previous.task_id = subtasks.task_id AND previous.id < subtasks.id)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('subtasks', schema=None) as batch_op:
+        batch_op.drop_column('posicion')
@@ -0,0 +1,50 @@
+"""Never reuse task and subtask ids (SQLite AUTOINCREMENT)
+
+Revision ID: 3d0a8f2b5c71
+Revises: 2c9d7e1f4a36
+Create Date: 2026-10-18 21:12:37.504183
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d0a8f2b5c71'
+down_revision = '2c9d7e1f4a36'
+branch_labels = None
+depends_on = None
+
+# Tabla y entidad de las lápidas cuyos ids no deben volver a asignarse
+TABLES = (('tasks', 'task'), ('subtasks', 'subtask'))
+
+
+def upgrade():
+    # Solo SQLite reutiliza ids: en otros motores las secuencias ya son monótonas
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for table, _ in TABLES:
+        with op.batch_alter_table(table, schema=None, recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+            pass
+
+    # La secuencia arranca por encima del mayor id existente o ya borrado,
+    # para que ninguna lápida vigente coincida con una fila nueva
+    for table, entity in TABLES:
+        op.execute(f"DELETE FROM sqlite_sequence WHERE name = '{table}'")
+        op.execute(
+            f"INSERT INTO sqlite_sequence (name, seq) SELECT '{table}', MAX("
+            f"(SELECT COALESCE(MAX(id), 0) FROM {table}), "
+            f"(SELECT COALESCE(MAX(entity_id), 0) FROM tombstones WHERE entity = '{entity}'))"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for table, _ in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None, recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+            pass
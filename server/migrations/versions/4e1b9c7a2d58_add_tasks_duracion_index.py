@@ -0,0 +1,29 @@
+"""Add expression index on task duration
+
+Revision ID: 4e1b9c7a2d58
+Revises: 3d0a8f2b5c71
+Create Date: 2026-10-18 21:48:15.027361
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e1b9c7a2d58'
+down_revision = '3d0a8f2b5c71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Misma expresión que models.task.TASK_SPAN en cada motor
+    if op.get_bind().dialect.name == 'sqlite':
+        span = '(julianday(fecha_fin) - julianday(fecha_inicio))'
+    else:
+        span = '(fecha_fin - fecha_inicio)'
+    op.create_index('ix_tasks_duracion', 'tasks', [sa.text(span)], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tasks_duracion', table_name='tasks')
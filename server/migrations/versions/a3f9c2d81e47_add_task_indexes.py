@@ -0,0 +1,38 @@
+"""Add indexes on tasks and subtasks
+
+Revision ID: a3f9c2d81e47
+Revises: bc47800e64b9
+Create Date: 2026-10-18 10:12:31.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f9c2d81e47'
+down_revision = 'bc47800e64b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_fecha_inicio_fecha_fin', ['fecha_inicio', 'fecha_fin'], unique=False)
+        batch_op.create_index('ix_tasks_fecha_fin_fecha_inicio', ['fecha_fin', 'fecha_inicio'], unique=False)
+        batch_op.create_index('ix_tasks_group_id_fecha_inicio', ['group_id', 'fecha_inicio'], unique=False)
+        batch_op.create_index('ix_tasks_completada_fecha_inicio', ['completada', 'fecha_inicio'], unique=False)
+
+    with op.batch_alter_table('subtasks', schema=None) as batch_op:
+        batch_op.create_index('ix_subtasks_task_id', ['task_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('subtasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_subtasks_task_id')
+
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_completada_fecha_inicio')
+        batch_op.drop_index('ix_tasks_group_id_fecha_inicio')
+        batch_op.drop_index('ix_tasks_fecha_fin_fecha_inicio')
+        batch_op.drop_index('ix_tasks_fecha_inicio_fecha_fin')
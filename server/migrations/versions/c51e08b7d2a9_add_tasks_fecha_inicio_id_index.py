@@ -0,0 +1,26 @@
+"""Add (fecha_inicio, id) index for keyset pagination
+
+Revision ID: c51e08b7d2a9
+Revises: a3f9c2d81e47
+Create Date: 2026-10-18 11:40:02.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c51e08b7d2a9'
+down_revision = 'a3f9c2d81e47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_fecha_inicio_id', ['fecha_inicio', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_fecha_inicio_id')
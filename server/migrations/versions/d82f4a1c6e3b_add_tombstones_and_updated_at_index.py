@@ -0,0 +1,42 @@
+"""Add tombstones table and updated_at index for delta sync
+
+Revision ID: d82f4a1c6e3b
+Revises: c51e08b7d2a9
+Create Date: 2026-10-18 12:31:47.905213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd82f4a1c6e3b'
+down_revision = 'c51e08b7d2a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=10), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tombstones', schema=None) as batch_op:
+        batch_op.create_index('ix_tombstones_deleted_at', ['deleted_at'], unique=False)
+
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_updated_at', ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_updated_at')
+
+    with op.batch_alter_table('tombstones', schema=None) as batch_op:
+        batch_op.drop_index('ix_tombstones_deleted_at')
+
+    op.drop_table('tombstones')
@@ -0,0 +1,60 @@
+"""Add task_series and series_occurrences tables for virtual recurring tasks
+
+Revision ID: e4b7a2c9f130
+Revises: d82f4a1c6e3b
+Create Date: 2026-10-18 14:05:12.418730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b7a2c9f130'
+down_revision = 'd82f4a1c6e3b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('task_series',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('titulo', sa.String(length=200), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('hora', sa.Time(), nullable=True),
+    sa.Column('prioridad', sa.String(length=10), nullable=True),
+    sa.Column('tipo', sa.String(length=15), nullable=True),
+    sa.Column('color', sa.String(length=7), nullable=True),
+    sa.Column('subtasks', sa.Text(), nullable=True),
+    sa.Column('frequency', sa.String(length=10), nullable=False),
+    sa.Column('interval', sa.Integer(), nullable=False),
+    sa.Column('weekdays', sa.String(length=20), nullable=True),
+    sa.Column('dtstart', sa.Date(), nullable=False),
+    sa.Column('until', sa.Date(), nullable=True),
+    sa.Column('count', sa.Integer(), nullable=True),
+    sa.Column('duration', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('task_series', schema=None) as batch_op:
+        batch_op.create_index('ix_task_series_dtstart', ['dtstart'], unique=False)
+
+    op.create_table('series_occurrences',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('series_id', sa.Integer(), nullable=False),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('completada', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['series_id'], ['task_series.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('series_id', 'fecha', name='uq_series_occurrences_series_id_fecha')
+    )
+
+
+def downgrade():
+    op.drop_table('series_occurrences')
+
+    with op.batch_alter_table('task_series', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_series_dtstart')
+
+    op.drop_table('task_series')
@@ -0,0 +1,32 @@
+"""Add group_id and materialized_through to task_series
+
+Revision ID: f6c3d9e1a2b8
+Revises: e4b7a2c9f130
+Create Date: 2026-10-18 15:22:40.117305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6c3d9e1a2b8'
+down_revision = 'e4b7a2c9f130'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('task_series', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('group_id', sa.String(length=36), nullable=True))
+        batch_op.add_column(sa.Column('materialized_through', sa.Date(), nullable=True))
+        batch_op.create_unique_constraint('uq_task_series_group_id', ['group_id'])
+        batch_op.create_index('ix_task_series_materialized_through', ['materialized_through'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('task_series', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_series_materialized_through')
+        batch_op.drop_constraint('uq_task_series_group_id', type_='unique')
+        batch_op.drop_column('materialized_through')
+        batch_op.drop_column('group_id')
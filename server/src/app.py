@@ -55,7 +55,8 @@ def create_app(test_config=None):
         r"/api/*": {
             "origins": ["http://localhost:3000"],
             "methods": ["GET", "POST", "PUT", "DELETE", "PATCH"],
-            "allow_headers": ["Content-Type"]
+            "allow_headers": ["Content-Type", "If-None-Match", "Prefer"],
+            "expose_headers": ["ETag", "Location", "Preference-Applied"]
         }
     })
     
@@ -65,7 +66,11 @@ def create_app(test_config=None):
     
     # Registrar blueprints
     from routes.task_routes import task_bp
+    from routes.series_routes import series_bp
+    from routes.job_routes import job_bp
     app.register_blueprint(task_bp, url_prefix='/api/tasks')
+    app.register_blueprint(series_bp, url_prefix='/api/series')
+    app.register_blueprint(job_bp, url_prefix='/api/jobs')
     
     # Ruta de prueba
     @app.route('/')
@@ -78,11 +83,13 @@ def create_app(test_config=None):
         try:
             # Intentar hacer una consulta simple
             from models.task import Task
+            from services.recurrence import cache_info
             count = Task.query.count()
             return {
                 'status': 'ok',
                 'database': 'connected',
-                'tasks_count': count
+                'tasks_count': count,
+                'recurrence_cache': cache_info()
             }, 200
         except Exception as e:
             return {
@@ -95,6 +102,10 @@ def create_app(test_config=None):
 
 if __name__ == '__main__':
     app = create_app()
+    # Con el recargador de Flask, solo en el proceso que atiende peticiones
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from services.materializer import start_materializer
+        start_materializer(app)
     print("\n" + "="*50)
     print("[OK] Servidor iniciado en http://127.0.0.1:5000")
     print("[CORS] CORS habilitado para http://localhost:3000")
@@ -0,0 +1,13 @@
+from flask import jsonify
+from services import jobs
+
+
+class JobController:
+    
+    @staticmethod
+    def get_job(job_id):
+        """Estado y progreso de un trabajo en segundo plano"""
+        job = jobs.get(job_id)
+        if not job:
+            return jsonify({'error': 'Trabajo no encontrado'}), 404
+        return jsonify({'job': job.to_dict()}), 200
@@ -0,0 +1,240 @@
+from flask import request, jsonify
+from models.task_series import TaskSeries
+from models.series_occurrence import SeriesOccurrence
+from models.task import Task
+from models.subtask import Subtask
+from models.tombstone import Tombstone
+from database.db import db
+from sqlalchemy import select, delete, null
+from sqlalchemy.exc import SQLAlchemyError
+from datetime import timedelta
+from services.recurrence import parse_recurrence, occurrences_between
+from services.validation import parse_task_fields, parse_subtasks, parse_date
+from services import materializer
+
+# Tamaño máximo de la ventana que se puede expandir en una petición
+MAX_OCCURRENCE_WINDOW = timedelta(days=366)
+
+
+def _find_occurrence(series_id, fecha):
+    """Buscar la serie y comprobar que fecha es una ocurrencia de su regla.
+
+    Devuelve (series, day, None) o (None, None, respuesta de error).
+    """
+    series = db.session.get(TaskSeries, series_id)
+    if not series:
+        return None, None, (jsonify({'error': 'Serie no encontrada'}), 404)
+    
+    try:
+        day = parse_date(fecha, 'fecha')
+    except ValueError as e:
+        return None, None, (jsonify({'error': str(e)}), 400)
+    
+    if day not in occurrences_between(series.rule, day, day):
+        return None, None, (jsonify({'error': 'La fecha no corresponde a ninguna ocurrencia de la serie'}), 404)
+    return series, day, None
+
+
+class SeriesController:
+    
+    @staticmethod
+    def create_series():
+        """Crear una tarea periódica virtual (la regla se guarda una sola vez)"""
+        try:
+            data = request.get_json()
+            try:
+                fields = parse_task_fields(data)
+                recurrence = data.get('recurrence')
+                if not recurrence or not recurrence.get('enabled'):
+                    raise ValueError('La recurrencia es obligatoria para crear una serie')
+                rule = parse_recurrence(recurrence, fields['fecha_inicio'], fields['fecha_fin'], fields['tipo'])
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            series = TaskSeries(
+                titulo=fields['titulo'],
+                descripcion=fields['descripcion'],
+                hora=fields['hora'],
+                prioridad=fields['prioridad'],
+                tipo=fields['tipo'],
+                color=fields['color']
+            )
+            series.rule = rule
+            series.subtask_templates = parse_subtasks(data)
+            db.session.add(series)
+            db.session.commit()
+            
+            return jsonify({
+                'message': 'Serie creada exitosamente',
+                'series': series.to_dict()
+            }), 201
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'error': 'Error al crear serie', 'details': str(e)}), 500
+    
+    @staticmethod
+    def get_series(series_id):
+        """Obtener la regla y la plantilla de una serie"""
+        try:
+            series = db.session.get(TaskSeries, series_id)
+            if not series:
+                return jsonify({'error': 'Serie no encontrada'}), 404
+            return jsonify({'series': series.to_dict()}), 200
+        except SQLAlchemyError as e:
+            return jsonify({'error': 'Error al obtener serie', 'details': str(e)}), 500
+    
+    @staticmethod
+    def delete_series(series_id):
+        """Eliminar una serie y sus ocurrencias guardadas"""
+        try:
+            series = db.session.get(TaskSeries, series_id)
+            if not series:
+                return jsonify({'error': 'Serie no encontrada'}), 404
+            
+            db.session.delete(series)
+            db.session.commit()
+            
+            return jsonify({'message': 'Serie eliminada exitosamente'}), 200
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'error': 'Error al eliminar serie', 'details': str(e)}), 500
+    
+    @staticmethod
+    def get_occurrences():
+        """Expandir las ocurrencias de todas las series en la ventana ?from=&to="""
+        try:
+            try:
+                window_from = parse_date(request.args.get('from'), 'from')
+                window_to = parse_date(request.args.get('to'), 'to')
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            if window_to < window_from:
+                return jsonify({'error': 'La fecha "to" debe ser posterior o igual a "from"'}), 400
+            if window_to - window_from > MAX_OCCURRENCE_WINDOW:
+                return jsonify({'error': 'La ventana no puede superar los 366 días'}), 400
+            
+            # Las series materializadas ya aparecen como tareas en /api/tasks
+            series_list = TaskSeries.query.filter(
+                TaskSeries.group_id.is_(None),
+                TaskSeries.dtstart <= window_to
+            ).all()
+            
+            # Estados guardados de las ocurrencias de la ventana, en una sola consulta
+            max_duration = max((series.duration for series in series_list), default=0)
+            saved = {}
+            if series_list:
+                rows = SeriesOccurrence.query.filter(
+                    SeriesOccurrence.series_id.in_([series.id for series in series_list]),
+                    SeriesOccurrence.fecha >= window_from - timedelta(days=max_duration),
+                    SeriesOccurrence.fecha <= window_to
+                )
+                saved = {(row.series_id, row.fecha): row for row in rows}
+            
+            occurrences = []
+            for series in series_list:
+                for start in series.active_dates(occurrences_between(series.rule, window_from, window_to)):
+                    state = saved.get((series.id, start))
+                    occurrences.append(series.occurrence_dict(start, state.completada if state else False))
+            occurrences.sort(key=lambda item: (item['fecha_inicio'], item['series_id']))
+            
+            return jsonify({'occurrences': occurrences}), 200
+            
+        except SQLAlchemyError as e:
+            return jsonify({'error': 'Error al obtener ocurrencias', 'details': str(e)}), 500
+    
+    @staticmethod
+    def toggle_occurrence(series_id, fecha):
+        """Alternar el estado completada de una ocurrencia de la serie"""
+        try:
+            series, day, error = _find_occurrence(series_id, fecha)
+            if error:
+                return error
+            if series.group_id:
+                return jsonify({'error': 'La serie está materializada; use /api/tasks/<id>/toggle'}), 400
+            if series.is_excluded(day):
+                return jsonify({'error': 'La ocurrencia está cancelada'}), 404
+            
+            state = SeriesOccurrence.query.filter_by(series_id=series.id, fecha=day).first()
+            if state:
+                # Volver al estado de la plantilla: la fila deja de ser necesaria
+                db.session.delete(state)
+                completada = False
+            else:
+                db.session.add(SeriesOccurrence(series_id=series.id, fecha=day, completada=True))
+                completada = True
+            db.session.commit()
+            
+            return jsonify({
+                'message': 'Estado de ocurrencia actualizado',
+                'occurrence': series.occurrence_dict(day, completada)
+            }), 200
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'error': 'Error al actualizar ocurrencia', 'details': str(e)}), 500
+    
+    @staticmethod
+    def cancel_occurrence(series_id, fecha):
+        """Cancelar una ocurrencia de la serie (EXDATE)"""
+        try:
+            series, day, error = _find_occurrence(series_id, fecha)
+            if error:
+                return error
+            
+            series.set_excluded(day)
+            
+            if series.group_id:
+                # Eliminar la tarea ya materializada de esa fecha
+                occurrence_filter = [Task.group_id == series.group_id, Task.fecha_inicio == day]
+                task_ids = select(Task.id).where(*occurrence_filter)
+                Tombstone.record_from('subtask', Subtask.id, Subtask.task_id, Subtask.task_id.in_(task_ids))
+                Tombstone.record_from('task', Task.id, null(), *occurrence_filter)
+                db.session.execute(
+                    delete(Subtask).where(Subtask.task_id.in_(task_ids)),
+                    execution_options={'synchronize_session': False}
+                )
+                db.session.execute(
+                    delete(Task).where(*occurrence_filter),
+                    execution_options={'synchronize_session': False}
+                )
+            else:
+                SeriesOccurrence.query.filter_by(series_id=series.id, fecha=day).delete()
+            db.session.commit()
+            
+            return jsonify({'message': 'Ocurrencia cancelada exitosamente'}), 200
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'error': 'Error al cancelar ocurrencia', 'details': str(e)}), 500
+    
+    @staticmethod
+    def restore_occurrence(series_id, fecha):
+        """Restaurar una ocurrencia cancelada de la serie"""
+        try:
+            series, day, error = _find_occurrence(series_id, fecha)
+            if error:
+                return error
+            
+            was_excluded = series.is_excluded(day)
+            series.set_excluded(day, False)
+            
+            # Si la fecha ya estaba dentro del horizonte materializado, crear su tarea
+            if series.group_id and was_excluded and \
+                    (series.materialized_through is None or day <= series.materialized_through):
+                materializer.insert_occurrences(
+                    materializer.template_fields(series), [day], series.duration,
+                    series.group_id, series.subtask_templates
+                )
+            db.session.commit()
+            
+            return jsonify({
+                'message': 'Ocurrencia restaurada exitosamente',
+                'occurrence': series.occurrence_dict(day)
+            }), 200
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'error': 'Error al restaurar ocurrencia', 'details': str(e)}), 500
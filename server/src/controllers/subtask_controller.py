@@ -0,0 +1,214 @@
+from flask import request, jsonify
+from models.task import Task, utc_now
+from models.subtask import Subtask
+from models.tombstone import Tombstone
+from database.db import db
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.exc import SQLAlchemyError
+from services.task_reader import SUBTASK_COLUMNS, subtask_to_dict
+
+
+def _touch_task(task_id):
+    """Actualizar updated_at de la tarea para la sincronización por deltas.
+
+    Devuelve False si la tarea no existe (el mismo UPDATE sirve de comprobación).
+    """
+    return db.session.execute(
+        update(Task).where(Task.id == task_id).values(updated_at=utc_now()),
+        execution_options={'synchronize_session': False}
+    ).rowcount > 0
+
+
+def _parse_subtask_values(data, partial):
+    """Validar titulo y completada de una subtarea. Lanza ValueError."""
+    if not isinstance(data, dict) or not data:
+        raise ValueError('No se enviaron datos')
+    
+    values = {}
+    if 'titulo' in data or not partial:
+        titulo = data.get('titulo')
+        if not isinstance(titulo, str) or not titulo.strip():
+            raise ValueError('El título de la subtarea es obligatorio')
+        values['titulo'] = titulo.strip()
+    if 'completada' in data:
+        if not isinstance(data['completada'], bool):
+            raise ValueError('completada debe ser true o false')
+        values['completada'] = data['completada']
+    if not values:
+        raise ValueError('No se enviaron campos de la subtarea para actualizar')
+    return values
+
+
+class SubtaskController:
+    """Operaciones sobre subtareas sueltas: cada una toca solo las filas afectadas"""
+    
+    @staticmethod
+    def create_subtask(task_id):
+        """Añadir una subtarea al final de la lista de la tarea"""
+        try:
+            try:
+                values = _parse_subtask_values(request.get_json(silent=True), partial=False)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            if not _touch_task(task_id):
+                db.session.rollback()
+                return jsonify({'error': 'Tarea no encontrada'}), 404
+            
+            # La posición se calcula en el propio INSERT
+            next_position = (
+                select(func.coalesce(func.max(Subtask.posicion) + 1, 0))
+                .where(Subtask.task_id == task_id)
+                .scalar_subquery()
+            )
+            row = db.session.execute(
+                insert(Subtask)
+                .values(task_id=task_id, posicion=next_position, **values)
+                .returning(*SUBTASK_COLUMNS)
+            ).one()
+            db.session.commit()
+            
+            return jsonify({
+                'message': 'Subtarea creada exitosamente',
+                'subtask': subtask_to_dict(row)
+            }), 201
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'error': 'Error al crear subtarea', 'details': str(e)}), 500
+    
+    @staticmethod
+    def update_subtask(task_id, subtask_id):
+        """Actualizar el título o el estado de una subtarea"""
+        try:
+            try:
+                values = _parse_subtask_values(request.get_json(silent=True), partial=True)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            row = db.session.execute(
+                update(Subtask)
+                .where(Subtask.id == subtask_id, Subtask.task_id == task_id)
+                .values(**values)
+                .returning(*SUBTASK_COLUMNS),
+                execution_options={'synchronize_session': False}
+            ).one_or_none()
+            if row is None:
+                db.session.rollback()
+                return jsonify({'error': 'Subtarea no encontrada'}), 404
+            
+            _touch_task(task_id)
+            db.session.commit()
+            
+            return jsonify({
+                'message': 'Subtarea actualizada exitosamente',
+                'subtask': subtask_to_dict(row)
+            }), 200
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'error': 'Error al actualizar subtarea', 'details': str(e)}), 500
+    
+    @staticmethod
+    def delete_subtask(task_id, subtask_id):
+        """Eliminar una subtarea (dejando lápida para la sincronización)"""
+        try:
+            deleted = db.session.scalars(
+                delete(Subtask)
+                .where(Subtask.id == subtask_id, Subtask.task_id == task_id)
+                .returning(Subtask.id),
+                execution_options={'synchronize_session': False}
+            ).all()
+            if not deleted:
+                db.session.rollback()
+                return jsonify({'error': 'Subtarea no encontrada'}), 404
+            
+            Tombstone.record('subtask', deleted, task_id=task_id)
+            _touch_task(task_id)
+            db.session.commit()
+            
+            return jsonify({'message': 'Subtarea eliminada exitosamente'}), 200
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'error': 'Error al eliminar subtarea', 'details': str(e)}), 500
+    
+    @staticmethod
+    def set_completion(task_id):
+        """Marcar todas las subtareas de una tarea como completadas (o pendientes).
+
+        Un solo UPDATE que solo toca las subtareas cuyo estado cambia.
+        """
+        try:
+            data = request.get_json(silent=True) or {}
+            completada = data.get('completada', True) if isinstance(data, dict) else None
+            if not isinstance(completada, bool):
+                return jsonify({'error': 'completada debe ser true o false'}), 400
+            
+            subtask_ids = sorted(db.session.scalars(
+                update(Subtask)
+                .where(Subtask.task_id == task_id, Subtask.completada != completada)
+                .values(completada=completada)
+                .returning(Subtask.id),
+                execution_options={'synchronize_session': False}
+            ).all())
+            # Sin cambios no se toca la tarea; solo se comprueba que existe
+            exists = _touch_task(task_id) if subtask_ids else db.session.get(Task, task_id) is not None
+            if not exists:
+                db.session.rollback()
+                return jsonify({'error': 'Tarea no encontrada'}), 404
+            db.session.commit()
+            
+            return jsonify({
+                'message': f'{len(subtask_ids)} subtarea(s) actualizada(s)',
+                'completada': completada,
+                'count': len(subtask_ids),
+                'subtask_ids': subtask_ids
+            }), 200
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'error': 'Error al actualizar subtareas', 'details': str(e)}), 500
+    
+    @staticmethod
+    def reorder_subtasks(task_id):
+        """Reordenar las subtareas: ids es la lista completa en el nuevo orden.
+
+        Solo se actualizan (con un UPDATE por clave primaria en executemany)
+        las subtareas cuya posición cambia.
+        """
+        try:
+            data = request.get_json(silent=True)
+            ids = data.get('ids') if isinstance(data, dict) else None
+            if not isinstance(ids, list) or not all(
+                isinstance(subtask_id, int) and not isinstance(subtask_id, bool) for subtask_id in ids
+            ):
+                return jsonify({'error': 'ids debe ser una lista de enteros'}), 400
+            
+            if db.session.get(Task, task_id) is None:
+                return jsonify({'error': 'Tarea no encontrada'}), 404
+            
+            positions = dict(db.session.execute(
+                select(Subtask.id, Subtask.posicion).where(Subtask.task_id == task_id)
+            ).all())
+            if len(ids) != len(positions) or set(ids) != set(positions):
+                return jsonify({'error': 'ids debe contener cada subtarea de la tarea exactamente una vez'}), 400
+            
+            changed = [
+                {'id': subtask_id, 'posicion': posicion}
+                for posicion, subtask_id in enumerate(ids) if positions[subtask_id] != posicion
+            ]
+            if changed:
+                db.session.execute(update(Subtask), changed)
+                _touch_task(task_id)
+            db.session.commit()
+            
+            return jsonify({
+                'message': 'Subtareas reordenadas',
+                'count': len(changed),
+                'subtask_ids': ids
+            }), 200
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'error': 'Error al reordenar subtareas', 'details': str(e)}), 500
@@ -1,242 +1,849 @@
-from flask import request, jsonify
-from models.task import Task
+from flask import request, jsonify, make_response, current_app, stream_with_context
+from models.task import Task, TASK_SPAN, utc_now
+from models.subtask import Subtask
+from models.tombstone import Tombstone
+from models.task_series import TaskSeries
 from database.db import db
+from sqlalchemy import select, insert, update, delete, null, not_
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload
 from datetime import datetime, date, time, timedelta, timezone
-from dateutil.rrule import rrule, DAILY, WEEKLY, MONTHLY, YEARLY, MO, TU, WE, TH, FR, SA, SU
+from services.pagination import parse_limit, encode_cursor, decode_cursor, apply_keyset
+from services.versioning import current_etag
+from services import task_reader
+from services.recurrence import parse_recurrence, expand, count_occurrences, occurrences_between
+from services import materializer, jobs
+from services.validation import (
+    PRIORIDADES, TIPOS, parse_date, parse_task_fields, parse_task_update, parse_subtasks
+)
+from collections import namedtuple, defaultdict
+import json
 import uuid
 
+
+def _parse_date_param(name):
+    """Leer un parámetro de query opcional con formato YYYY-MM-DD.
+
+    Devuelve la fecha (o None si no se envió). Lanza ValueError si el formato es inválido.
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f'Formato de {name} inválido. Use YYYY-MM-DD')
+
+
+def _parse_fieldset():
+    """Leer ?fields= e ?include= del request.
+
+    Devuelve (fields, include_subtasks). fields es None si no se pidió un
+    subconjunto; en ese caso se mantiene la respuesta completa con subtareas.
+    Con fields, las subtareas solo se incluyen con include=subtasks.
+    Lanza ValueError si hay campos o valores de include desconocidos.
+    """
+    include = {value.strip() for value in request.args.get('include', '').split(',') if value.strip()}
+    unknown = include - {'subtasks'}
+    if unknown:
+        raise ValueError(f'Valor de include inválido: {", ".join(sorted(unknown))}')
+    
+    raw_fields = request.args.get('fields')
+    if not raw_fields:
+        return None, True
+    
+    requested = [name.strip() for name in raw_fields.split(',') if name.strip()]
+    unknown = [name for name in requested if name not in Task.SERIALIZABLE_FIELDS]
+    if unknown:
+        raise ValueError(f'Campo desconocido en fields: {", ".join(unknown)}')
+    
+    # El id se devuelve siempre; se respeta el orden canónico de to_dict()
+    fields = tuple(name for name in Task.SERIALIZABLE_FIELDS if name == 'id' or name in requested)
+    return fields, 'subtasks' in include
+
+
+def _date_window_criteria(window_from, window_to):
+    """Condiciones para las tareas cuyo intervalo [fecha_inicio, fecha_fin] se solapa con la ventana.
+
+    Predicado de solapamiento: fecha_inicio <= to AND fecha_fin >= from. Como
+    ninguna tarea dura más que la más larga, también fecha_inicio >= from -
+    duración máxima, de modo que el rango del índice de fecha_inicio queda
+    acotado por los dos extremos y no recorre el historial anterior.
+    """
+    criteria = []
+    if window_to is not None:
+        criteria.append(Task.fecha_inicio <= window_to)
+    if window_from is not None:
+        criteria.append(Task.fecha_fin >= window_from)
+        # MAX sobre el índice ix_tasks_duracion: una búsqueda, no un recorrido
+        span = timedelta(days=db.session.scalar(select(db.func.max(TASK_SPAN))) or 0)
+        if window_from - date.min > span:
+            criteria.append(Task.fecha_inicio >= window_from - span)
+    return criteria
+
+
+def _parse_window():
+    """Leer ?from=&to= y devolver las condiciones de solapamiento. Lanza ValueError."""
+    window_from = _parse_date_param('from')
+    window_to = _parse_date_param('to')
+    if window_from and window_to and window_to < window_from:
+        raise ValueError('La fecha "to" debe ser posterior o igual a "from"')
+    return _date_window_criteria(window_from, window_to)
+
+
+def _not_modified(etag):
+    """Respuesta 304 si el cliente ya tiene la versión actual (If-None-Match)"""
+    if request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+def _with_etag(payload, etag, status=200):
+    response = jsonify(payload)
+    response.set_etag(etag)
+    return response, status
+
+
+def _wants_stream():
+    """El cliente pide NDJSON con ?stream=1 o con Accept: application/x-ndjson"""
+    if request.args.get('stream') in ('1', 'true'):
+        return True
+    accept = request.accept_mimetypes
+    return accept[NDJSON_MIMETYPE] > accept['application/json']
+
+
+def _minimal_response(task_id, status=200):
+    """Respuesta de Prefer: return=minimal: el id y la versión de la colección tras el cambio"""
+    response = jsonify({'id': task_id, 'version': current_etag()})
+    response.status_code = status
+    response.headers['Preference-Applied'] = 'return=minimal'
+    return response
+
+
+def _preferences():
+    """Preferencias de la cabecera Prefer (RFC 7240), p. ej. {'respond-async'}"""
+    return {
+        token.split(';')[0].strip().lower()
+        for token in request.headers.get('Prefer', '').split(',')
+        if token.strip()
+    }
+
+
+def _stream_tasks(stmt, fields, include_subtasks, etag):
+    """Emitir las tareas como NDJSON (una por línea) leyendo la BD por lotes.
+
+    La memoria queda acotada al tamaño del lote: ni la lista completa de
+    filas ni el documento JSON completo llegan a existir a la vez.
+    """
+    dumps = current_app.json.dumps
+    
+    def generate():
+        for batch in task_reader.stream_tasks(stmt, fields, include_subtasks, STREAM_BATCH_SIZE):
+            yield ''.join(dumps(item) + '\n' for item in batch)
+    
+    response = current_app.response_class(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+    response.set_etag(etag)
+    return response
+
+
+# Orden de un listado paginable: columnas de ordenación, parsers de los
+# valores del cursor, columnas extra a leer y cómo obtener el cursor de una fila
+ListOrder = namedtuple('ListOrder', ['keys', 'descending', 'parsers', 'extra_fields', 'cursor_values'])
+
+# Listado principal: más recientes primero
+RECENT_ORDER = ListOrder(
+    keys=(Task.fecha_inicio, Task.id),
+    descending=True,
+    parsers=(date.fromisoformat, int),
+    extra_fields=('fecha_inicio',),
+    cursor_values=lambda row: [row['fecha_inicio'].isoformat(), row['id']]
+)
+
+# Agenda (pendientes, tareas de un día): por fecha y hora, las tareas sin hora primero
+AGENDA_ORDER = ListOrder(
+    keys=(Task.fecha_inicio, db.func.coalesce(Task.hora, time.min), Task.id),
+    descending=False,
+    parsers=(date.fromisoformat, time.fromisoformat, int),
+    extra_fields=('fecha_inicio', 'hora'),
+    cursor_values=lambda row: [row['fecha_inicio'].isoformat(), (row['hora'] or time.min).isoformat(), row['id']]
+)
+
+# Margen con el que se emite el token de sincronización: los cambios de
+# transacciones que estaban en curso al consultar se reenvían en el siguiente
+# delta en lugar de perderse (aplicarlos dos veces es idempotente)
+SYNC_OVERLAP = timedelta(seconds=5)
+
+# Filas que se leen de la base de datos por lote en el modo streaming
+STREAM_BATCH_SIZE = 500
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Fechas devueltas por la vista previa de una recurrencia (por defecto y máximo)
+DEFAULT_PREVIEW_LIMIT = 10
+MAX_PREVIEW_LIMIT = 100
+# Hasta dónde se cuentan las ocurrencias de una regla finita en la vista previa
+MAX_PREVIEW_TOTAL = 10000
+
+# Máximo de ocurrencias que se materializan dentro de la petición al crear
+# una recurrencia; las siguientes las crea el materializador en segundo plano
+MAX_MATERIALIZED_OCCURRENCES = 365
+
+NO_TASKS_CREATED = 'No se pudieron crear tareas. Verifique los parámetros de recurrencia.'
+
+# Máximo de operaciones por petición en POST /api/tasks/batch
+MAX_BATCH_OPERATIONS = 500
+
+BATCH_OPERATIONS = ('create', 'update', 'delete', 'toggle')
+
+# Operación validada de un lote: payload es (fields, rule, subtasks_data) en
+# create y (values, subtasks_data o None) en update
+BatchOperation = namedtuple('BatchOperation', ['index', 'op', 'task_id', 'payload'])
+
+
+def _list_tasks(criteria, order):
+    """Respuesta común de los listados de tareas.
+
+    Aplica ETag, paginación por cursor (?limit=&cursor=), selección de campos
+    (?fields=&include=) y el modo streaming sobre las condiciones dadas.
+    """
+    # La versión se lee antes de consultar: si cambia durante la consulta,
+    # el ETag será antiguo y el cliente volverá a pedir los datos
+    # JSON y NDJSON son representaciones distintas de la misma URL (Vary: Accept)
+    stream = _wants_stream()
+    etag = f'{current_etag()}-ndjson' if stream else current_etag()
+    not_modified = _not_modified(etag)
+    if not_modified:
+        not_modified.vary.add('Accept')
+        return not_modified
+    
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        cursor = request.args.get('cursor')
+        cursor_values = decode_cursor(cursor, order.parsers) if cursor else None
+        fields, include_subtasks = _parse_fieldset()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if stream and (limit is not None or cursor_values):
+        return jsonify({'error': 'limit y cursor no se admiten en modo streaming'}), 400
+    
+    stmt = task_reader.select_tasks(fields, *order.extra_fields)
+    for criterion in criteria:
+        stmt = stmt.where(criterion)
+    if cursor_values:
+        stmt = apply_keyset(stmt, order.keys, cursor_values, order.descending)
+    stmt = stmt.order_by(*(key.desc() if order.descending else key.asc() for key in order.keys))
+    
+    if stream:
+        response = _stream_tasks(stmt, fields, include_subtasks, etag)
+        response.vary.add('Accept')
+        return response
+    
+    if limit is None:
+        # Subtareas filtradas con el mismo SELECT como subconsulta
+        subtask_ids = stmt.with_only_columns(Task.id).order_by(None)
+        rows, items = task_reader.read_tasks(stmt, fields, include_subtasks, subtask_ids)
+        next_cursor = None
+    else:
+        rows, items = task_reader.read_tasks(stmt.limit(limit + 1), fields, include_subtasks)
+        has_more = len(rows) > limit
+        items = items[:limit]
+        next_cursor = encode_cursor(order.cursor_values(rows[limit - 1]._mapping)) if has_more else None
+    
+    response, status = _with_etag({
+        'tasks': items,
+        'next_cursor': next_cursor
+    }, etag)
+    response.vary.add('Accept')
+    return response, status
+
+
+# Campos de Task que forman parte de la plantilla de una TaskSeries
+SERIES_TEMPLATE_FIELDS = ('titulo', 'descripcion', 'hora', 'prioridad', 'tipo', 'color')
+
+
+def _update_occurrences(criteria, data, series_group_id, **extra_values):
+    """Aplicar una actualización parcial a todas las tareas que cumplen criteria.
+
+    Se ejecuta como un único UPDATE; si data incluye subtasks, se reemplazan
+    las subtareas de esas tareas con un DELETE y un INSERT masivos. La
+    plantilla de la serie de series_group_id se actualiza también, para que
+    las ocurrencias que se materialicen después reciban los cambios.
+    Devuelve el número de tareas actualizadas. Lanza ValueError si data no es válido.
+    """
+    # Cada ocurrencia tiene sus propias fechas
+    if data and ('fecha_inicio' in data or 'fecha_fin' in data):
+        raise ValueError('Las fechas no se pueden modificar para varias ocurrencias a la vez')
+    # Con extra_values (p. ej. un nuevo group_id) el payload puede venir vacío
+    values = parse_task_update(data) if data or not extra_values else {}
+    data = data or {}
+    
+    subtasks_data = parse_subtasks(data)
+    
+    # Las subtareas se reemplazan antes del UPDATE, que puede cambiar los
+    # valores de criteria (p. ej. el group_id)
+    if 'subtasks' in data:
+        task_ids = select(Task.id).where(*criteria)
+        Tombstone.record_from('subtask', Subtask.id, Subtask.task_id, Subtask.task_id.in_(task_ids))
+        db.session.execute(
+            delete(Subtask).where(Subtask.task_id.in_(task_ids)),
+            execution_options={'synchronize_session': False}
+        )
+        if subtasks_data:
+            db.session.execute(insert(Subtask), [
+                dict(subtask_data, task_id=task_id, posicion=posicion)
+                for task_id in db.session.scalars(task_ids) for posicion, subtask_data in enumerate(subtasks_data)
+            ])
+    
+    template = {name: values[name] for name in SERIES_TEMPLATE_FIELDS if name in values}
+    if 'subtasks' in data:
+        template['subtasks'] = json.dumps(subtasks_data) if subtasks_data else None
+    if template or extra_values:
+        db.session.execute(
+            update(TaskSeries).where(TaskSeries.group_id == series_group_id)
+            .values(**template, **extra_values, updated_at=utc_now()),
+            execution_options={'synchronize_session': False}
+        )
+    
+    return db.session.execute(
+        update(Task).where(*criteria).values(**values, **extra_values, updated_at=utc_now()),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+
+
+def _parse_create(data):
+    """Validar el payload de creación. Devuelve (fields, rule, subtasks_data).
+
+    rule es None si la tarea no es periódica. Lanza ValueError.
+    """
+    fields = parse_task_fields(data)
+    recurrence = data.get('recurrence')
+    if recurrence and not isinstance(recurrence, dict):
+        raise ValueError('recurrence debe ser un objeto')
+    rule = None
+    if recurrence and recurrence.get('enabled'):
+        rule = parse_recurrence(recurrence, fields['fecha_inicio'], fields['fecha_fin'], fields['tipo'])
+    return fields, rule, parse_subtasks(data)
+
+
+def _new_series(fields, rule, subtasks_data):
+    """TaskSeries (sin añadir a la sesión) que guarda la regla y la plantilla"""
+    series = TaskSeries(**{name: fields[name] for name in SERIES_TEMPLATE_FIELDS}, group_id=str(uuid.uuid4()))
+    series.rule = rule
+    series.subtask_templates = subtasks_data
+    start = materializer.backfill_start(current_app.config, rule)
+    if start > rule.dtstart:
+        # Las ocurrencias anteriores no se materializan (ver backfill_start())
+        series.materialized_through = start - timedelta(days=1)
+    return series
+
+
+def _create_task_job(job, fields, rule, subtasks_data):
+    """Trabajo de creación asíncrona (Prefer: respond-async).
+
+    Sin el límite de MAX_MATERIALIZED_OCCURRENCES, la serie se materializa
+    hasta el horizonte en lotes de MATERIALIZE_BATCH_SIZE. Cada lote se
+    confirma por separado: el bloqueo de escritura se libera entre lotes y
+    job refleja el progreso con los ids ya creados.
+    """
+    if not rule:
+        tasks = materializer.insert_occurrences(
+            fields,
+            [fields['fecha_inicio']],
+            (fields['fecha_fin'] - fields['fecha_inicio']).days,
+            None,
+            subtasks_data
+        )
+        job.total = len(tasks)
+        db.session.commit()
+        job.add_task_ids([task['id'] for task in tasks])
+        return
+    
+    config = current_app.config
+    through = materializer.initial_through(config, rule)
+    batch_size = config.get('MATERIALIZE_BATCH_SIZE', materializer.DEFAULT_BATCH_SIZE)
+    series = _new_series(fields, rule, subtasks_data)
+    start = materializer.backfill_start(config, rule)
+    job.total = len(series.active_dates(occurrences_between(rule._replace(duration=0), start, through)))
+    
+    db.session.add(series)
+    while True:
+        with materializer.materialize_lock:
+            tasks = materializer.materialize(series, through, batch_size, completada=fields['completada'])
+            if not tasks and not job.task_ids:
+                db.session.rollback()
+                raise ValueError(NO_TASKS_CREATED)
+            db.session.commit()
+            finished = series.materialized_through is None or series.materialized_through >= through
+        job.add_task_ids([task['id'] for task in tasks])
+        if finished or not tasks:
+            return
+
+
+def _parse_batch(data):
+    """Validar la forma y los payloads de las operaciones de un lote.
+
+    Devuelve (operations, errors); errors es una lista de {index, status,
+    error}. No consulta la base de datos. Lanza ValueError si el cuerpo no
+    es una lista de operaciones.
+    """
+    items = data.get('operations') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValueError('Se requiere una lista de operaciones no vacía')
+    if len(items) > MAX_BATCH_OPERATIONS:
+        raise ValueError(f'Un lote admite como máximo {MAX_BATCH_OPERATIONS} operaciones')
+    
+    operations = []
+    errors = []
+    seen_ids = set()
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict) or item.get('op') not in BATCH_OPERATIONS:
+                raise ValueError('Operación inválida. Debe ser: create, update, delete o toggle')
+            op = item['op']
+            payload_data = item.get('data')
+            if op in ('create', 'update') and not isinstance(payload_data, dict):
+                raise ValueError('No se enviaron datos')
+            
+            task_id = None
+            if op == 'create':
+                payload = _parse_create(payload_data)
+            else:
+                task_id = item.get('id')
+                if not isinstance(task_id, int) or isinstance(task_id, bool):
+                    raise ValueError('Se requiere el id entero de la tarea')
+                # Sin repetidos, las operaciones de cada tipo se pueden aplicar en bloque
+                if task_id in seen_ids:
+                    raise ValueError('Una tarea solo puede aparecer una vez por lote')
+                seen_ids.add(task_id)
+                payload = None
+                if op == 'update':
+                    subtasks_data = parse_subtasks(payload_data, keep_ids=True) if 'subtasks' in payload_data else None
+                    payload = (parse_task_update(payload_data), subtasks_data)
+        except ValueError as e:
+            errors.append({'index': index, 'status': 400, 'error': str(e)})
+            continue
+        except (TypeError, AttributeError):
+            # Campos con un tipo inesperado (p. ej. prioridad numérica o subtareas que no son objetos)
+            errors.append({'index': index, 'status': 400, 'error': 'Datos con tipos inválidos'})
+            continue
+        operations.append(BatchOperation(index, op, task_id, payload))
+    return operations, errors
+
+
+def _check_batch_targets(operations):
+    """Comprobar con un solo SELECT que las tareas del lote existen.
+
+    Devuelve (rows, errors): rows son las filas (id, fechas, group_id) por id.
+    """
+    task_ids = [operation.task_id for operation in operations if operation.task_id is not None]
+    rows = {}
+    if task_ids:
+        rows = {
+            row.id: row for row in db.session.execute(
+                select(Task.id, Task.fecha_inicio, Task.fecha_fin, Task.group_id).where(Task.id.in_(task_ids))
+            )
+        }
+    
+    errors = []
+    for operation in operations:
+        if operation.task_id is None:
+            continue
+        row = rows.get(operation.task_id)
+        if row is None:
+            errors.append({'index': operation.index, 'status': 404, 'error': 'Tarea no encontrada'})
+        elif operation.op == 'update':
+            values = operation.payload[0]
+            if values.get('fecha_fin', row.fecha_fin) < values.get('fecha_inicio', row.fecha_inicio):
+                errors.append({
+                    'index': operation.index,
+                    'status': 400,
+                    'error': 'La fecha de fin debe ser posterior o igual a la fecha de inicio'
+                })
+    return rows, errors
+
+
+def _sync_subtasks(subtasks_by_task):
+    """Reconciliar las subtareas de varias tareas con las listas recibidas.
+
+    subtasks_by_task es {task_id: subtareas de parse_subtasks(keep_ids=True)}.
+    Las que traen el id de una subtarea existente de esa tarea se actualizan
+    solo si cambian (también su posición en la lista); las demás se
+    insertan, y las existentes que no aparecen se borran dejando lápida. Los
+    ids de las subtareas que no cambian se conservan. Cada tipo de cambio es
+    una sola sentencia para todas las tareas.
+    
+    Devuelve {task_id: subtareas resultantes} como los diccionarios de
+    Subtask.to_dict(), sin volver a leerlas (las nuevas salen de RETURNING).
+    """
+    existing = {
+        row.id: row for row in db.session.execute(
+            select(Subtask.id, Subtask.task_id, Subtask.titulo, Subtask.completada, Subtask.posicion)
+            .where(Subtask.task_id.in_(list(subtasks_by_task)))
+        )
+    }
+    
+    kept = set()
+    changed = []
+    added = []
+    result = {task_id: [] for task_id in subtasks_by_task}
+    for task_id, subtasks_data in subtasks_by_task.items():
+        for posicion, subtask_data in enumerate(subtasks_data):
+            values = {
+                'titulo': subtask_data['titulo'],
+                'completada': bool(subtask_data['completada']),
+                'posicion': posicion
+            }
+            row = existing.get(subtask_data.get('id'))
+            if row is None or row.task_id != task_id or row.id in kept:
+                # Sin id, con un id ajeno o repetido: subtarea nueva
+                added.append(dict(values, task_id=task_id))
+                continue
+            kept.add(row.id)
+            result[task_id].append(dict(values, id=row.id, task_id=task_id))
+            if (row.titulo, row.completada, row.posicion) != tuple(values.values()):
+                changed.append(dict(values, id=row.id))
+    removed = [subtask_id for subtask_id in existing if subtask_id not in kept]
+    
+    if added:
+        # (task_id, posicion) identifica cada fila nueva en RETURNING
+        for row in db.session.execute(insert(Subtask).returning(*task_reader.SUBTASK_COLUMNS), added):
+            result[row.task_id].append(task_reader.subtask_to_dict(row))
+    if changed:
+        # UPDATE por clave primaria con executemany
+        db.session.execute(update(Subtask), changed)
+    if removed:
+        Tombstone.record_from('subtask', Subtask.id, Subtask.task_id, Subtask.id.in_(removed))
+        db.session.execute(
+            delete(Subtask).where(Subtask.id.in_(removed)),
+            execution_options={'synchronize_session': False}
+        )
+    
+    for subtasks in result.values():
+        subtasks.sort(key=lambda subtask: subtask['posicion'])
+    return {
+        task_id: [
+            {name: subtask[name] for name in ('id', 'task_id', 'titulo', 'completada', 'posicion')}
+            for subtask in subtasks
+        ]
+        for task_id, subtasks in result.items()
+    }
+
+
+def _parse_completion(data):
+    """Validar el payload de PATCH /api/tasks/completion.
+
+    Devuelve (completada, criteria) con las condiciones de las tareas a
+    marcar: una lista de ids, o un día con filtros opcionales. Lanza ValueError.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('No se enviaron datos')
+    if not isinstance(data.get('completada', True), bool):
+        raise ValueError('completada debe ser true o false')
+    completada = data.get('completada', True)
+    
+    if ('ids' in data) == ('fecha' in data):
+        raise ValueError('Envíe ids o fecha (solo uno de los dos)')
+    if 'ids' in data:
+        ids = data['ids']
+        if not isinstance(ids, list) or not ids or not all(
+            isinstance(task_id, int) and not isinstance(task_id, bool) for task_id in ids
+        ):
+            raise ValueError('ids debe ser una lista no vacía de enteros')
+        if len(ids) > MAX_BATCH_OPERATIONS:
+            raise ValueError(f'Se admiten como máximo {MAX_BATCH_OPERATIONS} ids')
+        return completada, [Task.id.in_(ids)]
+    
+    day = parse_date(data['fecha'], 'fecha')
+    criteria = _date_window_criteria(day, day)
+    if data.get('prioridad') is not None:
+        if data['prioridad'] not in PRIORIDADES:
+            raise ValueError('Prioridad inválida. Debe ser: baja, media o alta')
+        criteria.append(Task.prioridad == data['prioridad'])
+    if data.get('tipo') is not None:
+        if data['tipo'] not in TIPOS:
+            raise ValueError('Tipo inválido. Debe ser: diaria, semanal o personalizado')
+        criteria.append(Task.tipo == data['tipo'])
+    if data.get('group_id') is not None:
+        criteria.append(Task.group_id == str(data['group_id']))
+    return completada, criteria
+
+
+def _insert_tasks(rows):
+    """INSERT masivo de tareas que devuelve los ids en el mismo orden que rows.
+
+    RETURNING no garantiza el orden de las filas en SQLite, y con
+    sort_by_parameter_order SQLAlchemy ejecuta allí un INSERT por fila. Por
+    eso se devuelven también los valores insertados y cada fila se asocia con
+    su id por esos valores (las filas idénticas son intercambiables). Los None
+    se sustituyen antes por el valor por defecto de la columna, como hace el
+    ORM al insertar, para que lo guardado coincida con lo enviado.
+    """
+    names = list(rows[0])
+    columns = [Task.__table__.c[name] for name in names]
+    defaults = {
+        column.name: column.default.arg for column in columns
+        if column.default is not None and column.default.is_scalar
+    }
+    rows = [
+        {name: defaults[name] if value is None and name in defaults else value for name, value in row.items()}
+        for row in rows
+    ]
+    created = db.session.execute(
+        insert(Task).returning(Task.id, *columns), rows
+    ).all()
+    ids_by_values = defaultdict(list)
+    for row in created:
+        ids_by_values[tuple(row[1:])].append(row[0])
+    return [ids_by_values[tuple(row[name] for name in names)].pop() for row in rows]
+
+
+def _apply_batch(operations, rows):
+    """Aplicar las operaciones validadas de un lote con sentencias por conjuntos.
+
+    Cada tipo de operación se aplica con unas pocas sentencias para todo el
+    lote (INSERT/UPDATE con executemany, DELETE y UPDATE con IN). No hace
+    commit. Devuelve {index: ids creados} de las altas, o lanza ValueError
+    con (index, mensaje) si un alta periódica no genera tareas.
+    """
+    by_op = {op: [operation for operation in operations if operation.op == op] for op in BATCH_OPERATIONS}
+    now = utc_now()
+    created = {}
+    
+    # Altas: las tareas únicas en un solo INSERT; cada recurrencia con su serie
+    singles = [operation for operation in by_op['create'] if not operation.payload[1]]
+    if singles:
+        task_ids = _insert_tasks([operation.payload[0] for operation in singles])
+        created.update((operation.index, [task_id]) for operation, task_id in zip(singles, task_ids))
+        subtask_rows = [
+            dict(subtask_data, task_id=task_id, posicion=posicion)
+            for operation, task_id in zip(singles, task_ids)
+            for posicion, subtask_data in enumerate(operation.payload[2])
+        ]
+        if subtask_rows:
+            db.session.execute(insert(Subtask), subtask_rows)
+    for operation in by_op['create']:
+        fields, rule, subtasks_data = operation.payload
+        if not rule:
+            continue
+        series = _new_series(fields, rule, subtasks_data)
+        db.session.add(series)
+        tasks = materializer.materialize(
+            series,
+            materializer.initial_through(current_app.config, rule),
+            MAX_MATERIALIZED_OCCURRENCES,
+            completada=fields['completada']
+        )
+        if not tasks:
+            raise ValueError(operation.index, NO_TASKS_CREATED)
+        created[operation.index] = [task['id'] for task in tasks]
+    
+    # Ediciones: UPDATE por clave primaria con executemany
+    if by_op['update']:
+        db.session.execute(update(Task), [
+            dict(operation.payload[0], id=operation.task_id, updated_at=now) for operation in by_op['update']
+        ])
+        subtasks_by_task = {
+            operation.task_id: operation.payload[1]
+            for operation in by_op['update'] if operation.payload[1] is not None
+        }
+        if subtasks_by_task:
+            _sync_subtasks(subtasks_by_task)
+    
+    # Cambios de estado: un UPDATE que invierte completada
+    if by_op['toggle']:
+        db.session.execute(
+            update(Task).where(Task.id.in_([operation.task_id for operation in by_op['toggle']]))
+            .values(completada=not_(Task.completada), updated_at=now),
+            execution_options={'synchronize_session': False}
+        )
+    
+    # Bajas: lápidas con INSERT ... SELECT y dos DELETE
+    if by_op['delete']:
+        deleted_ids = [operation.task_id for operation in by_op['delete']]
+        # En las series materializadas, las fechas quedan como excluidas
+        group_ids = {rows[task_id].group_id for task_id in deleted_ids if rows[task_id].group_id}
+        if group_ids:
+            series_by_group = {
+                series.group_id: series
+                for series in db.session.scalars(select(TaskSeries).where(TaskSeries.group_id.in_(group_ids)))
+            }
+            for task_id in deleted_ids:
+                row = rows[task_id]
+                series = series_by_group.get(row.group_id)
+                if series and row.fecha_inicio >= series.dtstart:
+                    series.set_excluded(row.fecha_inicio)
+        Tombstone.record_from('subtask', Subtask.id, Subtask.task_id, Subtask.task_id.in_(deleted_ids))
+        Tombstone.record_from('task', Task.id, null(), Task.id.in_(deleted_ids))
+        db.session.execute(
+            delete(Subtask).where(Subtask.task_id.in_(deleted_ids)),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.execute(
+            delete(Task).where(Task.id.in_(deleted_ids)),
+            execution_options={'synchronize_session': False}
+        )
+    
+    return created
+
+
 class TaskController:
     
     @staticmethod
     def get_all_tasks():
-        """Obtener todas las tareas"""
+        """Obtener todas las tareas (opcionalmente solo las que se solapan con ?from=&to=)"""
         try:
-            tasks = Task.query.order_by(Task.fecha_inicio.desc()).all()
-            return jsonify({
-                'tasks': [task.to_dict() for task in tasks]
-            }), 200
+            try:
+                criteria = _parse_window()
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            return _list_tasks(criteria, RECENT_ORDER)
+        except SQLAlchemyError as e:
+            return jsonify({'error': 'Error al obtener tareas', 'details': str(e)}), 500
+    
+    @staticmethod
+    def get_pending_tasks():
+        """Obtener las tareas pendientes ordenadas por fecha y hora"""
+        try:
+            try:
+                criteria = _parse_window()
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            return _list_tasks([Task.completada.is_(False)] + criteria, AGENDA_ORDER)
+        except SQLAlchemyError as e:
+            return jsonify({'error': 'Error al obtener tareas pendientes', 'details': str(e)}), 500
+    
+    @staticmethod
+    def get_tasks_by_date(fecha):
+        """Obtener las tareas que incluyen un día (fecha_inicio <= día <= fecha_fin)"""
+        try:
+            try:
+                day = datetime.strptime(fecha, '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({'error': 'Formato de fecha inválido. Use YYYY-MM-DD'}), 400
+            return _list_tasks(_date_window_criteria(day, day), AGENDA_ORDER)
         except SQLAlchemyError as e:
             return jsonify({'error': 'Error al obtener tareas', 'details': str(e)}), 500
     
     @staticmethod
     def get_task(task_id):
-        """Obtener una tarea por ID"""
+        """Obtener una tarea por ID (admite ?fields= e ?include=subtasks)"""
         try:
-            task = db.session.get(Task, task_id)
-            if not task:
+            etag = current_etag()
+            not_modified = _not_modified(etag)
+            if not_modified:
+                return not_modified
+            
+            try:
+                fields, include_subtasks = _parse_fieldset()
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            stmt = task_reader.select_tasks(fields).where(Task.id == task_id)
+            rows, items = task_reader.read_tasks(stmt, fields, include_subtasks)
+            if not items:
                 return jsonify({'error': 'Tarea no encontrada'}), 404
-            return jsonify({'task': task.to_dict()}), 200
+            return _with_etag({'task': items[0]}, etag)
         except SQLAlchemyError as e:
             return jsonify({'error': 'Error al obtener tarea', 'details': str(e)}), 500
     
+    @staticmethod
+    def get_changes():
+        """Obtener las tareas creadas/modificadas y los borrados desde un token de sincronización"""
+        try:
+            now = utc_now().replace(tzinfo=None)
+            since = request.args.get('since')
+            if since:
+                try:
+                    since_dt, = decode_cursor(since, (datetime.fromisoformat,))
+                    if since_dt.tzinfo is not None:
+                        raise ValueError
+                except ValueError:
+                    return jsonify({'error': 'Token de sincronización inválido'}), 400
+                if since_dt < now - Tombstone.RETENTION:
+                    return jsonify({'error': 'Token de sincronización expirado. Descargue todas las tareas'}), 410
+            else:
+                since_dt = None
+            
+            stmt = task_reader.select_tasks()
+            deleted = []
+            if since_dt is not None:
+                stmt = stmt.where(Task.updated_at > since_dt)
+                deleted = Tombstone.query.filter(Tombstone.deleted_at > since_dt).order_by(Tombstone.id).all()
+            stmt = stmt.order_by(Task.updated_at, Task.id)
+            rows, items = task_reader.read_tasks(stmt, subtask_ids=stmt.with_only_columns(Task.id).order_by(None))
+            
+            return jsonify({
+                'tasks': items,
+                'deleted': [tombstone.to_dict() for tombstone in deleted],
+                'sync_token': encode_cursor([(now - SYNC_OVERLAP).isoformat()])
+            }), 200
+        except SQLAlchemyError as e:
+            return jsonify({'error': 'Error al obtener cambios', 'details': str(e)}), 500
+    
     @staticmethod
     def create_task():
-        """Crear una nueva tarea"""
+        """Crear una nueva tarea.
+        
+        Con la cabecera Prefer: respond-async la petición se valida aquí y la
+        creación se encola como trabajo en segundo plano: se responde 202 con
+        el trabajo, que se consulta en GET /api/jobs/<id>.
+        """
         try:
             data = request.get_json()
             
             # Validaciones
-            if not data:
-                return jsonify({'error': 'No se enviaron datos'}), 400
-            
-            if 'titulo' not in data or not data['titulo'].strip():
-                return jsonify({'error': 'El título es obligatorio'}), 400
-            
-            if 'fecha_inicio' not in data:
-                return jsonify({'error': 'La fecha de inicio es obligatoria'}), 400
-            
-            if 'fecha_fin' not in data:
-                return jsonify({'error': 'La fecha de fin es obligatoria'}), 400
-            
-            # Parsear fecha_inicio
-            try:
-                fecha_inicio_obj = datetime.strptime(data['fecha_inicio'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'error': 'Formato de fecha_inicio inválido. Use YYYY-MM-DD'}), 400
-            
-            # Parsear fecha_fin
             try:
-                fecha_fin_obj = datetime.strptime(data['fecha_fin'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'error': 'Formato de fecha_fin inválido. Use YYYY-MM-DD'}), 400
+                fields, rule, subtasks_data = _parse_create(data)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
             
-            # Validar que fecha_fin >= fecha_inicio
-            if fecha_fin_obj < fecha_inicio_obj:
-                return jsonify({'error': 'La fecha de fin debe ser posterior o igual a la fecha de inicio'}), 400
+            preferences = _preferences()
+            if 'respond-async' in preferences:
+                job = jobs.submit(current_app._get_current_object(), _create_task_job, fields, rule, subtasks_data)
+                response = jsonify({'message': 'Creación de tareas en curso', 'job': job.to_dict()})
+                response.status_code = 202
+                response.headers['Location'] = f'/api/jobs/{job.id}'
+                response.headers['Preference-Applied'] = 'respond-async'
+                return response
             
-            # Parsear hora (opcional)
-            hora_obj = None
-            if data.get('hora'):
-                try:
-                    hora_obj = datetime.strptime(data['hora'], '%H:%M:%S').time()
-                except ValueError:
-                    try:
-                        hora_obj = datetime.strptime(data['hora'], '%H:%M').time()
-                    except ValueError:
-                        return jsonify({'error': 'Formato de hora inválido. Use HH:MM:SS o HH:MM'}), 400
-            
-            # Validar prioridad
-            prioridad = data.get('prioridad', 'media').lower()
-            if prioridad not in ['baja', 'media', 'alta']:
-                return jsonify({'error': 'Prioridad inválida. Debe ser: baja, media o alta'}), 400
-            
-            # Validar tipo
-            tipo = data.get('tipo', 'diaria').lower()
-            if tipo not in ['diaria', 'semanal', 'personalizado']:
-                return jsonify({'error': 'Tipo inválido. Debe ser: diaria, semanal o personalizado'}), 400
-            
-            # Validar color (opcional)
-            color = data.get('color', '#1976d2')
-            if color and not color.startswith('#'):
-                return jsonify({'error': 'Formato de color inválido. Use formato hexadecimal (#RRGGBB)'}), 400
-            if color and len(color) not in [4, 7]:  # #RGB o #RRGGBB
-                return jsonify({'error': 'Formato de color inválido. Use #RGB o #RRGGBB'}), 400
-            
-            # Manejo de recurrencia
-            recurrence = data.get('recurrence')
-            tasks_to_create = []
-            group_id = None
-            
-            if recurrence and recurrence.get('enabled'):
-                group_id = str(uuid.uuid4())
-                
-                freq_map = {
-                    'daily': DAILY,
-                    'weekly': WEEKLY,
-                    'monthly': MONTHLY,
-                    'yearly': YEARLY
-                }
-                
-                freq = freq_map.get(recurrence.get('frequency', 'daily'))
-                interval = int(recurrence.get('interval', 1))
-                
-                # Días de la semana para semanal
-                # NOTA: Para tareas de tipo "semanal", NO usar weekdays del frontend
-                # Las tareas semanales siempre se repiten comenzando el lunes
-                weekdays = None
-                if recurrence.get('frequency') == 'weekly' and tipo != 'semanal' and recurrence.get('weekdays'):
-                    day_map = {'MO': MO, 'TU': TU, 'WE': WE, 'TH': TH, 'FR': FR, 'SA': SA, 'SU': SU}
-                    weekdays = [day_map[d] for d in recurrence['weekdays'] if d in day_map]
-                
-                # Para tareas semanales con recurrencia, forzar inicio en lunes
-                if tipo == 'semanal':
-                    # Ajustar fecha_inicio al lunes de esa semana
-                    days_since_monday = fecha_inicio_obj.weekday()
-                    fecha_inicio_obj = fecha_inicio_obj - timedelta(days=days_since_monday)
-                    # La fecha_fin es el domingo de esa semana (6 días después del lunes)
-                    fecha_fin_obj = fecha_inicio_obj + timedelta(days=6)
-                
-                # Fecha fin o conteo
-                until = None
-                count = None
-                
-                if recurrence.get('endType') == 'date' and recurrence.get('endDate'):
-                    try:
-                        until = datetime.strptime(recurrence['endDate'], '%Y-%m-%d').date()
-                    except ValueError:
-                        pass
-                elif recurrence.get('endType') == 'count' and recurrence.get('count'):
-                    count = int(recurrence['count'])
-                
-                # Límite de seguridad: si no hay until ni count, limitar a 1 año o 52 ocurrencias
-                if not until and not count:
-                    until = fecha_inicio_obj + timedelta(days=365)
-                
-                # Limitar count máximo para evitar overflow
-                if count and count > 365:
-                    count = 365
-                
-                # Generar fechas
-                # Nota: rrule usa datetime, no date
-                start_dt = datetime.combine(fecha_inicio_obj, datetime.min.time())
-                
-                rule_kwargs = {
-                    'freq': freq,
-                    'interval': interval,
-                    'dtstart': start_dt,
-                }
-                
-                # Para tareas semanales, siempre usar lunes como día de inicio
-                if tipo == 'semanal' and freq == WEEKLY:
-                    rule_kwargs['byweekday'] = MO
-                elif weekdays:
-                    rule_kwargs['byweekday'] = weekdays
-                if until:
-                    rule_kwargs['until'] = datetime.combine(until, datetime.max.time())
-                if count:
-                    rule_kwargs['count'] = count
-                    
-                dates = list(rrule(**rule_kwargs))
-                
-                # Limitar número máximo de tareas generadas
-                if len(dates) > 365:
-                    dates = dates[:365]
-                
-                # Duración de la tarea original (mínimo 0 días)
-                duration = max(0, (fecha_fin_obj - fecha_inicio_obj).days)
-                
-                for dt in dates:
-                    task_start = dt.date()
-                    # Validar que la fecha no cause overflow
-                    try:
-                        task_end = task_start + timedelta(days=duration)
-                    except OverflowError:
-                        continue  # Saltar esta fecha si causa overflow
-                    
-                    tasks_to_create.append({
-                        'fecha_inicio': task_start,
-                        'fecha_fin': task_end
-                    })
+            if rule:
+                # La regla se guarda en una serie y solo se materializa el
+                # horizonte; el materializador extiende el resto en segundo plano
+                series = _new_series(fields, rule, subtasks_data)
+                db.session.add(series)
+                tasks = materializer.materialize(
+                    series,
+                    materializer.initial_through(current_app.config, rule),
+                    MAX_MATERIALIZED_OCCURRENCES,
+                    completada=fields['completada']
+                )
             else:
                 # Tarea única
-                tasks_to_create.append({
-                    'fecha_inicio': fecha_inicio_obj,
-                    'fecha_fin': fecha_fin_obj
-                })
-            
-            created_tasks = []
-            subtasks_data = data.get('subtasks', [])
-            
-            for task_dates in tasks_to_create:
-                new_task = Task(
-                    titulo=data['titulo'].strip(),
-                    descripcion=data.get('descripcion', '').strip() if data.get('descripcion') else None,
-                    fecha_inicio=task_dates['fecha_inicio'],
-                    fecha_fin=task_dates['fecha_fin'],
-                    hora=hora_obj,
-                    completada=data.get('completada', False),
-                    prioridad=prioridad,
-                    tipo=tipo,
-                    color=color,
-                    group_id=group_id
+                tasks = materializer.insert_occurrences(
+                    fields,
+                    [fields['fecha_inicio']],
+                    (fields['fecha_fin'] - fields['fecha_inicio']).days,
+                    None,
+                    subtasks_data
                 )
-                db.session.add(new_task)
-                db.session.flush() # Para obtener el ID
-                
-                # Crear subtareas
-                from models.subtask import Subtask
-                for subtask_data in subtasks_data:
-                    if subtask_data.get('titulo'):
-                        new_subtask = Subtask(
-                            task_id=new_task.id,
-                            titulo=subtask_data['titulo'].strip(),
-                            completada=subtask_data.get('completada', False)
-                        )
-                        db.session.add(new_subtask)
-                
-                created_tasks.append(new_task)
-            
-            db.session.commit()
             
             # Verificar que se crearon tareas
-            if not created_tasks:
-                return jsonify({'error': 'No se pudieron crear tareas. Verifique los parámetros de recurrencia.'}), 400
+            if not tasks:
+                db.session.rollback()
+                return jsonify({'error': NO_TASKS_CREATED}), 400
             
+            db.session.commit()
+            
+            if 'return=minimal' in preferences:
+                return _minimal_response(tasks[0]['id'], 201)
+            # La representación sale de RETURNING: no se vuelve a leer la tarea
             return jsonify({
-                'message': f'{len(created_tasks)} tarea(s) creada(s) exitosamente',
-                'task': created_tasks[0].to_dict(),
-                'count': len(created_tasks)
+                'message': f'{len(tasks)} tarea(s) creada(s) exitosamente',
+                'task': tasks[0],
+                'count': len(tasks)
             }), 201
             
         except SQLAlchemyError as e:
@@ -244,99 +851,151 @@ class TaskController:
             return jsonify({'error': 'Error al crear tarea', 'details': str(e)}), 500
     
     @staticmethod
-    def update_task(task_id):
-        """Actualizar una tarea existente"""
+    def batch_tasks():
+        """Aplicar un lote de operaciones create/update/delete/toggle.
+
+        Se validan todas antes de tocar la base de datos; si alguna es
+        inválida no se aplica ninguna. Las válidas se aplican en una sola
+        transacción y se responde con un resultado por operación.
+        """
         try:
-            task = db.session.get(Task, task_id)
-            if not task:
-                return jsonify({'error': 'Tarea no encontrada'}), 404
+            try:
+                operations, errors = _parse_batch(request.get_json(silent=True))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            rows, target_errors = _check_batch_targets(operations)
+            errors = sorted(errors + target_errors, key=lambda error: error['index'])
+            if errors:
+                return jsonify({
+                    'error': 'El lote contiene operaciones inválidas; no se aplicó ninguna',
+                    'errors': errors
+                }), 400
             
-            data = request.get_json()
-            if not data:
-                return jsonify({'error': 'No se enviaron datos'}), 400
+            try:
+                created = _apply_batch(operations, rows)
+            except ValueError as e:
+                db.session.rollback()
+                index, message = e.args
+                return jsonify({
+                    'error': 'El lote contiene operaciones inválidas; no se aplicó ninguna',
+                    'errors': [{'index': index, 'status': 400, 'error': message}]
+                }), 400
             
-            # Actualizar campos
-            if 'titulo' in data:
-                if not data['titulo'].strip():
-                    return jsonify({'error': 'El título no puede estar vacío'}), 400
-                task.titulo = data['titulo'].strip()
+            # Representación de las tareas resultantes, leída antes del commit en una consulta
+            returned_ids = [task_ids[0] for task_ids in created.values()] + [
+                operation.task_id for operation in operations if operation.op in ('update', 'toggle')
+            ]
+            tasks = {}
+            if returned_ids:
+                _, items = task_reader.read_tasks(task_reader.select_tasks().where(Task.id.in_(returned_ids)))
+                tasks = {item['id']: item for item in items}
             
-            if 'descripcion' in data:
-                task.descripcion = data['descripcion'].strip() if data['descripcion'] else None
+            db.session.commit()
             
-            if 'fecha_inicio' in data:
-                try:
-                    task.fecha_inicio = datetime.strptime(data['fecha_inicio'], '%Y-%m-%d').date()
-                except ValueError:
-                    return jsonify({'error': 'Formato de fecha_inicio inválido'}), 400
+            results = []
+            for operation in operations:
+                result = {'index': operation.index, 'op': operation.op, 'status': 200, 'id': operation.task_id}
+                if operation.op == 'create':
+                    task_ids = created[operation.index]
+                    result.update(status=201, id=task_ids[0], count=len(task_ids))
+                if operation.op != 'delete':
+                    result['task'] = tasks[result['id']]
+                results.append(result)
             
-            if 'fecha_fin' in data:
-                try:
-                    task.fecha_fin = datetime.strptime(data['fecha_fin'], '%Y-%m-%d').date()
-                except ValueError:
-                    return jsonify({'error': 'Formato de fecha_fin inválido'}), 400
+            return jsonify({
+                'message': f'{len(results)} operación(es) aplicada(s) exitosamente',
+                'results': results
+            }), 200
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'error': 'Error al aplicar el lote', 'details': str(e)}), 500
+    
+    @staticmethod
+    def preview_recurrence():
+        """Vista previa de una recurrencia: primeras fechas y total, sin crear tareas"""
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data, dict):
+            return jsonify({'error': 'No se enviaron datos'}), 400
+        
+        try:
+            if 'fecha_inicio' not in data:
+                raise ValueError('La fecha de inicio es obligatoria')
+            fecha_inicio = parse_date(data['fecha_inicio'], 'fecha_inicio')
+            fecha_fin = parse_date(data['fecha_fin'], 'fecha_fin') if data.get('fecha_fin') else fecha_inicio
+            if fecha_fin < fecha_inicio:
+                raise ValueError('La fecha de fin debe ser posterior o igual a la fecha de inicio')
+            rule = parse_recurrence(data.get('recurrence') or {}, fecha_inicio, fecha_fin,
+                                    str(data.get('tipo', 'diaria')).lower())
+            try:
+                limit = int(data.get('limit', DEFAULT_PREVIEW_LIMIT))
+            except (TypeError, ValueError):
+                raise ValueError('El parámetro limit debe ser un número entero')
+            if limit < 1 or limit > MAX_PREVIEW_LIMIT:
+                raise ValueError(f'El parámetro limit debe estar entre 1 y {MAX_PREVIEW_LIMIT}')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Solo se generan las fechas pedidas; el total se cuenta sin materializarlas
+        dates = expand(rule, limit)
+        total, capped = count_occurrences(rule, MAX_PREVIEW_TOTAL)
+        
+        return jsonify({
+            'dates': [day.isoformat() for day in dates],
+            'total': total,
+            'total_capped': capped
+        }), 200
+    
+    @staticmethod
+    def update_task(task_id):
+        """Actualizar una tarea existente.
+        
+        La representación de la respuesta se construye antes del commit con
+        los valores en memoria; con Prefer: return=minimal solo se devuelven
+        el id y la versión.
+        """
+        try:
+            data = request.get_json()
+            minimal = 'return=minimal' in _preferences()
+            
+            # Si la respuesta incluye las subtareas y no se reemplazan, se
+            # cargan con la tarea en la misma consulta
+            options = []
+            if not minimal and not (isinstance(data, dict) and 'subtasks' in data):
+                options.append(joinedload(Task.subtasks))
+            task = db.session.get(Task, task_id, options=options)
+            if not task:
+                return jsonify({'error': 'Tarea no encontrada'}), 404
+            
+            # Validar y actualizar campos
+            try:
+                values = parse_task_update(data)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            for name, value in values.items():
+                setattr(task, name, value)
             
             # Validar que fecha_fin >= fecha_inicio
             if task.fecha_fin < task.fecha_inicio:
                 return jsonify({'error': 'La fecha de fin debe ser posterior o igual a la fecha de inicio'}), 400
             
-            if 'hora' in data:
-                if data['hora']:
-                    try:
-                        task.hora = datetime.strptime(data['hora'], '%H:%M:%S').time()
-                    except ValueError:
-                        try:
-                            task.hora = datetime.strptime(data['hora'], '%H:%M').time()
-                        except ValueError:
-                            return jsonify({'error': 'Formato de hora inválido'}), 400
-                else:
-                    task.hora = None
-            
-            if 'completada' in data:
-                task.completada = bool(data['completada'])
-            
-            if 'prioridad' in data:
-                prioridad = data['prioridad'].lower()
-                if prioridad not in ['baja', 'media', 'alta']:
-                    return jsonify({'error': 'Prioridad inválida'}), 400
-                task.prioridad = prioridad
-            
-            if 'tipo' in data:
-                tipo = data['tipo'].lower()
-                if tipo not in ['diaria', 'semanal', 'personalizado']:
-                    return jsonify({'error': 'Tipo inválido'}), 400
-                task.tipo = tipo
-            
-            if 'color' in data:
-                if data['color'] and not data['color'].startswith('#'):
-                    return jsonify({'error': 'Formato de color inválido'}), 400
-                if data['color'] and len(data['color']) not in [4, 7]:
-                    return jsonify({'error': 'Formato de color inválido'}), 400
-                task.color = data['color']
-            
-            # Actualizar subtareas
+            # Actualizar subtareas: solo los cambios respecto a las existentes
+            subtasks = None
             if 'subtasks' in data:
-                from models.subtask import Subtask
-                
-                # Eliminar subtareas existentes
-                Subtask.query.filter_by(task_id=task.id).delete()
-                
-                # Crear nuevas subtareas
-                for subtask_data in data['subtasks']:
-                    if subtask_data.get('titulo'):
-                        new_subtask = Subtask(
-                            task_id=task.id,
-                            titulo=subtask_data['titulo'].strip(),
-                            completada=subtask_data.get('completada', False)
-                        )
-                        db.session.add(new_subtask)
+                subtasks = _sync_subtasks({task.id: parse_subtasks(data, keep_ids=True)})[task.id]
             
             task.updated_at = datetime.now(timezone.utc)
+            if not minimal:
+                result = task.to_dict(include_subtasks=subtasks is None)
+                if subtasks is not None:
+                    result['subtasks'] = subtasks
             db.session.commit()
             
+            if minimal:
+                return _minimal_response(task_id)
             return jsonify({
                 'message': 'Tarea actualizada exitosamente',
-                'task': task.to_dict()
+                'task': result
             }), 200
             
         except SQLAlchemyError as e:
@@ -351,6 +1010,15 @@ class TaskController:
             if not task:
                 return jsonify({'error': 'Tarea no encontrada'}), 404
             
+            Tombstone.record('subtask', [subtask.id for subtask in task.subtasks], task_id=task.id)
+            Tombstone.record('task', [task.id])
+            
+            # En una serie materializada, la fecha queda como excluida para poder restaurarla
+            if task.group_id:
+                series = TaskSeries.query.filter_by(group_id=task.group_id).first()
+                if series and task.fecha_inicio >= series.dtstart:
+                    series.set_excluded(task.fecha_inicio)
+            
             db.session.delete(task)
             db.session.commit()
             
@@ -361,31 +1029,179 @@ class TaskController:
             return jsonify({'error': 'Error al eliminar tarea', 'details': str(e)}), 500
     
     @staticmethod
-    def toggle_task(task_id):
-        """Alternar el estado completada de una tarea"""
+    def update_group(group_id):
+        """Actualizar todas las tareas de un grupo periódico con un solo UPDATE"""
+        try:
+            data = request.get_json()
+            
+            try:
+                count = _update_occurrences([Task.group_id == group_id], data, group_id)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            if not count:
+                db.session.rollback()
+                return jsonify({'error': 'Grupo no encontrado'}), 404
+            
+            db.session.commit()
+            
+            return jsonify({
+                'message': f'{count} tareas del grupo actualizadas exitosamente',
+                'count': count
+            }), 200
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'error': 'Error al actualizar grupo', 'details': str(e)}), 500
+    
+    @staticmethod
+    def update_following(task_id):
+        """Actualizar una ocurrencia y todas las posteriores de su grupo periódico.
+
+        Con split=true las ocurrencias actualizadas pasan a un nuevo group_id.
+        """
         try:
             task = db.session.get(Task, task_id)
             if not task:
                 return jsonify({'error': 'Tarea no encontrada'}), 404
+            if not task.group_id:
+                return jsonify({'error': 'La tarea no pertenece a una serie periódica'}), 400
             
-            task.completada = not task.completada
-            task.updated_at = datetime.now(timezone.utc)
+            data = request.get_json()
+            split = bool(data.pop('split', False)) if isinstance(data, dict) else False
+            new_group_id = str(uuid.uuid4()) if split else None
+            
+            # Rango (group_id, fecha_inicio >= ...) sobre ix_tasks_group_id_fecha_inicio
+            criteria = [Task.group_id == task.group_id, Task.fecha_inicio >= task.fecha_inicio]
+            try:
+                if split:
+                    count = _update_occurrences(criteria, data, task.group_id, group_id=new_group_id)
+                else:
+                    count = _update_occurrences(criteria, data, task.group_id)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            db.session.commit()
+            
+            return jsonify({
+                'message': f'{count} tareas actualizadas exitosamente',
+                'count': count,
+                'group_id': new_group_id or task.group_id
+            }), 200
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'error': 'Error al actualizar tareas', 'details': str(e)}), 500
+    
+    @staticmethod
+    def delete_group(group_id):
+        """Eliminar todas las tareas de un grupo periódico y sus subtareas"""
+        try:
+            group_filter = Task.group_id == group_id
+            group_task_ids = select(Task.id).where(group_filter)
+            
+            # Dejar constancia de los borrados antes de eliminar las filas
+            Tombstone.record_from('subtask', Subtask.id, Subtask.task_id, Subtask.task_id.in_(group_task_ids))
+            Tombstone.record_from('task', Task.id, null(), group_filter)
+            
+            db.session.execute(
+                delete(Subtask).where(Subtask.task_id.in_(group_task_ids)),
+                execution_options={'synchronize_session': False}
+            )
+            result = db.session.execute(
+                delete(Task).where(group_filter),
+                execution_options={'synchronize_session': False}
+            )
+            # Sin la serie el materializador deja de crear ocurrencias
+            db.session.execute(
+                delete(TaskSeries).where(TaskSeries.group_id == group_id),
+                execution_options={'synchronize_session': False}
+            )
+            if not result.rowcount:
+                db.session.rollback()
+                return jsonify({'error': 'Grupo no encontrado'}), 404
+            
+            db.session.commit()
+            
+            return jsonify({
+                'message': f'{result.rowcount} tareas del grupo eliminadas exitosamente',
+                'count': result.rowcount
+            }), 200
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'error': 'Error al eliminar grupo', 'details': str(e)}), 500
+    
+    @staticmethod
+    def toggle_task(task_id):
+        """Alternar el estado completada de una tarea.
+        
+        Un solo UPDATE ... RETURNING invierte el estado y devuelve las
+        columnas de la respuesta; con Prefer: return=minimal no se leen ni
+        las subtareas.
+        """
+        try:
+            row = db.session.execute(
+                update(Task).where(Task.id == task_id)
+                .values(completada=not_(Task.completada), updated_at=utc_now())
+                .returning(*(Task.__table__.c[name] for name in Task.SERIALIZABLE_FIELDS)),
+                execution_options={'synchronize_session': False}
+            ).one_or_none()
+            if row is None:
+                db.session.rollback()
+                return jsonify({'error': 'Tarea no encontrada'}), 404
+            
+            if 'return=minimal' in _preferences():
+                db.session.commit()
+                return _minimal_response(task_id)
+            
+            task, = task_reader.rows_to_dicts([row], subtasks_by_task=task_reader.fetch_subtasks([task_id]))
             db.session.commit()
             
             return jsonify({
                 'message': 'Estado de tarea actualizado',
-                'task': task.to_dict()
+                'task': task
             }), 200
             
         except SQLAlchemyError as e:
             db.session.rollback()
             return jsonify({'error': 'Error al actualizar tarea', 'details': str(e)}), 500
+    
+    @staticmethod
+    def set_completion():
+        """Marcar como completadas (o pendientes) varias tareas con un solo UPDATE.
 
+        Solo se modifican las tareas cuyo estado cambia; el mismo UPDATE
+        actualiza updated_at y devuelve sus ids con RETURNING.
+        """
+        try:
+            try:
+                completada, criteria = _parse_completion(request.get_json(silent=True))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            task_ids = sorted(db.session.scalars(
+                update(Task).where(*criteria, Task.completada != completada)
+                .values(completada=completada, updated_at=utc_now())
+                .returning(Task.id),
+                execution_options={'synchronize_session': False}
+            ).all())
+            db.session.commit()
+            
+            return jsonify({
+                'message': f'{len(task_ids)} tarea(s) actualizada(s)',
+                'completada': completada,
+                'count': len(task_ids),
+                'task_ids': task_ids
+            }), 200
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({'error': 'Error al actualizar tareas', 'details': str(e)}), 500
+    
     @staticmethod
     def toggle_subtask(task_id, subtask_id):
         """Alternar el estado completada de una subtarea"""
         try:
-            from models.subtask import Subtask
             subtask = db.session.get(Subtask, subtask_id)
             
             if not subtask:
@@ -395,6 +1211,7 @@ class TaskController:
                 return jsonify({'error': 'La subtarea no pertenece a la tarea especificada'}), 400
             
             subtask.completada = not subtask.completada
+            subtask.task.updated_at = utc_now()
             db.session.commit()
             
             return jsonify({
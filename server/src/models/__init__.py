@@ -1,2 +1,5 @@
 from .task import Task
-from .subtask import Subtask
\ No newline at end of file
+from .subtask import Subtask
+from .tombstone import Tombstone
+from .task_series import TaskSeries
+from .series_occurrence import SeriesOccurrence
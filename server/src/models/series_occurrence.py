@@ -0,0 +1,18 @@
+from database.db import db
+
+
+class SeriesOccurrence(db.Model):
+    """Estado guardado de una ocurrencia concreta de una TaskSeries.
+
+    Solo existe una fila para las ocurrencias que difieren de la plantilla
+    (p. ej. las completadas); el resto se genera al expandir la regla.
+    """
+    __tablename__ = 'series_occurrences'
+    __table_args__ = (
+        db.UniqueConstraint('series_id', 'fecha', name='uq_series_occurrences_series_id_fecha'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    series_id = db.Column(db.Integer, db.ForeignKey('task_series.id'), nullable=False)
+    fecha = db.Column(db.Date, nullable=False)
+    completada = db.Column(db.Boolean, default=False, nullable=False)
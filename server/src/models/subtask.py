@@ -9,11 +9,15 @@ def utc_now():
 
 class Subtask(db.Model):
     __tablename__ = 'subtasks'
+    # Los ids no se reutilizan: una lápida nunca apunta a una subtarea viva
+    __table_args__ = {'sqlite_autoincrement': True}
     
     id = db.Column(db.Integer, primary_key=True)
-    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
+    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False, index=True)
     titulo = db.Column(db.String(200), nullable=False)
     completada = db.Column(db.Boolean, default=False)
+    # Orden dentro de la lista de la tarea (empates por id)
+    posicion = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=utc_now)
     
     def to_dict(self):
@@ -21,5 +25,6 @@ class Subtask(db.Model):
             'id': self.id,
             'task_id': self.task_id,
             'titulo': self.titulo,
-            'completada': self.completada
+            'completada': self.completada,
+            'posicion': self.posicion
         }
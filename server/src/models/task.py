@@ -1,5 +1,8 @@
 from database.db import db
 from datetime import datetime, timezone
+from sqlalchemy import Float
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 
 
 def utc_now():
@@ -7,8 +10,52 @@ def utc_now():
     return datetime.now(timezone.utc)
 
 
+def isoformat_utc(value):
+    """Serializar un datetime como ISO 8601 en UTC sin zona (como se guarda en la BD)"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+class days_between(FunctionElement):
+    """Días de start a end en SQL (end - start)"""
+    type = Float()
+    name = 'days_between'
+    inherit_cache = True
+
+
+@compiles(days_between)
+def _days_between(element, compiler, **kw):
+    start, end = element.clauses
+    return f'({compiler.process(end, **kw)} - {compiler.process(start, **kw)})'
+
+
+@compiles(days_between, 'sqlite')
+def _days_between_sqlite(element, compiler, **kw):
+    # SQLite guarda las fechas como texto YYYY-MM-DD
+    start, end = element.clauses
+    return f'(julianday({compiler.process(end, **kw)}) - julianday({compiler.process(start, **kw)}))'
+
+
 class Task(db.Model):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Consultas por ventana de fechas (solapamiento fecha_inicio/fecha_fin)
+        db.Index('ix_tasks_fecha_inicio_fecha_fin', 'fecha_inicio', 'fecha_fin'),
+        db.Index('ix_tasks_fecha_fin_fecha_inicio', 'fecha_fin', 'fecha_inicio'),
+        # Paginación por cursor sobre (fecha_inicio, id)
+        db.Index('ix_tasks_fecha_inicio_id', 'fecha_inicio', 'id'),
+        # Operaciones sobre series periódicas
+        db.Index('ix_tasks_group_id_fecha_inicio', 'group_id', 'fecha_inicio'),
+        # Tareas pendientes ordenadas por fecha
+        db.Index('ix_tasks_completada_fecha_inicio', 'completada', 'fecha_inicio'),
+        # Sincronización por deltas (GET /api/tasks/changes)
+        db.Index('ix_tasks_updated_at', 'updated_at'),
+        # Los ids no se reutilizan: una lápida nunca apunta a una tarea viva
+        {'sqlite_autoincrement': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     titulo = db.Column(db.String(200), nullable=False)
@@ -24,20 +71,36 @@ class Task(db.Model):
     created_at = db.Column(db.DateTime, default=utc_now)
     updated_at = db.Column(db.DateTime, default=utc_now, onupdate=utc_now)
     
-    subtasks = db.relationship('Subtask', backref='task', lazy=True, cascade="all, delete-orphan")
+    subtasks = db.relationship('Subtask', backref='task', lazy=True, order_by='(Subtask.posicion, Subtask.id)',
+                               cascade="all, delete-orphan")
+    
+    # Campos que puede devolver to_dict(), en el orden de la respuesta
+    SERIALIZABLE_FIELDS = (
+        'id', 'titulo', 'descripcion', 'fecha_inicio', 'fecha_fin', 'hora',
+        'completada', 'prioridad', 'tipo', 'color', 'group_id', 'updated_at'
+    )
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'titulo': self.titulo,
-            'descripcion': self.descripcion,
-            'fecha_inicio': self.fecha_inicio.isoformat() if self.fecha_inicio else None,
-            'fecha_fin': self.fecha_fin.isoformat() if self.fecha_fin else None,
-            'hora': self.hora.isoformat() if self.hora else None,
-            'completada': self.completada,
-            'prioridad': self.prioridad,
-            'tipo': self.tipo,
-            'color': self.color,
-            'group_id': self.group_id,
-            'subtasks': [subtask.to_dict() for subtask in self.subtasks]
-        }
\ No newline at end of file
+    def to_dict(self, fields=None, include_subtasks=True):
+        """Serializar la tarea.
+
+        fields limita las columnas devueltas (solo se accede a esos atributos,
+        por lo que es compatible con load_only) e include_subtasks controla si
+        se incluye la lista de subtareas.
+        """
+        data = {}
+        for name in fields or self.SERIALIZABLE_FIELDS:
+            value = getattr(self, name)
+            if name in ('fecha_inicio', 'fecha_fin', 'hora'):
+                value = value.isoformat() if value else None
+            elif name == 'updated_at':
+                value = isoformat_utc(value)
+            data[name] = value
+        if include_subtasks:
+            data['subtasks'] = [subtask.to_dict() for subtask in self.subtasks]
+        return data
+
+
+# Duración de cada tarea en días. El índice resuelve MAX(duración) sin recorrer
+# la tabla, y con ella se acota por abajo fecha_inicio en las ventanas de fechas
+TASK_SPAN = days_between(Task.fecha_inicio, Task.fecha_fin)
+db.Index('ix_tasks_duracion', TASK_SPAN)
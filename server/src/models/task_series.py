@@ -0,0 +1,165 @@
+from database.db import db
+from datetime import datetime, timezone, timedelta
+import json
+
+from services.recurrence import RecurrenceRule
+
+
+def utc_now():
+    """Función helper para obtener datetime UTC actual sin warnings de deprecación"""
+    return datetime.now(timezone.utc)
+
+
+class TaskSeries(db.Model):
+    """Regla y plantilla de una tarea periódica.
+
+    Sin group_id es una serie virtual (POST /api/series): las ocurrencias se
+    expanden al consultar /api/series/occurrences y no aparecen en los
+    listados de /api/tasks. Con group_id (POST /api/tasks/ con recurrencia)
+    sus ocurrencias se materializan como tareas de ese grupo en un horizonte
+    móvil.
+    """
+    __tablename__ = 'task_series'
+    __table_args__ = (
+        db.UniqueConstraint('group_id', name='uq_task_series_group_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # Plantilla de las ocurrencias
+    titulo = db.Column(db.String(200), nullable=False)
+    descripcion = db.Column(db.Text, nullable=True)
+    hora = db.Column(db.Time, nullable=True)
+    prioridad = db.Column(db.String(10), default='media')
+    tipo = db.Column(db.String(15), default='diaria')
+    color = db.Column(db.String(7), default='#1976d2')
+    subtasks = db.Column(db.Text, nullable=True)  # JSON: [{"titulo", "completada"}]
+    # Regla de recurrencia
+    frequency = db.Column(db.String(10), nullable=False)
+    interval = db.Column(db.Integer, nullable=False, default=1)
+    weekdays = db.Column(db.String(20), nullable=True)  # "MO,WE,FR"
+    monthdays = db.Column(db.String(90), nullable=True)  # "1,15,31"
+    dtstart = db.Column(db.Date, nullable=False, index=True)
+    until = db.Column(db.Date, nullable=True)
+    count = db.Column(db.Integer, nullable=True)
+    duration = db.Column(db.Integer, nullable=False, default=0)
+    # Fechas excluidas (EXDATE): bit i activo = ocurrencia de dtstart + i días cancelada
+    exdates = db.Column(db.LargeBinary, nullable=True)
+    # Serie materializada como tareas con este group_id (None si es virtual)
+    group_id = db.Column(db.String(36), nullable=True)
+    # Última fecha materializada; None cuando ya no quedan ocurrencias por crear
+    materialized_through = db.Column(db.Date, nullable=True, index=True)
+    created_at = db.Column(db.DateTime, default=utc_now)
+    updated_at = db.Column(db.DateTime, default=utc_now, onupdate=utc_now)
+    
+    occurrences = db.relationship('SeriesOccurrence', backref='series', lazy=True,
+                                  cascade="all, delete-orphan")
+    
+    @property
+    def rule(self):
+        return RecurrenceRule(
+            frequency=self.frequency,
+            interval=self.interval,
+            weekdays=tuple(self.weekdays.split(',')) if self.weekdays else None,
+            monthdays=tuple(int(day) for day in self.monthdays.split(',')) if self.monthdays else None,
+            dtstart=self.dtstart,
+            until=self.until,
+            count=self.count,
+            duration=self.duration
+        )
+    
+    @rule.setter
+    def rule(self, rule):
+        self.frequency = rule.frequency
+        self.interval = rule.interval
+        self.weekdays = ','.join(rule.weekdays) if rule.weekdays else None
+        self.monthdays = ','.join(str(day) for day in rule.monthdays) if rule.monthdays else None
+        self.dtstart = rule.dtstart
+        self.until = rule.until
+        self.count = rule.count
+        self.duration = rule.duration
+    
+    @property
+    def subtask_templates(self):
+        return json.loads(self.subtasks) if self.subtasks else []
+    
+    @subtask_templates.setter
+    def subtask_templates(self, templates):
+        self.subtasks = json.dumps(templates) if templates else None
+    
+    def is_excluded(self, day):
+        """Si la ocurrencia de day está cancelada (O(1), sin expandir la regla)"""
+        offset = (day - self.dtstart).days
+        bitmap = self.exdates or b''
+        return 0 <= offset < len(bitmap) * 8 and bool(bitmap[offset >> 3] & (1 << (offset & 7)))
+    
+    def set_excluded(self, day, excluded=True):
+        """Cancelar (o restaurar) la ocurrencia de day"""
+        offset = (day - self.dtstart).days
+        if offset < 0:
+            raise ValueError('La fecha es anterior al inicio de la serie')
+        bitmap = bytearray(self.exdates or b'')
+        if offset >= len(bitmap) * 8:
+            if not excluded:
+                return
+            bitmap.extend(bytes(offset // 8 + 1 - len(bitmap)))
+        if excluded:
+            bitmap[offset >> 3] |= 1 << (offset & 7)
+        else:
+            bitmap[offset >> 3] &= ~(1 << (offset & 7)) & 0xFF
+        self.exdates = bytes(bitmap.rstrip(b'\0')) or None
+    
+    def excluded_dates(self):
+        """Fechas canceladas, en orden"""
+        bitmap = self.exdates or b''
+        return [
+            self.dtstart + timedelta(days=index * 8 + bit)
+            for index, byte in enumerate(bitmap) if byte
+            for bit in range(8) if byte & (1 << bit)
+        ]
+    
+    def active_dates(self, dates):
+        """Filtrar de dates las ocurrencias canceladas"""
+        if not self.exdates:
+            return list(dates)
+        return [day for day in dates if not self.is_excluded(day)]
+    
+    def occurrence_dict(self, start, completada=False):
+        """Serializar una ocurrencia con el mismo formato que Task.to_dict()"""
+        return {
+            'series_id': self.id,
+            'occurrence_date': start.isoformat(),
+            'titulo': self.titulo,
+            'descripcion': self.descripcion,
+            'fecha_inicio': start.isoformat(),
+            'fecha_fin': (start + timedelta(days=self.duration)).isoformat(),
+            'hora': self.hora.isoformat() if self.hora else None,
+            'completada': completada,
+            'prioridad': self.prioridad,
+            'tipo': self.tipo,
+            'color': self.color,
+            'subtasks': self.subtask_templates
+        }
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'titulo': self.titulo,
+            'descripcion': self.descripcion,
+            'hora': self.hora.isoformat() if self.hora else None,
+            'prioridad': self.prioridad,
+            'tipo': self.tipo,
+            'color': self.color,
+            'subtasks': self.subtask_templates,
+            'group_id': self.group_id,
+            'recurrence': {
+                'frequency': self.frequency,
+                'interval': self.interval,
+                'weekdays': self.weekdays.split(',') if self.weekdays else [],
+                'monthdays': [int(day) for day in self.monthdays.split(',')] if self.monthdays else [],
+                'dtstart': self.dtstart.isoformat(),
+                'until': self.until.isoformat() if self.until else None,
+                'count': self.count,
+                'duration': self.duration,
+                'exdates': [day.isoformat() for day in self.excluded_dates()]
+            }
+        }
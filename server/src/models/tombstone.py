@@ -0,0 +1,61 @@
+from database.db import db
+from datetime import datetime, timezone, timedelta
+
+
+def utc_now():
+    """Función helper para obtener datetime UTC actual sin warnings de deprecación"""
+    return datetime.now(timezone.utc)
+
+
+class Tombstone(db.Model):
+    """Registro de un borrado, para que los clientes puedan sincronizar por deltas"""
+    __tablename__ = 'tombstones'
+    
+    # Tiempo que se conservan los registros de borrado
+    RETENTION = timedelta(days=90)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(10), nullable=False)  # 'task' o 'subtask'
+    entity_id = db.Column(db.Integer, nullable=False)
+    task_id = db.Column(db.Integer, nullable=True)
+    deleted_at = db.Column(db.DateTime, default=utc_now, nullable=False, index=True)
+    
+    @classmethod
+    def record(cls, entity, entity_ids, task_id=None):
+        """Registrar en bloque el borrado de varias entidades y purgar los antiguos"""
+        now = utc_now()
+        rows = [
+            {'entity': entity, 'entity_id': entity_id, 'task_id': task_id, 'deleted_at': now}
+            for entity_id in entity_ids
+        ]
+        if not rows:
+            return
+        db.session.execute(db.insert(cls), rows)
+        cls._purge(now)
+    
+    @classmethod
+    def record_from(cls, entity, entity_id, task_id, *criteria):
+        """Registrar el borrado de las filas que cumplen criteria con un INSERT ... SELECT.
+
+        entity_id y task_id son las expresiones de columna de la tabla borrada
+        (task_id puede ser db.null()); las filas no se cargan en Python.
+        """
+        now = utc_now()
+        rows = db.select(
+            db.literal(entity), entity_id, task_id, db.literal(now, cls.deleted_at.type)
+        ).where(*criteria)
+        db.session.execute(
+            db.insert(cls).from_select(['entity', 'entity_id', 'task_id', 'deleted_at'], rows)
+        )
+        cls._purge(now)
+    
+    @classmethod
+    def _purge(cls, now):
+        db.session.execute(db.delete(cls).where(cls.deleted_at < now - cls.RETENTION))
+    
+    def to_dict(self):
+        return {
+            'entity': self.entity,
+            'id': self.entity_id,
+            'task_id': self.task_id
+        }
@@ -0,0 +1,9 @@
+from flask import Blueprint
+from controllers.job_controller import JobController
+
+job_bp = Blueprint('jobs', __name__)
+
+# Estado de un trabajo en segundo plano (p. ej. una creación con Prefer: respond-async)
+@job_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    return JobController.get_job(job_id)
@@ -0,0 +1,40 @@
+from flask import Blueprint
+from controllers.series_controller import SeriesController
+
+series_bp = Blueprint('series', __name__)
+
+# Crear una serie periódica virtual
+@series_bp.route('/', methods=['POST'])
+@series_bp.route('', methods=['POST'])  # Sin slash también
+def create_series():
+    return SeriesController.create_series()
+
+# Ocurrencias de todas las series en una ventana de fechas
+@series_bp.route('/occurrences', methods=['GET'])
+def get_occurrences():
+    return SeriesController.get_occurrences()
+
+# Obtener una serie por ID
+@series_bp.route('/<int:series_id>', methods=['GET'])
+def get_series(series_id):
+    return SeriesController.get_series(series_id)
+
+# Eliminar una serie
+@series_bp.route('/<int:series_id>', methods=['DELETE'])
+def delete_series(series_id):
+    return SeriesController.delete_series(series_id)
+
+# Alternar estado completada de una ocurrencia
+@series_bp.route('/<int:series_id>/occurrences/<fecha>/toggle', methods=['PATCH'])
+def toggle_occurrence(series_id, fecha):
+    return SeriesController.toggle_occurrence(series_id, fecha)
+
+# Cancelar una ocurrencia (EXDATE)
+@series_bp.route('/<int:series_id>/occurrences/<fecha>', methods=['DELETE'])
+def cancel_occurrence(series_id, fecha):
+    return SeriesController.cancel_occurrence(series_id, fecha)
+
+# Restaurar una ocurrencia cancelada
+@series_bp.route('/<int:series_id>/occurrences/<fecha>/restore', methods=['POST'])
+def restore_occurrence(series_id, fecha):
+    return SeriesController.restore_occurrence(series_id, fecha)
@@ -1,5 +1,6 @@
 from flask import Blueprint
 from controllers.task_controller import TaskController
+from controllers.subtask_controller import SubtaskController
 
 task_bp = Blueprint('task', __name__)
 
@@ -9,6 +10,21 @@ task_bp = Blueprint('task', __name__)
 def get_all_tasks():
     return TaskController.get_all_tasks()
 
+# Cambios desde un token de sincronización (delta sync)
+@task_bp.route('/changes', methods=['GET'])
+def get_changes():
+    return TaskController.get_changes()
+
+# Tareas pendientes ordenadas por fecha y hora
+@task_bp.route('/pending', methods=['GET'])
+def get_pending_tasks():
+    return TaskController.get_pending_tasks()
+
+# Tareas de un día concreto
+@task_bp.route('/date/<fecha>', methods=['GET'])
+def get_tasks_by_date(fecha):
+    return TaskController.get_tasks_by_date(fecha)
+
 # Obtener una tarea por ID
 @task_bp.route('/<int:task_id>', methods=['GET'])
 def get_task(task_id):
@@ -20,6 +36,16 @@ def get_task(task_id):
 def create_task():
     return TaskController.create_task()
 
+# Lote de operaciones create/update/delete/toggle en una transacción
+@task_bp.route('/batch', methods=['POST'])
+def batch_tasks():
+    return TaskController.batch_tasks()
+
+# Vista previa de las fechas de una recurrencia
+@task_bp.route('/recurrence/preview', methods=['POST'])
+def preview_recurrence():
+    return TaskController.preview_recurrence()
+
 # Actualizar una tarea
 @task_bp.route('/<int:task_id>', methods=['PUT'])
 def update_task(task_id):
@@ -30,12 +56,57 @@ def update_task(task_id):
 def delete_task(task_id):
     return TaskController.delete_task(task_id)
 
+# Actualizar todas las tareas de un grupo periódico
+@task_bp.route('/group/<group_id>', methods=['PUT', 'PATCH'])
+def update_group(group_id):
+    return TaskController.update_group(group_id)
+
+# Actualizar una ocurrencia y las siguientes de su grupo periódico
+@task_bp.route('/<int:task_id>/following', methods=['PUT', 'PATCH'])
+def update_following(task_id):
+    return TaskController.update_following(task_id)
+
+# Eliminar todas las tareas de un grupo periódico
+@task_bp.route('/group/<group_id>', methods=['DELETE'])
+def delete_group(group_id):
+    return TaskController.delete_group(group_id)
+
 # Alternar estado completada
 @task_bp.route('/<int:task_id>/toggle', methods=['PATCH'])
 def toggle_task(task_id):
     return TaskController.toggle_task(task_id)
 
+# Marcar varias tareas (ids o un día) como completadas o pendientes
+@task_bp.route('/completion', methods=['PATCH'])
+def set_completion():
+    return TaskController.set_completion()
+
 # Alternar estado completada de una subtarea
 @task_bp.route('/<int:task_id>/subtasks/<int:subtask_id>/toggle', methods=['PATCH'])
 def toggle_subtask(task_id, subtask_id):
-    return TaskController.toggle_subtask(task_id, subtask_id)
\ No newline at end of file
+    return TaskController.toggle_subtask(task_id, subtask_id)
+
+# Añadir una subtarea al final de la lista
+@task_bp.route('/<int:task_id>/subtasks', methods=['POST'])
+def create_subtask(task_id):
+    return SubtaskController.create_subtask(task_id)
+
+# Actualizar título o estado de una subtarea
+@task_bp.route('/<int:task_id>/subtasks/<int:subtask_id>', methods=['PATCH'])
+def update_subtask(task_id, subtask_id):
+    return SubtaskController.update_subtask(task_id, subtask_id)
+
+# Eliminar una subtarea
+@task_bp.route('/<int:task_id>/subtasks/<int:subtask_id>', methods=['DELETE'])
+def delete_subtask(task_id, subtask_id):
+    return SubtaskController.delete_subtask(task_id, subtask_id)
+
+# Marcar todas las subtareas como completadas o pendientes
+@task_bp.route('/<int:task_id>/subtasks/completion', methods=['PATCH'])
+def set_subtasks_completion(task_id):
+    return SubtaskController.set_completion(task_id)
+
+# Reordenar las subtareas de una tarea
+@task_bp.route('/<int:task_id>/subtasks/order', methods=['PUT'])
+def reorder_subtasks(task_id):
+    return SubtaskController.reorder_subtasks(task_id)
@@ -0,0 +1,108 @@
+"""Trabajos en segundo plano para las peticiones con Prefer: respond-async.
+
+La petición se valida en el hilo HTTP y el trabajo se encola en un pool de
+un solo hilo (SQLite admite un único escritor a la vez). El estado de cada
+trabajo se guarda en memoria y se consulta con GET /api/jobs/<id>; los
+trabajos terminados se descartan tras JOB_RETENTION.
+"""
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+
+from database.db import db
+from models.task import isoformat_utc
+
+logger = logging.getLogger(__name__)
+
+# Tiempo que se conserva el estado de un trabajo terminado
+JOB_RETENTION = timedelta(hours=1)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='task-jobs')
+_jobs = {}
+_lock = threading.Lock()
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+class Job:
+    """Estado de un trabajo: pending -> running -> done | failed"""
+    
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = 'pending'
+        self.total = None
+        self.task_ids = []
+        self.error = None
+        self.created_at = utc_now()
+        self.finished_at = None
+        self._finished = threading.Event()
+    
+    def add_task_ids(self, task_ids):
+        """Registrar las tareas creadas (ya confirmadas) por un lote"""
+        with _lock:
+            self.task_ids.extend(task_ids)
+    
+    def wait(self, timeout=None):
+        """Esperar a que el trabajo termine. Devuelve False si vence el timeout."""
+        return self._finished.wait(timeout)
+    
+    def _finish(self, status, error=None):
+        with _lock:
+            self.status = status
+            self.error = error
+            self.finished_at = utc_now()
+        self._finished.set()
+    
+    def to_dict(self):
+        with _lock:
+            return {
+                'id': self.id,
+                'status': self.status,
+                'total': self.total,
+                'done': len(self.task_ids),
+                'task_ids': list(self.task_ids),
+                'error': self.error,
+                'created_at': isoformat_utc(self.created_at),
+                'finished_at': isoformat_utc(self.finished_at)
+            }
+
+
+def submit(app, func, *args):
+    """Encolar func(job, *args), que se ejecuta dentro de un contexto de la app"""
+    job = Job()
+    with _lock:
+        _purge()
+        _jobs[job.id] = job
+    
+    def run():
+        with app.app_context():
+            with _lock:
+                job.status = 'running'
+            try:
+                func(job, *args)
+                job._finish('done')
+            except Exception as e:
+                db.session.rollback()
+                logger.exception('Error en el trabajo %s', job.id)
+                job._finish('failed', str(e))
+            finally:
+                db.session.remove()
+    
+    _executor.submit(run)
+    return job
+
+
+def get(job_id):
+    """Trabajo por id (None si no existe o ya se descartó)"""
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def _purge():
+    limit = utc_now() - JOB_RETENTION
+    for job_id in [job_id for job_id, job in _jobs.items() if job.finished_at and job.finished_at < limit]:
+        del _jobs[job_id]
@@ -0,0 +1,209 @@
+"""Materialización de las tareas periódicas en un horizonte móvil.
+
+Una recurrencia creada con POST /api/tasks/ guarda su regla en una
+TaskSeries con group_id y solo se materializa como filas de tasks hasta
+MATERIALIZE_HORIZON_DAYS días después de hoy. Un hilo en segundo plano
+extiende periódicamente las series abiertas, en lotes pequeños y fuera del
+hilo de las peticiones, de modo que las series sin fin siguen generando
+tareas sin llenar la tabla.
+"""
+import logging
+import threading
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+from database.db import db
+from models.task import Task
+from models.subtask import Subtask
+from models.task_series import TaskSeries
+from services import task_reader
+from services.recurrence import occurrences_between, has_occurrences_after
+
+logger = logging.getLogger(__name__)
+
+# Valores por defecto de la configuración de la app
+DEFAULT_HORIZON_DAYS = 90
+DEFAULT_BACKFILL_DAYS = 90
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_INTERVAL_SECONDS = 60
+
+# Serializa la extensión de una serie entre el hilo del materializador y los
+# trabajos asíncronos de creación: quien lo tiene lee materialized_through,
+# inserta el lote y hace commit sin que el otro hilo extienda la misma serie
+materialize_lock = threading.Lock()
+
+
+def horizon_end(config, start=None):
+    """Último día que debe estar materializado (contado desde hoy o desde start si es posterior)"""
+    days = config.get('MATERIALIZE_HORIZON_DAYS', DEFAULT_HORIZON_DAYS)
+    anchor = max(date.today(), start) if start else date.today()
+    return anchor + timedelta(days=days)
+
+
+def backfill_start(config, rule):
+    """Primer día que se materializa de una serie nueva.
+
+    Una serie sin fin (sin count ni until) no crea tareas anteriores a
+    MATERIALIZE_BACKFILL_DAYS días antes de hoy: con una fecha de inicio muy
+    antigua no se rellena todo el pasado. Las series con count o until ya
+    tienen un número acotado de ocurrencias y empiezan en dtstart.
+    """
+    if rule.count or rule.until:
+        return rule.dtstart
+    days = config.get('MATERIALIZE_BACKFILL_DAYS', DEFAULT_BACKFILL_DAYS)
+    return max(rule.dtstart, date.today() - timedelta(days=days))
+
+
+def initial_through(config, rule):
+    """Hasta dónde materializar una serie nueva: el horizonte desde dtstart o,
+    si la primera ocurrencia cae más allá, hasta esa ocurrencia"""
+    through = horizon_end(config, rule.dtstart)
+    first = occurrences_between(rule._replace(duration=0), backfill_start(config, rule), date.max, limit=1)
+    return max(through, first[0]) if first else through
+
+
+def insert_occurrences(fields, dates, duration, group_id, subtasks_data):
+    """Insertar una tarea por fecha con sus subtareas, con INSERT masivos.
+
+    fields son los valores comunes de las columnas de Task. Devuelve las
+    tareas creadas ordenadas por fecha_inicio, como los diccionarios de
+    Task.to_dict(include_subtasks=False) construidos con RETURNING. La
+    primera, que es la que devuelve POST /api/tasks/, incluye además sus
+    subtareas; así la respuesta no tiene que volver a leer nada.
+    """
+    rows = []
+    for task_start in dates:
+        # Validar que la fecha no cause overflow
+        try:
+            task_end = task_start + timedelta(days=duration)
+        except OverflowError:
+            continue  # Saltar esta fecha si causa overflow
+        rows.append(dict(fields, fecha_inicio=task_start, fecha_fin=task_end, group_id=group_id))
+    if not rows:
+        return []
+    
+    # RETURNING no garantiza el orden de las filas en SQLite: se ordenan por
+    # fecha_inicio, que es única dentro de la serie
+    created = db.session.execute(
+        insert(Task).returning(*(Task.__table__.c[name] for name in Task.SERIALIZABLE_FIELDS)), rows
+    ).all()
+    created.sort(key=lambda row: row.fecha_inicio)
+    tasks = task_reader.rows_to_dicts(created)
+    
+    # Las subtareas de la primera tarea con RETURNING para su representación;
+    # las del resto en un único INSERT sin RETURNING, que es mucho más rápido
+    tasks[0]['subtasks'] = []
+    if subtasks_data:
+        first_rows = db.session.execute(insert(Subtask).returning(*task_reader.SUBTASK_COLUMNS), [
+            dict(subtask_data, task_id=tasks[0]['id'], posicion=posicion)
+            for posicion, subtask_data in enumerate(subtasks_data)
+        ]).all()
+        tasks[0]['subtasks'] = [
+            task_reader.subtask_to_dict(row) for row in sorted(first_rows, key=lambda row: row.posicion)
+        ]
+        if len(tasks) > 1:
+            db.session.execute(insert(Subtask), [
+                dict(subtask_data, task_id=task['id'], posicion=posicion)
+                for task in tasks[1:] for posicion, subtask_data in enumerate(subtasks_data)
+            ])
+    return tasks
+
+
+def materialize(series, through, limit, completada=False):
+    """Crear las tareas de la serie posteriores a materialized_through hasta through.
+
+    Crea como máximo limit ocurrencias y actualiza materialized_through
+    (None cuando la regla ya no tiene más ocurrencias). Devuelve las tareas
+    creadas (ver insert_occurrences()). No hace commit.
+    """
+    rule = series.rule
+    start = series.materialized_through + timedelta(days=1) if series.materialized_through else rule.dtstart
+    # Solo se generan las primeras fechas de la ventana, no toda la ventana hasta
+    # through; se piden más si las canceladas dejan el lote incompleto
+    wanted = limit + 1
+    while True:
+        candidates = occurrences_between(rule._replace(duration=0), start, through, wanted) if start <= through else ()
+        dates = series.active_dates(candidates)
+        if len(dates) > limit or len(candidates) < wanted:
+            break
+        wanted *= 2
+    
+    if len(dates) > limit:
+        dates = dates[:limit]
+        series.materialized_through = dates[-1]
+    elif not has_occurrences_after(rule, max(through, start)):
+        # La regla terminó (count o until): no hay nada más que extender
+        series.materialized_through = None
+    else:
+        series.materialized_through = max(through, start - timedelta(days=1))
+    
+    return insert_occurrences(
+        template_fields(series, completada), dates, rule.duration, series.group_id, series.subtask_templates
+    )
+
+
+def template_fields(series, completada=False):
+    """Valores comunes de las columnas de Task para las ocurrencias de la serie"""
+    return {
+        'titulo': series.titulo,
+        'descripcion': series.descripcion,
+        'hora': series.hora,
+        'completada': completada,
+        'prioridad': series.prioridad,
+        'tipo': series.tipo,
+        'color': series.color,
+    }
+
+
+def extend_due_series(config):
+    """Una pasada del materializador: extender un lote de cada serie pendiente.
+
+    Cada serie se confirma en su propia transacción para no bloquear la base
+    de datos durante toda la pasada. Devuelve el número de tareas creadas.
+    """
+    through = horizon_end(config)
+    batch_size = config.get('MATERIALIZE_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    due_ids = db.session.scalars(
+        db.select(TaskSeries.id)
+        .where(TaskSeries.group_id.isnot(None), TaskSeries.materialized_through < through)
+        .order_by(TaskSeries.materialized_through)
+    ).all()
+    
+    created = 0
+    for series_id in due_ids:
+        with materialize_lock:
+            series = db.session.get(TaskSeries, series_id)
+            if series is None:  # Eliminada durante la pasada
+                continue
+            created += len(materialize(series, through, batch_size))
+            db.session.commit()
+    return created
+
+
+def run_pending(app):
+    """Extender las series hasta que no quede trabajo pendiente"""
+    with app.app_context():
+        try:
+            while extend_due_series(app.config):
+                pass
+        except Exception:
+            db.session.rollback()
+            logger.exception('Error al materializar tareas periódicas')
+        finally:
+            db.session.remove()
+
+
+def start_materializer(app):
+    """Arrancar el hilo en segundo plano del materializador"""
+    interval = app.config.get('MATERIALIZER_INTERVAL_SECONDS', DEFAULT_INTERVAL_SECONDS)
+    stop = threading.Event()
+    
+    def loop():
+        while not stop.is_set():
+            run_pending(app)
+            stop.wait(interval)
+    
+    thread = threading.Thread(target=loop, name='task-materializer', daemon=True)
+    thread.start()
+    return stop
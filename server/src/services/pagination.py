@@ -0,0 +1,55 @@
+"""Paginación por cursor (keyset) para los listados de tareas.
+
+El cursor es opaco para el cliente: codifica en base64 los valores de las
+columnas de ordenación de la última fila devuelta. La página siguiente se
+obtiene con una comparación de tuplas sobre esas columnas, que el motor
+resuelve con un index seek en lugar de recorrer un OFFSET.
+"""
+import base64
+import binascii
+import json
+
+from sqlalchemy import tuple_
+
+MAX_PAGE_SIZE = 500
+
+
+def parse_limit(value):
+    """Validar el parámetro limit. Devuelve None si no se envió."""
+    if value in (None, ''):
+        return None
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('El parámetro limit debe ser un número entero')
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f'El parámetro limit debe estar entre 1 y {MAX_PAGE_SIZE}')
+    return limit
+
+
+def encode_cursor(values):
+    """Codificar los valores de ordenación de una fila como cursor opaco"""
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, parsers):
+    """Decodificar un cursor aplicando un parser por columna de ordenación.
+
+    Lanza ValueError si el cursor está corrupto o no corresponde al orden.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise ValueError('Cursor inválido')
+
+
+def apply_keyset(query, columns, values, descending=True):
+    """Filtrar las filas posteriores al cursor según el orden de columns"""
+    key = tuple_(*columns)
+    bound = tuple_(*values)
+    return query.filter(key < bound if descending else key > bound)
@@ -0,0 +1,341 @@
+"""Reglas de recurrencia de las tareas periódicas.
+
+parse_recurrence() normaliza el objeto recurrence que envía el cliente en
+una RecurrenceRule inmutable. Las reglas diarias, semanales y mensuales se
+expanden con recurrence_engine (aritmética de ordinales); el resto con el
+rrule de dateutil que construye to_rrule().
+
+Las expansiones (expand() y occurrences_between()) se memorizan en una
+caché LRU acotada en entradas y en número total de fechas, con la regla
+normalizada como clave: vistas previas, listados de series y toggles de
+ocurrencias con la misma regla no vuelven a expandir la regla. El
+materializador, cuyas ventanas no se repiten, no pasa por la caché.
+"""
+import threading
+from calendar import monthrange
+from collections import namedtuple, OrderedDict
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+
+from dateutil.rrule import rrule, DAILY, WEEKLY, MONTHLY, YEARLY, MO, TU, WE, TH, FR, SA, SU
+
+from services import recurrence_engine
+from services.validation import parse_date
+
+FREQUENCIES = {
+    'daily': DAILY,
+    'weekly': WEEKLY,
+    'monthly': MONTHLY,
+    'yearly': YEARLY
+}
+
+WEEKDAYS = {'MO': MO, 'TU': TU, 'WE': WE, 'TH': TH, 'FR': FR, 'SA': SA, 'SU': SU}
+
+# Regla normalizada: dtstart/until son date, weekdays una tupla de códigos
+# ('MO', 'WE', ...) o None, monthdays una tupla de días del mes (1-31) o None
+# y duration los días que dura cada ocurrencia
+RecurrenceRule = namedtuple(
+    'RecurrenceRule',
+    ['frequency', 'interval', 'weekdays', 'monthdays', 'dtstart', 'until', 'count', 'duration']
+)
+
+
+def parse_recurrence(recurrence, fecha_inicio, fecha_fin, tipo):
+    """Normalizar el payload recurrence de una tarea. Lanza ValueError."""
+    if not isinstance(recurrence, dict):
+        raise ValueError('recurrence debe ser un objeto')
+    frequency = recurrence.get('frequency', 'daily')
+    if frequency not in FREQUENCIES:
+        raise ValueError('Frecuencia inválida. Debe ser: daily, weekly, monthly o yearly')
+
+    try:
+        interval = int(recurrence.get('interval', 1))
+    except (TypeError, ValueError):
+        raise ValueError('El intervalo de recurrencia debe ser un número entero')
+    if interval < 1:
+        raise ValueError('El intervalo de recurrencia debe ser mayor que 0')
+
+    # Días de la semana para semanal
+    # NOTA: Para tareas de tipo "semanal", NO usar weekdays del frontend
+    # Las tareas semanales siempre se repiten comenzando el lunes
+    weekdays = None
+    if frequency == 'weekly' and tipo == 'semanal':
+        weekdays = ('MO',)
+    elif frequency == 'weekly' and recurrence.get('weekdays'):
+        weekdays = tuple(day for day in recurrence['weekdays'] if day in WEEKDAYS) or None
+
+    # Días del mes para mensual (los días que no existen en un mes se ajustan al último)
+    monthdays = None
+    if frequency == 'monthly' and recurrence.get('monthdays'):
+        try:
+            monthdays = tuple(sorted({int(day) for day in recurrence['monthdays']}))
+        except (TypeError, ValueError):
+            raise ValueError('Los días del mes deben ser números enteros')
+        if monthdays[0] < 1 or monthdays[-1] > 31:
+            raise ValueError('Los días del mes deben estar entre 1 y 31')
+
+    # Para tareas semanales con recurrencia, forzar inicio en lunes
+    if tipo == 'semanal':
+        # Ajustar fecha_inicio al lunes de esa semana
+        fecha_inicio = fecha_inicio - timedelta(days=fecha_inicio.weekday())
+        # La fecha_fin es el domingo de esa semana (6 días después del lunes)
+        fecha_fin = fecha_inicio + timedelta(days=6)
+
+    # Fecha fin o conteo
+    until = None
+    count = None
+    if recurrence.get('endType') == 'date' and recurrence.get('endDate'):
+        try:
+            until = parse_date(recurrence['endDate'], 'endDate')
+        except ValueError:
+            pass
+    elif recurrence.get('endType') == 'count' and recurrence.get('count'):
+        try:
+            count = int(recurrence['count'])
+        except (TypeError, ValueError):
+            raise ValueError('El número de repeticiones debe ser un número entero')
+        if count < 1:
+            raise ValueError('El número de repeticiones debe ser mayor que 0')
+
+    return RecurrenceRule(
+        frequency=frequency,
+        interval=interval,
+        weekdays=weekdays,
+        monthdays=monthdays,
+        dtstart=fecha_inicio,
+        until=until,
+        count=count,
+        # Duración de la tarea original (mínimo 0 días)
+        duration=max(0, (fecha_fin - fecha_inicio).days)
+    )
+
+
+def to_rrule(rule):
+    """Construir el rrule de dateutil de una regla (rrule usa datetime, no date)"""
+    rule_kwargs = {
+        'freq': FREQUENCIES[rule.frequency],
+        'interval': rule.interval,
+        'dtstart': datetime.combine(rule.dtstart, time.min),
+    }
+    if rule.weekdays:
+        rule_kwargs['byweekday'] = [WEEKDAYS[day] for day in rule.weekdays]
+    if rule.until:
+        rule_kwargs['until'] = datetime.combine(rule.until, time.max)
+    if rule.count:
+        rule_kwargs['count'] = rule.count
+    return rrule(**rule_kwargs)
+
+
+# Número máximo de expansiones guardadas en cada caché
+EXPANSION_CACHE_SIZE = 256
+# Número máximo de fechas guardadas entre todas las expansiones de una caché
+MAX_CACHED_DATES = 100_000
+
+
+class _ExpansionCache:
+    """Caché LRU de una función de expansión, acotada por entradas y por fechas.
+
+    lru_cache solo limita el número de entradas, y una sola expansión puede
+    tener cientos de miles de fechas. Aquí se descartan las menos usadas
+    hasta que el total de fechas guardadas no pasa de max_dates, y las
+    expansiones que por sí solas lo superan no se guardan.
+    """
+    
+    def __init__(self, function, maxsize, max_dates):
+        self.function = function
+        self.maxsize = maxsize
+        self.max_dates = max_dates
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._dates = 0
+        self._lock = threading.Lock()
+    
+    def __call__(self, *key):
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+        value = self.function(*key)
+        if len(value) <= self.max_dates:
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = value
+                    self._dates += len(value)
+                    while len(self._entries) > self.maxsize or self._dates > self.max_dates:
+                        self._dates -= len(self._entries.popitem(last=False)[1])
+        return value
+    
+    def info(self):
+        return {
+            'hits': self.hits, 'misses': self.misses, 'size': len(self._entries),
+            'maxsize': self.maxsize, 'dates': self._dates, 'max_dates': self.max_dates
+        }
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dates = 0
+            self.hits = self.misses = 0
+
+
+def _cache_key(rule):
+    """La duración no cambia las fechas de inicio: no forma parte de la clave"""
+    return rule._replace(duration=0)
+
+
+def _first_dates(rule, limit):
+    if recurrence_engine.supports(rule):
+        return recurrence_engine.dates(rule, recurrence_engine.MAX_ORDINAL, limit=limit)
+    return tuple(dt.date() for dt in islice(to_rrule(rule), limit))
+
+
+# Días que cubre como mucho un periodo de cada frecuencia (con interval 1)
+PERIOD_DAYS = {'daily': 1, 'weekly': 7, 'monthly': 31, 'yearly': 366}
+
+
+def _window(rule, after, before):
+    if recurrence_engine.supports(rule):
+        return recurrence_engine.dates(rule, before.toordinal(), start=after)
+    return tuple(
+        dt.date() for dt in to_rrule(rule).between(
+            datetime.combine(after, time.min), datetime.combine(before, time.max), inc=True
+        )
+    )
+
+
+_expand = _ExpansionCache(_first_dates, EXPANSION_CACHE_SIZE, MAX_CACHED_DATES)
+_between = _ExpansionCache(_window, EXPANSION_CACHE_SIZE, MAX_CACHED_DATES)
+
+
+def expand(rule, limit):
+    """Las primeras limit fechas de inicio de la regla (tupla de date)"""
+    return _expand(_cache_key(rule), limit)
+
+
+def occurrences_between(rule, window_from, window_to, limit=None):
+    """Fechas de inicio de las ocurrencias que se solapan con [window_from, window_to].
+
+    Solo se generan las fechas de la ventana (ajustada por la duración de
+    cada ocurrencia), nunca la serie completa. Con limit se devuelven las
+    primeras limit fechas sin pasar por la caché: la ventana se recorre en
+    tramos que duplican su tamaño, así que el coste depende de limit y no
+    de lo larga que sea la ventana.
+    """
+    after = window_from - timedelta(days=rule.duration)
+    if limit is None:
+        return _between(_cache_key(rule), after, window_to)
+    
+    key = _cache_key(rule)
+    remaining = (window_to - after).days
+    step = limit * PERIOD_DAYS[rule.frequency] * rule.interval
+    while True:
+        before = window_to if step >= remaining else after + timedelta(days=step)
+        dates = _window(key, after, before)
+        if len(dates) >= limit or before == window_to:
+            return dates[:limit]
+        step *= 2
+
+
+def count_occurrences(rule, cap):
+    """Número total de ocurrencias de la regla, sin generar sus fechas.
+
+    Devuelve (total, capped): total es None si la regla no tiene fin, y
+    capped indica que hay más de cap ocurrencias (total == cap).
+    """
+    if not rule.until and not rule.count:
+        return None, False
+    if not rule.until:
+        # Sin fecha fin la regla nunca se agota antes de count
+        total = rule.count
+    else:
+        total = _count_until(rule._replace(count=None), cap)
+        if rule.count:
+            total = min(total, rule.count)
+    return min(total, cap), total > cap
+
+
+def _count_until(rule, cap):
+    """Ocurrencias de una regla sin count hasta until.
+
+    Las reglas diarias y semanales son progresiones aritméticas, y las
+    mensuales cuyo intervalo divide a 12 repiten los mismos meses cada año:
+    su total se calcula directamente. El resto se cuenta como mucho hasta
+    cap + 1.
+    """
+    first, stop = rule.dtstart.toordinal(), rule.until.toordinal()
+    if stop < first:
+        return 0
+    if rule.frequency == 'daily':
+        return (stop - first) // rule.interval + 1
+    if rule.frequency == 'weekly':
+        step = 7 * rule.interval
+        monday = first - rule.dtstart.weekday()
+        weekdays = {recurrence_engine.WEEKDAY_INDEX[day] for day in rule.weekdays} if rule.weekdays \
+            else {rule.dtstart.weekday()}
+        starts = [monday + day if monday + day >= first else monday + day + step for day in weekdays]
+        return sum((stop - start) // step + 1 for start in starts if start <= stop)
+    if rule.frequency == 'monthly' and 12 % rule.interval == 0 and rule.until.year - rule.dtstart.year >= 2:
+        return _count_monthly_until(rule)
+    if recurrence_engine.supports(rule):
+        return len(recurrence_engine.ordinals(rule, stop, limit=cap + 1))
+    return sum(1 for _ in islice(to_rrule(rule), cap + 1))
+
+
+def _count_monthly_until(rule):
+    """Ocurrencias hasta until de una regla mensual cuyo intervalo divide a 12.
+
+    El primer y el último año se expanden con el motor; los años intermedios
+    tienen las mismas ocurrencias salvo febrero en los bisiestos.
+    """
+    def per_month(length):
+        if rule.monthdays:
+            return len({min(day, length) for day in rule.monthdays})
+        return 1 if rule.dtstart.day <= length else 0
+    
+    first_year, last_year = rule.dtstart.year + 1, rule.until.year - 1
+    total = len(recurrence_engine.ordinals(rule, date(first_year - 1, 12, 31).toordinal()))
+    total += len(recurrence_engine.ordinals(rule, rule.until.toordinal(), start=date(last_year + 1, 1, 1)))
+    
+    # Meses del año en los que cae la regla (1-12)
+    months = [month for month in range(1, 13) if (month - rule.dtstart.month) % rule.interval == 0]
+    years = last_year - first_year + 1
+    total += years * sum(per_month(monthrange(2001, month)[1]) for month in months)
+    if 2 in months:
+        leap_years = _leap_years_until(last_year) - _leap_years_until(first_year - 1)
+        total += leap_years * (per_month(29) - per_month(28))
+    return total
+
+
+def _leap_years_until(year):
+    """Número de años bisiestos entre el año 1 y year (inclusive)"""
+    return year // 4 - year // 100 + year // 400
+
+
+def has_occurrences_after(rule, day):
+    """Si la regla tiene alguna ocurrencia posterior a day"""
+    if not rule.until and not rule.count:
+        return True
+    if not recurrence_engine.supports(rule):
+        return to_rrule(rule).after(datetime.combine(day, time.max)) is not None
+    open_rule = rule._replace(count=None)
+    if rule.count:
+        # Basta con contar las ocurrencias hasta day, sin pasar de count
+        if len(recurrence_engine.ordinals(open_rule, day.toordinal(), limit=rule.count)) >= rule.count:
+            return False
+        if not rule.until:
+            return True
+    return bool(recurrence_engine.ordinals(open_rule, rule.until.toordinal(), start=day + timedelta(days=1)))
+
+
+def cache_info():
+    """Aciertos, fallos y ocupación de las cachés de expansión"""
+    return {'expand': _expand.info(), 'between': _between.info()}
+
+
+def cache_clear():
+    """Vaciar las cachés de expansión"""
+    _expand.clear()
+    _between.clear()
@@ -0,0 +1,114 @@
+"""Expansión de reglas de recurrencia con aritmética de ordinales de fecha.
+
+Las fechas se manejan como ordinales enteros (date.toordinal()): una regla
+diaria o semanal es una progresión aritmética que se genera con range(), y
+una regla mensual solo necesita calcular el primer día de cada mes. No se
+evalúa la regla fecha a fecha como hace rrule, y cuando la regla no tiene
+count se salta directamente al inicio de la ventana pedida.
+
+Soporta las frecuencias daily, weekly (con o sin weekdays) y monthly (con o
+sin monthdays). Con monthdays, los días que no existen en un mes se ajustan
+al último día del mes (31 -> 30 de abril, 28/29 de febrero). Sin monthdays se
+mantiene la semántica de rrule: los meses sin ese día se omiten.
+"""
+from bisect import bisect_left
+from calendar import monthrange
+from datetime import date, MAXYEAR
+from itertools import chain
+
+WEEKDAY_INDEX = {'MO': 0, 'TU': 1, 'WE': 2, 'TH': 3, 'FR': 4, 'SA': 5, 'SU': 6}
+
+MAX_ORDINAL = date.max.toordinal()
+
+
+def supports(rule):
+    """Si la regla se puede expandir con este motor (el resto usa rrule)"""
+    return rule.frequency in ('daily', 'weekly', 'monthly')
+
+
+def ordinals(rule, stop, start=None, limit=None):
+    """Ordinales de las ocurrencias de la regla entre start y stop (inclusive).
+
+    Respeta until y count (contados siempre desde dtstart). limit corta la
+    lista tras las primeras limit ocurrencias desde dtstart.
+    """
+    first = rule.dtstart.toordinal()
+    if rule.until:
+        stop = min(stop, rule.until.toordinal())
+    count = min(n for n in (rule.count, limit) if n) if (rule.count or limit) else None
+    # Con count hay que contar desde dtstart; sin él se salta a la ventana
+    skip_to = start.toordinal() if start and not count else None
+
+    if rule.frequency == 'daily':
+        result = _daily(first, stop, rule.interval, count, skip_to)
+    elif rule.frequency == 'weekly':
+        result = _weekly(rule, first, stop, count, skip_to)
+    else:
+        result = _monthly(rule, first, stop, count, skip_to)
+
+    if count:
+        result = result[:count]
+    if start:
+        result = result[bisect_left(result, start.toordinal()):]
+    return result
+
+
+def dates(rule, stop, start=None, limit=None):
+    """Como ordinals(), pero devuelve una tupla de date"""
+    return tuple(map(date.fromordinal, ordinals(rule, stop, start, limit)))
+
+
+def _daily(first, stop, interval, count, skip_to):
+    if count:
+        stop = min(stop, first + (count - 1) * interval)
+    if skip_to and skip_to > first:
+        # Primer múltiplo del intervalo a partir de skip_to
+        first += -(-(skip_to - first) // interval) * interval
+    return list(range(first, stop + 1, interval))
+
+
+def _weekly(rule, first, stop, count, skip_to):
+    step = 7 * rule.interval
+    weekdays = sorted({WEEKDAY_INDEX[day] for day in rule.weekdays}) if rule.weekdays else [rule.dtstart.weekday()]
+    monday = first - rule.dtstart.weekday()
+    if count:
+        # Cada periodo aporta len(weekdays) fechas; uno más por el periodo inicial incompleto
+        stop = min(stop, monday + (count // len(weekdays) + 1) * step + 6)
+    if skip_to and skip_to > monday + step:
+        # Saltar periodos completos anteriores a la ventana
+        monday += (skip_to - monday) // step * step
+    starts = [monday + day if monday + day >= first else monday + day + step for day in weekdays]
+    return sorted(chain.from_iterable(range(day, stop + 1, step) for day in starts))
+
+
+def _monthly(rule, first, stop, count, skip_to):
+    year, month = rule.dtstart.year, rule.dtstart.month
+    if skip_to and skip_to > first:
+        # Saltar meses completos (múltiplos del intervalo) anteriores a la ventana
+        target = date.fromordinal(skip_to)
+        months = (target.year - year) * 12 + target.month - month
+        months -= months % rule.interval
+        year, month = year + (month - 1 + months) // 12, (month - 1 + months) % 12 + 1
+
+    result = []
+    while year <= MAXYEAR:
+        month_start = date(year, month, 1).toordinal()
+        if month_start > stop:
+            break
+        length = monthrange(year, month)[1]
+        if rule.monthdays:
+            days = sorted({min(day, length) for day in rule.monthdays})
+        else:
+            days = [rule.dtstart.day] if rule.dtstart.day <= length else []
+        for day in days:
+            ordinal = month_start + day - 1
+            if ordinal < first:
+                continue
+            if ordinal > stop:
+                break
+            result.append(ordinal)
+        if count and len(result) >= count:
+            break
+        month += rule.interval
+        year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return result
@@ -0,0 +1,130 @@
+"""Lectura rápida de tareas para los endpoints de solo lectura.
+
+En lugar de construir objetos Task/Subtask del ORM y recorrer to_dict(),
+se ejecuta un SELECT de columnas con SQLAlchemy Core y cada fila se
+convierte directamente en el diccionario de la respuesta. No hay identity
+map, ni estado de instancia, ni carga de relaciones.
+
+La salida es idéntica a Task.to_dict() / Subtask.to_dict().
+"""
+from collections import defaultdict
+
+from sqlalchemy import select
+
+from database.db import db
+from models.task import Task, isoformat_utc
+from models.subtask import Subtask
+
+tasks_table = Task.__table__
+subtasks_table = Subtask.__table__
+
+SUBTASK_COLUMNS = (
+    subtasks_table.c.id,
+    subtasks_table.c.task_id,
+    subtasks_table.c.titulo,
+    subtasks_table.c.completada,
+    subtasks_table.c.posicion,
+)
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+# Conversión por columna, la misma que aplica Task.to_dict()
+_CONVERTERS = {
+    'fecha_inicio': _isoformat,
+    'fecha_fin': _isoformat,
+    'hora': _isoformat,
+    'updated_at': isoformat_utc,
+}
+
+
+def select_tasks(fields=None, *extra):
+    """SELECT de las columnas de fields (todas si es None) seguidas de extra.
+
+    Las columnas de extra (p. ej. las del cursor) se leen pero no se serializan.
+    """
+    names = dict.fromkeys(tuple(fields or Task.SERIALIZABLE_FIELDS) + extra)
+    return select(*(tasks_table.c[name] for name in names))
+
+
+def execute(stmt):
+    """Ejecutar un SELECT Core en la conexión de la sesión actual"""
+    return db.session.connection().execute(stmt)
+
+
+def fetch_subtasks(task_ids):
+    """Subtareas de varias tareas en una sola consulta, agrupadas por task_id.
+
+    task_ids puede ser una lista de ids o un SELECT de ids (subconsulta).
+    """
+    stmt = (
+        select(*SUBTASK_COLUMNS)
+        .where(subtasks_table.c.task_id.in_(task_ids))
+        .order_by(subtasks_table.c.posicion, subtasks_table.c.id)
+    )
+    subtasks_by_task = defaultdict(list)
+    for row in execute(stmt):
+        subtasks_by_task[row.task_id].append(subtask_to_dict(row))
+    return subtasks_by_task
+
+
+def subtask_to_dict(row):
+    """Diccionario de una fila con las columnas de SUBTASK_COLUMNS (igual que Subtask.to_dict())"""
+    subtask_id, task_id, titulo, completada, posicion = row
+    return {
+        'id': subtask_id,
+        'task_id': task_id,
+        'titulo': titulo,
+        'completada': completada,
+        'posicion': posicion
+    }
+
+
+def rows_to_dicts(rows, fields=None, subtasks_by_task=None):
+    """Convertir filas de select_tasks() en los diccionarios de la respuesta.
+
+    Si se pasa subtasks_by_task, cada tarea incluye su lista de subtareas.
+    """
+    names = tuple(fields or Task.SERIALIZABLE_FIELDS)
+    plan = [(index, name, _CONVERTERS.get(name)) for index, name in enumerate(names)]
+    id_index = names.index('id')
+
+    result = []
+    for row in rows:
+        item = {}
+        for index, name, convert in plan:
+            value = row[index]
+            item[name] = convert(value) if convert else value
+        if subtasks_by_task is not None:
+            item['subtasks'] = subtasks_by_task.get(row[id_index], [])
+        result.append(item)
+    return result
+
+
+def read_tasks(stmt, fields=None, include_subtasks=True, subtask_ids=None):
+    """Ejecutar un SELECT de select_tasks() y devolver (filas, diccionarios).
+
+    subtask_ids permite pasar una subconsulta de ids para cargar las subtareas
+    sin enumerar los ids de la página en la sentencia.
+    """
+    rows = execute(stmt).all()
+    subtasks_by_task = None
+    if include_subtasks and rows:
+        id_index = tuple(fields or Task.SERIALIZABLE_FIELDS).index('id')
+        if subtask_ids is None:
+            subtask_ids = [row[id_index] for row in rows]
+        subtasks_by_task = fetch_subtasks(subtask_ids)
+    return rows, rows_to_dicts(rows, fields, subtasks_by_task)
+
+
+def stream_tasks(stmt, fields=None, include_subtasks=True, batch_size=500):
+    """Generador de lotes de diccionarios, leyendo la BD con yield_per"""
+    result = execute(stmt.execution_options(yield_per=batch_size))
+    id_index = tuple(fields or Task.SERIALIZABLE_FIELDS).index('id')
+    for rows in result.partitions():
+        subtasks_by_task = None
+        if include_subtasks:
+            subtasks_by_task = fetch_subtasks([row[id_index] for row in rows])
+        yield rows_to_dicts(rows, fields, subtasks_by_task)
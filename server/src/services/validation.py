@@ -0,0 +1,156 @@
+"""Validación de los datos de tareas recibidos en las peticiones.
+
+Las funciones lanzan ValueError con el mensaje de error para el cliente;
+los controladores lo convierten en una respuesta 400.
+"""
+from datetime import datetime
+
+PRIORIDADES = ['baja', 'media', 'alta']
+TIPOS = ['diaria', 'semanal', 'personalizado']
+
+
+def parse_date(value, field):
+    """Parsear una fecha YYYY-MM-DD"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError(f'Formato de {field} inválido. Use YYYY-MM-DD')
+
+
+def parse_hora(value):
+    """Parsear una hora HH:MM:SS o HH:MM (None si viene vacía)"""
+    if not value:
+        return None
+    for fmt in ('%H:%M:%S', '%H:%M'):
+        try:
+            return datetime.strptime(value, fmt).time()
+        except (TypeError, ValueError):
+            pass
+    raise ValueError('Formato de hora inválido. Use HH:MM:SS o HH:MM')
+
+
+def parse_color(value):
+    """Validar un color hexadecimal #RGB o #RRGGBB"""
+    if value and not value.startswith('#'):
+        raise ValueError('Formato de color inválido. Use formato hexadecimal (#RRGGBB)')
+    if value and len(value) not in [4, 7]:  # #RGB o #RRGGBB
+        raise ValueError('Formato de color inválido. Use #RGB o #RRGGBB')
+    return value
+
+
+def parse_task_fields(data):
+    """Validar el payload de creación de una tarea.
+
+    Devuelve un dict con los valores de las columnas de Task (sin fechas de
+    recurrencia ni subtareas).
+    """
+    if not data:
+        raise ValueError('No se enviaron datos')
+
+    if not isinstance(data.get('titulo'), str) or not data['titulo'].strip():
+        raise ValueError('El título es obligatorio')
+
+    if 'fecha_inicio' not in data:
+        raise ValueError('La fecha de inicio es obligatoria')
+
+    if 'fecha_fin' not in data:
+        raise ValueError('La fecha de fin es obligatoria')
+
+    fecha_inicio = parse_date(data['fecha_inicio'], 'fecha_inicio')
+    fecha_fin = parse_date(data['fecha_fin'], 'fecha_fin')
+
+    if fecha_fin < fecha_inicio:
+        raise ValueError('La fecha de fin debe ser posterior o igual a la fecha de inicio')
+
+    hora = parse_hora(data.get('hora'))
+
+    prioridad = data.get('prioridad', 'media').lower()
+    if prioridad not in PRIORIDADES:
+        raise ValueError('Prioridad inválida. Debe ser: baja, media o alta')
+
+    tipo = data.get('tipo', 'diaria').lower()
+    if tipo not in TIPOS:
+        raise ValueError('Tipo inválido. Debe ser: diaria, semanal o personalizado')
+
+    color = parse_color(data.get('color', '#1976d2'))
+
+    return {
+        'titulo': data['titulo'].strip(),
+        'descripcion': data.get('descripcion', '').strip() if data.get('descripcion') else None,
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        'hora': hora,
+        'completada': data.get('completada', False),
+        'prioridad': prioridad,
+        'tipo': tipo,
+        'color': color,
+    }
+
+
+def parse_subtasks(data, keep_ids=False):
+    """Subtareas válidas del payload: las que tienen título.
+
+    Con keep_ids se conserva el id entero de las subtareas que lo traen, para
+    reconciliar la lista con las subtareas existentes.
+    """
+    result = []
+    for subtask in data.get('subtasks', []) or []:
+        if not subtask.get('titulo'):
+            continue
+        item = {
+            'titulo': subtask['titulo'].strip(),
+            'completada': subtask.get('completada', False)
+        }
+        if keep_ids and isinstance(subtask.get('id'), int) and not isinstance(subtask['id'], bool):
+            item['id'] = subtask['id']
+        result.append(item)
+    return result
+
+
+def parse_task_update(data):
+    """Validar un payload de actualización parcial de una tarea.
+
+    Devuelve un dict solo con las columnas presentes en data (las subtareas
+    se tratan aparte con parse_subtasks).
+    """
+    if not data:
+        raise ValueError('No se enviaron datos')
+
+    values = {}
+
+    if 'titulo' in data:
+        if not isinstance(data['titulo'], str) or not data['titulo'].strip():
+            raise ValueError('El título no puede estar vacío')
+        values['titulo'] = data['titulo'].strip()
+
+    if 'descripcion' in data:
+        values['descripcion'] = data['descripcion'].strip() if data['descripcion'] else None
+
+    if 'fecha_inicio' in data:
+        values['fecha_inicio'] = parse_date(data['fecha_inicio'], 'fecha_inicio')
+
+    if 'fecha_fin' in data:
+        values['fecha_fin'] = parse_date(data['fecha_fin'], 'fecha_fin')
+
+    if 'hora' in data:
+        values['hora'] = parse_hora(data['hora'])
+
+    if 'completada' in data:
+        values['completada'] = bool(data['completada'])
+
+    if 'prioridad' in data:
+        prioridad = str(data['prioridad']).lower()
+        if prioridad not in PRIORIDADES:
+            raise ValueError('Prioridad inválida. Debe ser: baja, media o alta')
+        values['prioridad'] = prioridad
+
+    if 'tipo' in data:
+        tipo = str(data['tipo']).lower()
+        if tipo not in TIPOS:
+            raise ValueError('Tipo inválido. Debe ser: diaria, semanal o personalizado')
+        values['tipo'] = tipo
+
+    if 'color' in data:
+        values['color'] = parse_color(data['color'])
+
+    return values
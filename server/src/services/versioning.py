@@ -0,0 +1,60 @@
+"""Versión de la colección de tareas para peticiones condicionales (ETag).
+
+Se mantiene un contador en memoria que se incrementa después de cada commit
+que haya escrito en la base de datos, ya sea mediante el ORM (flush) o con
+sentencias INSERT/UPDATE/DELETE masivas. Comparar el ETag recibido con la
+versión actual no requiere ninguna consulta.
+"""
+import threading
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_lock = threading.Lock()
+_version = 0
+
+# Cambia en cada arranque para que un ETag de un proceso anterior no coincida
+_BOOT_ID = uuid.uuid4().hex[:8]
+
+_CHANGED_KEY = 'tasks_changed'
+
+
+def current_version():
+    """Versión actual de la colección"""
+    return _version
+
+
+def current_etag():
+    """ETag que identifica la versión actual de la colección"""
+    return f'{_BOOT_ID}-{_version}'
+
+
+def bump_version():
+    """Marcar la colección como modificada"""
+    global _version
+    with _lock:
+        _version += 1
+        return _version
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_flush(session, flush_context):
+    session.info[_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_bulk_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_on_commit(session):
+    if session.info.pop(_CHANGED_KEY, False):
+        bump_version()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _clear_on_rollback(session):
+    session.info.pop(_CHANGED_KEY, None)
@@ -23,6 +23,9 @@ if src_path not in sys.path:
 # Import and run the Flask app
 from app import create_app, db
 
+# Última revisión del esquema que creaba db.create_all() en las bases sin versionar
+LEGACY_BASELINE_REVISION = 'bc47800e64b9'
+
 if __name__ == '__main__':
     app = create_app()
     
@@ -74,11 +77,18 @@ if __name__ == '__main__':
             
             if should_stamp:
                 print("[WARN] Base de datos existente sin versionar (o corrupta) detectada.")
-                print("[DB] Marcando como actualizada (stamping)...")
-                stamp(directory=migrations_dir, revision='head')
+                print("[DB] Marcando con la revisión base (stamping)...")
+                # Las bases sin versionar son las creadas con db.create_all()
+                # antes de los índices: se marcan en esa revisión y upgrade()
+                # aplica el resto de migraciones
+                stamp(directory=migrations_dir, revision=LEGACY_BASELINE_REVISION)
             
             print("[MIGRATE] Ejecutando migraciones...")
             upgrade(directory=migrations_dir)
     
+    # Keep recurring tasks materialized ahead of today in the background
+    from services.materializer import start_materializer
+    start_materializer(app)
+    
     # Run without debug mode in production
     app.run(host='127.0.0.1', port=5000, debug=False, use_reloader=False)
\ No newline at end of file
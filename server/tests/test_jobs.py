@@ -0,0 +1,129 @@
+"""
+Tests para la creación asíncrona de tareas (Prefer: respond-async) y el
+endpoint de estado de los trabajos (GET /api/jobs/<id>).
+"""
+import unittest
+import sys
+import os
+from datetime import date, timedelta
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from app import create_app
+from database.db import db
+from models.task import Task
+from models.subtask import Subtask
+from models.task_series import TaskSeries
+from services import jobs
+
+
+class TestAsyncCreate(unittest.TestCase):
+    """Tests para la creación de tareas en segundo plano"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+            'MATERIALIZE_HORIZON_DAYS': 30,
+            'MATERIALIZE_BATCH_SIZE': 10
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _post_async(self, payload):
+        return self.app.post('/api/tasks/', json=payload, headers={'Prefer': 'respond-async'})
+
+    def _wait(self, response):
+        job = jobs.get(response.get_json()['job']['id'])
+        self.assertTrue(job.wait(5))
+        return self.app.get(response.headers['Location'])
+
+    def test_async_create_recurrence(self):
+        """Test: 202 con el trabajo y todas las ocurrencias creadas por lotes"""
+        today = date.today().isoformat()
+        response = self._post_async({
+            'titulo': 'Hábito',
+            'fecha_inicio': today,
+            'fecha_fin': today,
+            'subtasks': [{'titulo': 'Paso'}],
+            'recurrence': {'enabled': True, 'frequency': 'daily'}
+        })
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.headers['Preference-Applied'], 'respond-async')
+        job_id = response.get_json()['job']['id']
+        self.assertEqual(response.headers['Location'], f'/api/jobs/{job_id}')
+        
+        status = self._wait(response)
+        self.assertEqual(status.status_code, 200)
+        job = status.get_json()['job']
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['total'], 31)
+        self.assertEqual(job['done'], 31)
+        self.assertIsNotNone(job['finished_at'])
+        
+        with self.app_instance.app_context():
+            tasks = Task.query.order_by(Task.fecha_inicio).all()
+            self.assertEqual([task.id for task in tasks], job['task_ids'])
+            self.assertEqual(Subtask.query.count(), 31)
+            series = TaskSeries.query.one()
+            self.assertEqual(series.materialized_through, date.today() + timedelta(days=30))
+
+    def test_async_create_single_task(self):
+        """Test: una tarea única también se puede crear en segundo plano"""
+        response = self._post_async({'titulo': 'Única', 'fecha_inicio': '2025-01-01', 'fecha_fin': '2025-01-02'})
+        self.assertEqual(response.status_code, 202)
+        
+        job = self._wait(response).get_json()['job']
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['total'], 1)
+        with self.app_instance.app_context():
+            self.assertEqual(db.session.get(Task, job['task_ids'][0]).titulo, 'Única')
+
+    def test_async_validation_is_synchronous(self):
+        """Test: un payload inválido se rechaza con 400 sin crear trabajo"""
+        response = self._post_async({'titulo': '', 'fecha_inicio': '2025-01-01', 'fecha_fin': '2025-01-01'})
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('Location', response.headers)
+
+    def test_async_job_without_occurrences_fails(self):
+        """Test: una regla sin ocurrencias deja el trabajo en failed sin crear la serie"""
+        response = self._post_async({
+            'titulo': 'Vacía',
+            'fecha_inicio': '2025-01-10',
+            'fecha_fin': '2025-01-10',
+            'recurrence': {'enabled': True, 'frequency': 'daily', 'endType': 'date', 'endDate': '2025-01-01'}
+        })
+        self.assertEqual(response.status_code, 202)
+        
+        job = self._wait(response).get_json()['job']
+        self.assertEqual(job['status'], 'failed')
+        self.assertIn('No se pudieron crear tareas', job['error'])
+        with self.app_instance.app_context():
+            self.assertEqual(TaskSeries.query.count(), 0)
+            self.assertEqual(Task.query.count(), 0)
+
+    def test_without_prefer_stays_synchronous(self):
+        """Test: sin la cabecera Prefer la creación sigue respondiendo 201"""
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'Normal', 'fecha_inicio': '2025-01-01', 'fecha_fin': '2025-01-01'
+        }, headers={'Prefer': 'return=representation'})
+        self.assertEqual(response.status_code, 201)
+
+    def test_unknown_job(self):
+        """Test: 404 para un trabajo inexistente"""
+        response = self.app.get('/api/jobs/no-existe')
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('error', response.get_json())
+
+
+if __name__ == '__main__':
+    unittest.main()
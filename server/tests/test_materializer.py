@@ -0,0 +1,232 @@
+"""
+Tests para el materializador de tareas periódicas (services/materializer.py).
+Prueba el horizonte móvil, la extensión por lotes y la sincronización con
+las operaciones de grupo.
+"""
+import unittest
+import sys
+import os
+from datetime import date, timedelta
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from app import create_app
+from database.db import db
+from models.task import Task
+from models.subtask import Subtask
+from models.task_series import TaskSeries
+from services import materializer
+
+
+class TestMaterializer(unittest.TestCase):
+    """Tests para la materialización en un horizonte móvil"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+            'MATERIALIZE_HORIZON_DAYS': 30,
+            'MATERIALIZE_BATCH_SIZE': 20
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _create(self, **recurrence):
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'Hábito',
+            'fecha_inicio': date.today().isoformat(),
+            'fecha_fin': date.today().isoformat(),
+            'subtasks': [{'titulo': 'Paso'}],
+            'recurrence': dict({'enabled': True, 'frequency': 'daily'}, **recurrence)
+        })
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()
+
+    def _extend(self, horizon_days):
+        self.app_instance.config['MATERIALIZE_HORIZON_DAYS'] = horizon_days
+        materializer.run_pending(self.app_instance)
+
+    def test_open_series_materializes_only_horizon(self):
+        """Test una serie sin fin solo crea las tareas del horizonte"""
+        result = self._create()
+        self.assertEqual(result['count'], 31)
+
+        with self.app_instance.app_context():
+            series = TaskSeries.query.one()
+            self.assertEqual(series.group_id, result['task']['group_id'])
+            self.assertEqual(series.materialized_through, date.today() + timedelta(days=30))
+
+    def test_worker_extends_in_batches(self):
+        """Test el materializador extiende la serie hasta el nuevo horizonte"""
+        self._create()
+
+        with self.app_instance.app_context():
+            self.app_instance.config['MATERIALIZE_HORIZON_DAYS'] = 100
+            # Una pasada crea como máximo un lote por serie
+            self.assertEqual(materializer.extend_due_series(self.app_instance.config), 20)
+
+        self._extend(100)
+        with self.app_instance.app_context():
+            self.assertEqual(Task.query.count(), 101)
+            self.assertEqual(Subtask.query.count(), 101)
+            last = Task.query.order_by(Task.fecha_inicio.desc()).first()
+            self.assertEqual(last.fecha_inicio, date.today() + timedelta(days=100))
+
+    def test_series_with_count_completes(self):
+        """Test una serie con conteo se marca como completa al terminar"""
+        self._create(endType='count', count=50)
+        self._extend(365)
+
+        with self.app_instance.app_context():
+            self.assertEqual(Task.query.count(), 50)
+            self.assertIsNone(TaskSeries.query.one().materialized_through)
+
+        self._extend(400)
+        with self.app_instance.app_context():
+            self.assertEqual(Task.query.count(), 50)
+
+    def test_first_occurrence_beyond_horizon(self):
+        """Test una regla cuya primera ocurrencia cae después del horizonte crea esa ocurrencia"""
+        # Un miércoles con repetición cada 20 semanas los lunes: la primera es 138 días después
+        start = date.today() + timedelta(days=(2 - date.today().weekday()) % 7 or 7)
+        first = start + timedelta(days=138)
+        task = {'titulo': 'Lejana', 'fecha_inicio': start.isoformat(), 'fecha_fin': start.isoformat()}
+        recurrence = {'enabled': True, 'frequency': 'weekly', 'interval': 20, 'weekdays': ['MO']}
+
+        response = self.app.post('/api/tasks/', json=dict(task, recurrence=recurrence))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()['count'], 1)
+        self.assertEqual(response.get_json()['task']['fecha_inicio'], first.isoformat())
+
+        batch = self.app.post('/api/tasks/batch', json={'operations': [
+            {'op': 'create', 'data': dict(task, recurrence=recurrence)}
+        ]})
+        self.assertEqual(batch.status_code, 200)
+        self.assertEqual(batch.get_json()['results'][0]['task']['fecha_inicio'], first.isoformat())
+
+        # Solo se rechaza la regla que no tiene ninguna ocurrencia
+        response = self.app.post('/api/tasks/', json=dict(task, recurrence=dict(
+            recurrence, endType='date', endDate=(start + timedelta(days=100)).isoformat()
+        )))
+        self.assertEqual(response.status_code, 400)
+
+        self._extend(300)
+        with self.app_instance.app_context():
+            self.assertEqual({task.fecha_inicio for task in Task.query}, {first, first + timedelta(weeks=20)})
+
+    def test_backdated_open_series_limits_backfill(self):
+        """Test una serie sin fin muy antigua solo materializa MATERIALIZE_BACKFILL_DAYS de pasado"""
+        today = date.today()
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'Antigua',
+            'fecha_inicio': '1950-01-01',
+            'fecha_fin': '1950-01-01',
+            'recurrence': {'enabled': True, 'frequency': 'daily'}
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()['count'], 90 + 1 + 30)
+        self.assertEqual(response.get_json()['task']['fecha_inicio'], (today - timedelta(days=90)).isoformat())
+
+        # Con count o until el número de ocurrencias ya está acotado: se crean desde el inicio
+        start = today - timedelta(days=1000)
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'Con fin',
+            'fecha_inicio': start.isoformat(),
+            'fecha_fin': start.isoformat(),
+            'recurrence': {'enabled': True, 'frequency': 'weekly', 'endType': 'count', 'count': 5}
+        })
+        self.assertEqual(response.get_json()['count'], 5)
+        self.assertEqual(response.get_json()['task']['fecha_inicio'], start.isoformat())
+
+    def test_cancelled_dates_do_not_stop_batch(self):
+        """Test un lote reducido por fechas canceladas continúa en la siguiente pasada"""
+        group_id = self._create()['task']['group_id']
+        with self.app_instance.app_context():
+            series = TaskSeries.query.one()
+            for offset in range(31, 61):
+                series.set_excluded(date.today() + timedelta(days=offset))
+            db.session.commit()
+
+        self._extend(100)
+        with self.app_instance.app_context():
+            self.assertEqual(Task.query.filter_by(group_id=group_id).count(), 31 + 40)
+            self.assertEqual(TaskSeries.query.one().materialized_through, date.today() + timedelta(days=100))
+
+    def test_delete_group_stops_series(self):
+        """Test eliminar el grupo elimina la serie y no se crean más tareas"""
+        group_id = self._create()['task']['group_id']
+        self.assertEqual(self.app.delete(f'/api/tasks/group/{group_id}').status_code, 200)
+        self._extend(100)
+
+        with self.app_instance.app_context():
+            self.assertEqual(Task.query.count(), 0)
+            self.assertEqual(TaskSeries.query.count(), 0)
+
+    def test_group_update_applies_to_future_occurrences(self):
+        """Test los cambios del grupo se aplican también a las ocurrencias futuras"""
+        group_id = self._create()['task']['group_id']
+        self.app.patch(f'/api/tasks/group/{group_id}', json={'titulo': 'Nuevo', 'subtasks': []})
+        self._extend(60)
+
+        with self.app_instance.app_context():
+            self.assertEqual(Task.query.count(), 61)
+            self.assertEqual({task.titulo for task in Task.query}, {'Nuevo'})
+            self.assertEqual(Subtask.query.count(), 0)
+
+    def test_split_moves_series_to_new_group(self):
+        """Test tras un split la serie sigue generando tareas en el nuevo grupo"""
+        group_id = self._create()['task']['group_id']
+        with self.app_instance.app_context():
+            tenth = Task.query.filter_by(group_id=group_id).order_by(Task.fecha_inicio).all()[10].id
+
+        new_group_id = self.app.patch(f'/api/tasks/{tenth}/following', json={'split': True}).get_json()['group_id']
+        self._extend(60)
+
+        with self.app_instance.app_context():
+            self.assertEqual(Task.query.filter_by(group_id=group_id).count(), 10)
+            self.assertEqual(Task.query.filter_by(group_id=new_group_id).count(), 51)
+
+
+    def test_deleted_occurrence_can_be_restored(self):
+        """Test eliminar una tarea de la serie la marca como excluida y se puede restaurar"""
+        group_id = self._create()['task']['group_id']
+        fecha = date.today() + timedelta(days=3)
+        with self.app_instance.app_context():
+            task_id = Task.query.filter_by(group_id=group_id, fecha_inicio=fecha).one().id
+            series_id = TaskSeries.query.one().id
+
+        self.app.delete(f'/api/tasks/{task_id}')
+        with self.app_instance.app_context():
+            self.assertTrue(db.session.get(TaskSeries, series_id).is_excluded(fecha))
+
+        response = self.app.post(f'/api/series/{series_id}/occurrences/{fecha.isoformat()}/restore')
+        self.assertEqual(response.status_code, 200)
+        with self.app_instance.app_context():
+            task = Task.query.filter_by(group_id=group_id, fecha_inicio=fecha).one()
+            self.assertEqual([subtask.titulo for subtask in task.subtasks], ['Paso'])
+
+    def test_cancelled_future_occurrence_is_not_materialized(self):
+        """Test una fecha cancelada fuera del horizonte no se materializa"""
+        self._create()
+        fecha = date.today() + timedelta(days=45)
+        with self.app_instance.app_context():
+            series_id = TaskSeries.query.one().id
+        self.assertEqual(self.app.delete(f'/api/series/{series_id}/occurrences/{fecha.isoformat()}').status_code, 200)
+
+        self._extend(60)
+        with self.app_instance.app_context():
+            self.assertEqual(Task.query.count(), 60)
+            self.assertIsNone(Task.query.filter_by(fecha_inicio=fecha).first())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,6 +14,7 @@ from app import create_app
 from database.db import db
 from models.task import Task
 from models.subtask import Subtask
+from models.task_series import TaskSeries
 
 
 class TestTaskModel(unittest.TestCase):
@@ -446,5 +447,51 @@ class TestTaskFiltering(unittest.TestCase):
             self.assertEqual(tasks[-1].fecha_inicio, date(2025, 2, 1))
 
 
+class TestTaskSeriesExdates(unittest.TestCase):
+    """Tests para el bitmap de fechas excluidas de TaskSeries"""
+
+    def _series(self):
+        return TaskSeries(titulo='Serie', frequency='daily', interval=1, dtstart=date(2026, 1, 1), duration=0)
+
+    def test_exclude_and_restore(self):
+        """Test cancelar y restaurar ocurrencias"""
+        series = self._series()
+        series.set_excluded(date(2026, 1, 3))
+        series.set_excluded(date(2026, 3, 1))
+
+        self.assertTrue(series.is_excluded(date(2026, 1, 3)))
+        self.assertFalse(series.is_excluded(date(2026, 1, 4)))
+        self.assertFalse(series.is_excluded(date(2030, 1, 1)))
+        self.assertEqual(series.excluded_dates(), [date(2026, 1, 3), date(2026, 3, 1)])
+
+        series.set_excluded(date(2026, 3, 1), False)
+        self.assertEqual(series.excluded_dates(), [date(2026, 1, 3)])
+        # Los bytes finales vacíos se recortan
+        self.assertEqual(len(series.exdates), 1)
+
+        series.set_excluded(date(2026, 1, 3), False)
+        self.assertIsNone(series.exdates)
+
+    def test_bitmap_is_compact(self):
+        """Test un año de cancelaciones ocupa un bit por día"""
+        series = self._series()
+        for offset in range(0, 365, 2):
+            series.set_excluded(date(2026, 1, 1) + timedelta(days=offset))
+        self.assertEqual(len(series.exdates), 46)
+
+    def test_active_dates(self):
+        """Test filtrar las ocurrencias canceladas"""
+        series = self._series()
+        days = [date(2026, 1, day) for day in range(1, 6)]
+        self.assertEqual(series.active_dates(days), days)
+        series.set_excluded(date(2026, 1, 2))
+        self.assertEqual(series.active_dates(days), [days[0]] + days[2:])
+
+    def test_exclude_before_start(self):
+        """Test no se puede cancelar una fecha anterior al inicio"""
+        with self.assertRaises(ValueError):
+            self._series().set_excluded(date(2025, 12, 31))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -5,8 +5,9 @@ Prueba la creación de tareas diarias, semanales y mensuales.
 import unittest
 import sys
 import os
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone
 import json
+from sqlalchemy import event
 
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
@@ -14,6 +15,9 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'
 from app import create_app
 from database.db import db
 from models.task import Task
+from models.subtask import Subtask
+from models.series_occurrence import SeriesOccurrence
+from services.pagination import encode_cursor
 
 
 class TestDailyTasks(unittest.TestCase):
@@ -450,6 +454,40 @@ class TestRecurrenceEdgeCases(unittest.TestCase):
                 # No debería permitir más de un límite razonable
                 self.assertLessEqual(len(tasks), 365)
 
+    def test_recurrence_inserts_occurrences_in_bulk(self):
+        """Test las ocurrencias y sus subtareas se insertan en lotes, no una a una"""
+        data = {
+            'titulo': 'Bulk Test',
+            'fecha_inicio': '2026-01-01',
+            'fecha_fin': '2026-01-01',
+            'subtasks': [{'titulo': f'Sub {i}'} for i in range(10)],
+            'recurrence': {'enabled': True, 'frequency': 'daily', 'endType': 'count', 'count': 365}
+        }
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with self.app_instance.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = self.app.post('/api/tasks/', json=data)
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()['count'], 365)
+        self.assertEqual(len(response.get_json()['task']['subtasks']), 10)
+        inserts = [statement for statement in statements if statement.startswith('INSERT')]
+        self.assertLess(len(inserts), 10)
+
+        with self.app_instance.app_context():
+            self.assertEqual(Subtask.query.count(), 3650)
+            # Cada tarea recibe sus propias subtareas, en el orden de las fechas
+            for task in Task.query.order_by(Task.fecha_inicio).limit(3):
+                self.assertEqual([subtask.titulo for subtask in task.subtasks], [f'Sub {i}' for i in range(10)])
+
     def test_recurrence_with_past_end_date(self):
         """Test recurrencia con fecha fin en el pasado.
         
@@ -529,5 +567,280 @@ class TestDeleteRecurringTasks(unittest.TestCase):
             self.assertEqual(len(tasks), 4)
 
 
+class TestGroupOperations(unittest.TestCase):
+    """Tests para actualizar y eliminar un grupo periódico completo"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _create_group(self, titulo='Daily Task', count=5):
+        data = {
+            'titulo': titulo,
+            'fecha_inicio': '2026-01-01',
+            'fecha_fin': '2026-01-01',
+            'subtasks': [{'titulo': 'A'}, {'titulo': 'B'}],
+            'recurrence': {'enabled': True, 'frequency': 'daily', 'endType': 'count', 'count': count}
+        }
+        response = self.app.post('/api/tasks/', json=data)
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()['task']['group_id']
+
+    def test_update_group(self):
+        """Test renombrar todas las tareas de un grupo"""
+        group_id = self._create_group()
+        other_group = self._create_group('Other', count=2)
+
+        response = self.app.patch(f'/api/tasks/group/{group_id}', json={'titulo': 'Renamed', 'prioridad': 'alta'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['count'], 5)
+
+        with self.app_instance.app_context():
+            tasks = Task.query.filter_by(group_id=group_id).all()
+            self.assertTrue(all(task.titulo == 'Renamed' and task.prioridad == 'alta' for task in tasks))
+            # Las fechas de cada ocurrencia se conservan
+            self.assertEqual(len({task.fecha_inicio for task in tasks}), 5)
+            self.assertTrue(all(task.titulo == 'Other' for task in Task.query.filter_by(group_id=other_group)))
+
+    def test_update_group_replaces_subtasks(self):
+        """Test PUT con subtareas las reemplaza en todas las tareas del grupo"""
+        group_id = self._create_group()
+        response = self.app.put(f'/api/tasks/group/{group_id}', json={'subtasks': [{'titulo': 'Nueva'}]})
+        self.assertEqual(response.status_code, 200)
+
+        with self.app_instance.app_context():
+            self.assertEqual(Subtask.query.count(), 5)
+            self.assertTrue(all(subtask.titulo == 'Nueva' for subtask in Subtask.query))
+
+    def test_update_group_validation(self):
+        """Test validaciones de la actualización de grupo"""
+        group_id = self._create_group()
+        self.assertEqual(self.app.patch(f'/api/tasks/group/{group_id}', json={'prioridad': 'urgente'}).status_code, 400)
+        self.assertEqual(self.app.patch(f'/api/tasks/group/{group_id}', json={'fecha_inicio': '2026-02-01'}).status_code, 400)
+        self.assertEqual(self.app.patch('/api/tasks/group/no-existe', json={'titulo': 'X'}).status_code, 404)
+
+    def _group_tasks(self, group_id):
+        return Task.query.filter_by(group_id=group_id).order_by(Task.fecha_inicio).all()
+
+    def test_update_following(self):
+        """Test actualizar una ocurrencia y las posteriores del grupo"""
+        group_id = self._create_group()
+        with self.app_instance.app_context():
+            third = self._group_tasks(group_id)[2].id
+
+        response = self.app.patch(f'/api/tasks/{third}/following', json={'titulo': 'Desde el día 3'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['count'], 3)
+        self.assertEqual(response.get_json()['group_id'], group_id)
+
+        with self.app_instance.app_context():
+            titles = [task.titulo for task in self._group_tasks(group_id)]
+            self.assertEqual(titles, ['Daily Task'] * 2 + ['Desde el día 3'] * 3)
+
+    def test_update_following_split(self):
+        """Test split=true mueve las ocurrencias posteriores a un nuevo grupo"""
+        group_id = self._create_group()
+        with self.app_instance.app_context():
+            fourth = self._group_tasks(group_id)[3].id
+
+        response = self.app.patch(f'/api/tasks/{fourth}/following', json={
+            'split': True,
+            'subtasks': [{'titulo': 'Nueva'}]
+        })
+        self.assertEqual(response.status_code, 200)
+        new_group_id = response.get_json()['group_id']
+        self.assertNotEqual(new_group_id, group_id)
+
+        with self.app_instance.app_context():
+            self.assertEqual(len(self._group_tasks(group_id)), 3)
+            tail = self._group_tasks(new_group_id)
+            self.assertEqual([task.id for task in tail][0], fourth)
+            self.assertEqual(len(tail), 2)
+            self.assertTrue(all([subtask.titulo for subtask in task.subtasks] == ['Nueva'] for task in tail))
+            self.assertEqual(len(self._group_tasks(group_id)[0].subtasks), 2)
+
+    def test_update_following_requires_group(self):
+        """Test una tarea sin grupo periódico devuelve 400"""
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'Single', 'fecha_inicio': '2026-01-01', 'fecha_fin': '2026-01-01'
+        })
+        task_id = response.get_json()['task']['id']
+        self.assertEqual(self.app.patch(f'/api/tasks/{task_id}/following', json={'titulo': 'X'}).status_code, 400)
+        self.assertEqual(self.app.patch('/api/tasks/9999/following', json={'titulo': 'X'}).status_code, 404)
+
+    def test_delete_group(self):
+        """Test eliminar un grupo completo con sus subtareas"""
+        group_id = self._create_group()
+        self._create_group('Other', count=2)
+
+        response = self.app.delete(f'/api/tasks/group/{group_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['count'], 5)
+
+        with self.app_instance.app_context():
+            self.assertEqual(Task.query.count(), 2)
+            self.assertEqual(Subtask.query.count(), 4)
+
+        # Los borrados quedan registrados para la sincronización por deltas
+        since = encode_cursor([(datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=1)).isoformat()])
+        deleted = self.app.get(f'/api/tasks/changes?since={since}').get_json()['deleted']
+        self.assertEqual(len([item for item in deleted if item['entity'] == 'task']), 5)
+        self.assertEqual(len([item for item in deleted if item['entity'] == 'subtask']), 10)
+        self.assertTrue(all(item['task_id'] for item in deleted if item['entity'] == 'subtask'))
+
+    def test_delete_unknown_group(self):
+        """Test eliminar un grupo inexistente devuelve 404"""
+        self.assertEqual(self.app.delete('/api/tasks/group/no-existe').status_code, 404)
+
+
+class TestTaskSeries(unittest.TestCase):
+    """Tests para las series periódicas virtuales (/api/series)"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _create_series(self, **recurrence):
+        payload = {
+            'titulo': 'Regar plantas',
+            'fecha_inicio': '2026-01-05',
+            'fecha_fin': '2026-01-05',
+            'subtasks': [{'titulo': 'Interior'}],
+            'recurrence': dict({'enabled': True, 'frequency': 'daily'}, **recurrence)
+        }
+        response = self.app.post('/api/series/', data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()['series']
+
+    def test_create_series_stores_single_row(self):
+        """Test una serie sin fin no materializa ninguna tarea"""
+        series = self._create_series(frequency='weekly', weekdays=['MO', 'WE'])
+        self.assertEqual(series['recurrence']['weekdays'], ['MO', 'WE'])
+        self.assertIsNone(series['recurrence']['until'])
+        with self.app_instance.app_context():
+            self.assertEqual(Task.query.count(), 0)
+
+    def test_virtual_and_materialized_series_are_listed_apart(self):
+        """Test las series virtuales solo se listan en /api/series y las materializadas en /api/tasks"""
+        self._create_series()
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'Materializada', 'fecha_inicio': '2026-01-05', 'fecha_fin': '2026-01-05',
+            'recurrence': {'enabled': True, 'frequency': 'daily', 'endType': 'count', 'count': 3}
+        })
+        self.assertEqual(response.status_code, 201)
+
+        tasks = self.app.get('/api/tasks/?from=2026-01-05&to=2026-01-05').get_json()['tasks']
+        self.assertEqual([task['titulo'] for task in tasks], ['Materializada'])
+        occurrences = self.app.get('/api/series/occurrences?from=2026-01-05&to=2026-01-05').get_json()['occurrences']
+        self.assertEqual([item['titulo'] for item in occurrences], ['Regar plantas'])
+
+    def test_create_series_requires_recurrence(self):
+        """Test crear una serie sin recurrencia devuelve 400"""
+        payload = {'titulo': 'X', 'fecha_inicio': '2026-01-05', 'fecha_fin': '2026-01-05'}
+        response = self.app.post('/api/series/', data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_occurrences_expanded_for_window(self):
+        """Test solo se generan las ocurrencias de la ventana pedida"""
+        series = self._create_series(frequency='weekly', weekdays=['MO', 'WE'])
+        response = self.app.get('/api/series/occurrences?from=2030-03-01&to=2030-03-14')
+        self.assertEqual(response.status_code, 200)
+        occurrences = response.get_json()['occurrences']
+        self.assertEqual(
+            [item['fecha_inicio'] for item in occurrences],
+            ['2030-03-04', '2030-03-06', '2030-03-11', '2030-03-13']
+        )
+        self.assertTrue(all(item['series_id'] == series['id'] for item in occurrences))
+        self.assertEqual(occurrences[0]['subtasks'], [{'titulo': 'Interior', 'completada': False}])
+
+    def test_occurrences_respect_count(self):
+        """Test una serie con conteo no genera ocurrencias después del final"""
+        self._create_series(endType='count', count=3)
+        response = self.app.get('/api/series/occurrences?from=2026-01-01&to=2026-01-31')
+        self.assertEqual(len(response.get_json()['occurrences']), 3)
+
+    def test_occurrences_window_validation(self):
+        """Test la ventana es obligatoria y está acotada"""
+        self.assertEqual(self.app.get('/api/series/occurrences').status_code, 400)
+        self.assertEqual(self.app.get('/api/series/occurrences?from=2026-01-10&to=2026-01-01').status_code, 400)
+        self.assertEqual(self.app.get('/api/series/occurrences?from=2026-01-01&to=2028-01-01').status_code, 400)
+
+    def test_toggle_occurrence(self):
+        """Test completar una ocurrencia solo afecta a esa fecha"""
+        series = self._create_series()
+        url = f"/api/series/{series['id']}/occurrences/2026-01-07/toggle"
+        response = self.app.patch(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['occurrence']['completada'])
+
+        occurrences = self.app.get('/api/series/occurrences?from=2026-01-06&to=2026-01-08').get_json()['occurrences']
+        self.assertEqual([item['completada'] for item in occurrences], [False, True, False])
+
+        # Volver a alternar deja la ocurrencia como la plantilla
+        self.assertFalse(self.app.patch(url).get_json()['occurrence']['completada'])
+        with self.app_instance.app_context():
+            self.assertEqual(SeriesOccurrence.query.count(), 0)
+
+    def test_toggle_occurrence_outside_rule(self):
+        """Test una fecha que no pertenece a la serie devuelve 404"""
+        series = self._create_series(frequency='weekly', weekdays=['MO'])
+        response = self.app.patch(f"/api/series/{series['id']}/occurrences/2026-01-06/toggle")
+        self.assertEqual(response.status_code, 404)
+
+    def test_cancel_and_restore_occurrence(self):
+        """Test cancelar una ocurrencia la quita del listado hasta restaurarla"""
+        series = self._create_series()
+        url = f"/api/series/{series['id']}/occurrences/2026-01-07"
+        listing = '/api/series/occurrences?from=2026-01-06&to=2026-01-08'
+
+        self.assertEqual(self.app.delete(url).status_code, 200)
+        fechas = [item['fecha_inicio'] for item in self.app.get(listing).get_json()['occurrences']]
+        self.assertEqual(fechas, ['2026-01-06', '2026-01-08'])
+        self.assertEqual(self.app.get(f"/api/series/{series['id']}").get_json()['series']['recurrence']['exdates'], ['2026-01-07'])
+        self.assertEqual(self.app.patch(f'{url}/toggle').status_code, 404)
+
+        self.assertEqual(self.app.post(f'{url}/restore').status_code, 200)
+        self.assertEqual(len(self.app.get(listing).get_json()['occurrences']), 3)
+
+    def test_cancel_occurrence_outside_rule(self):
+        """Test cancelar una fecha que no pertenece a la serie devuelve 404"""
+        series = self._create_series(frequency='weekly', weekdays=['MO'])
+        self.assertEqual(self.app.delete(f"/api/series/{series['id']}/occurrences/2026-01-06").status_code, 404)
+
+    def test_delete_series(self):
+        """Test eliminar una serie elimina también sus ocurrencias guardadas"""
+        series = self._create_series()
+        self.app.patch(f"/api/series/{series['id']}/occurrences/2026-01-05/toggle")
+        response = self.app.delete(f"/api/series/{series['id']}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.app.get(f"/api/series/{series['id']}").status_code, 404)
+        with self.app_instance.app_context():
+            self.assertEqual(SeriesOccurrence.query.count(), 0)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,328 @@
+"""
+Tests para las reglas de recurrencia (services/recurrence.py).
+Prueba la expansión de fechas y la caché LRU de expansiones.
+"""
+import unittest
+import sys
+import os
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from app import create_app
+from database.db import db
+from models.task import Task
+from services import recurrence, recurrence_engine
+from services.recurrence import RecurrenceRule, parse_recurrence, to_rrule, expand, occurrences_between
+
+
+class TestRecurrenceCache(unittest.TestCase):
+    """Tests para la caché de expansiones"""
+    
+    def setUp(self):
+        recurrence.cache_clear()
+
+    def _rule(self, frequency='daily', start=date(2026, 1, 1), end=None, **extra):
+        return parse_recurrence(
+            dict({'enabled': True, 'frequency': frequency}, **extra),
+            start, end or start, 'diaria'
+        )
+
+    def test_expand_dates(self):
+        """Test expand devuelve las primeras fechas de la regla"""
+        dates = expand(self._rule(interval=2), 3)
+        self.assertEqual(dates, (date(2026, 1, 1), date(2026, 1, 3), date(2026, 1, 5)))
+
+    def test_repeated_expansion_is_cached(self):
+        """Test la misma regla normalizada se sirve desde la caché"""
+        expand(self._rule(), 365)
+        expand(self._rule(), 365)
+        # La duración no forma parte de la clave
+        expand(self._rule(end=date(2026, 1, 3)), 365)
+
+        info = recurrence.cache_info()['expand']
+        self.assertEqual(info['misses'], 1)
+        self.assertEqual(info['hits'], 2)
+
+    def test_between_cached_and_shifted_by_duration(self):
+        """Test occurrences_between cachea por ventana y respeta la duración"""
+        rule = self._rule('weekly', end=date(2026, 1, 3))
+        first = occurrences_between(rule, date(2026, 1, 9), date(2026, 1, 20))
+        second = occurrences_between(rule, date(2026, 1, 9), date(2026, 1, 20))
+
+        # La ocurrencia del 8 (8-10 de enero) se solapa con la ventana
+        self.assertEqual(first, (date(2026, 1, 8), date(2026, 1, 15)))
+        self.assertEqual(first, second)
+        self.assertEqual(recurrence.cache_info()['between']['hits'], 1)
+
+    def test_lru_eviction(self):
+        """Test la caché está acotada y descarta la regla menos usada"""
+        size = recurrence.EXPANSION_CACHE_SIZE
+        for day in range(size + 1):
+            expand(self._rule(start=date(2026, 1, 1) + timedelta(days=day)), 2)
+
+        info = recurrence.cache_info()['expand']
+        self.assertEqual(info['size'], size)
+
+        # La primera regla fue descartada: vuelve a ser un fallo
+        expand(self._rule(), 2)
+        self.assertEqual(recurrence.cache_info()['expand']['misses'], size + 2)
+
+
+    def test_cache_bounded_by_total_dates(self):
+        """Test la caché descarta expansiones para no pasar del total de fechas"""
+        limit = recurrence.MAX_CACHED_DATES // 2
+        expand(self._rule(), limit)
+        expand(self._rule(start=date(2026, 1, 2)), limit)
+        expand(self._rule(start=date(2026, 1, 3)), limit)
+
+        info = recurrence.cache_info()['expand']
+        self.assertEqual(info['size'], 2)
+        self.assertLessEqual(info['dates'], recurrence.MAX_CACHED_DATES)
+
+        # Una expansión mayor que todo el presupuesto no se guarda
+        expand(self._rule(start=date(2026, 1, 4)), recurrence.MAX_CACHED_DATES + 1)
+        self.assertEqual(recurrence.cache_info()['expand']['size'], 2)
+
+    def test_limited_windows_skip_cache(self):
+        """Test las ventanas con limit (materializador) no ocupan la caché"""
+        rule = self._rule()
+        for day in range(10):
+            occurrences_between(rule, date(2026, 1, 1) + timedelta(days=day), date(2026, 12, 31), 5)
+        info = recurrence.cache_info()['between']
+        self.assertEqual((info['size'], info['misses']), (0, 0))
+
+
+class TestRecurrenceEngine(unittest.TestCase):
+    """Tests para el motor de ordinales frente a rrule"""
+
+    RULES = [
+        RecurrenceRule('daily', 3, None, None, date(2026, 1, 30), None, None, 0),
+        RecurrenceRule('daily', 1, None, None, date(2026, 1, 1), date(2026, 3, 1), None, 0),
+        RecurrenceRule('weekly', 2, ('MO', 'WE', 'FR'), None, date(2026, 1, 7), None, None, 0),
+        RecurrenceRule('weekly', 1, None, None, date(2026, 1, 8), None, 20, 0),
+        RecurrenceRule('weekly', 3, ('SU', 'TU'), None, date(2026, 2, 3), None, 11, 0),
+        RecurrenceRule('monthly', 1, None, None, date(2026, 1, 31), None, None, 0),
+        RecurrenceRule('monthly', 4, None, None, date(2024, 2, 29), None, 6, 0),
+    ]
+
+    def _rrule_between(self, rule, window_from, window_to):
+        return tuple(
+            dt.date() for dt in to_rrule(rule).between(
+                datetime.combine(window_from, time.min), datetime.combine(window_to, time.max), inc=True
+            )
+        )
+
+    def test_matches_rrule(self):
+        """Test el motor produce las mismas fechas que rrule"""
+        windows = [(date(2026, 1, 1), date(2026, 12, 31)), (date(2031, 5, 10), date(2031, 8, 1))]
+        for rule in self.RULES:
+            for window_from, window_to in windows:
+                with self.subTest(rule=rule, window=window_from):
+                    self.assertEqual(
+                        recurrence_engine.dates(rule, window_to.toordinal(), start=window_from),
+                        self._rrule_between(rule, window_from, window_to)
+                    )
+            self.assertEqual(
+                recurrence_engine.dates(rule, recurrence_engine.MAX_ORDINAL, limit=40),
+                tuple(dt.date() for dt in islice(to_rrule(rule), 40))
+            )
+
+    def test_monthdays_clamped_to_month_end(self):
+        """Test el día 31 se ajusta al último día de los meses más cortos"""
+        rule = RecurrenceRule('monthly', 1, None, (15, 31), date(2028, 1, 1), None, None, 0)
+        dates = recurrence_engine.dates(rule, date(2028, 4, 30).toordinal())
+        self.assertEqual(dates, (
+            date(2028, 1, 15), date(2028, 1, 31), date(2028, 2, 15), date(2028, 2, 29),
+            date(2028, 3, 15), date(2028, 3, 31), date(2028, 4, 15), date(2028, 4, 30)
+        ))
+
+    def test_monthdays_deduplicated_after_clamping(self):
+        """Test 30 y 31 en febrero generan una sola ocurrencia"""
+        rule = RecurrenceRule('monthly', 1, None, (30, 31), date(2026, 2, 1), None, 3, 0)
+        self.assertEqual(recurrence_engine.dates(rule, recurrence_engine.MAX_ORDINAL), (
+            date(2026, 2, 28), date(2026, 3, 30), date(2026, 3, 31)
+        ))
+
+    def test_occurrences_between_with_limit(self):
+        """Test con limit se devuelven las primeras fechas de la ventana, igual que sin limit"""
+        rules = self.RULES + [RecurrenceRule('yearly', 2, None, None, date(2026, 3, 1), None, None, 0)]
+        for rule in rules:
+            full = occurrences_between(rule, date(2026, 2, 1), date(2040, 12, 31))
+            for limit in (1, 7, 50, 10000):
+                with self.subTest(rule=rule, limit=limit):
+                    self.assertEqual(occurrences_between(rule, date(2026, 2, 1), date(2040, 12, 31), limit), full[:limit])
+
+    def test_count_occurrences_matches_expansion(self):
+        """Test el total calculado sin expandir coincide con el número de fechas generadas"""
+        rules = [
+            RecurrenceRule('daily', 3, None, None, date(2026, 1, 30), date(2031, 2, 3), None, 0),
+            RecurrenceRule('weekly', 2, ('MO', 'WE', 'FR'), None, date(2026, 1, 7), date(2033, 6, 1), None, 0),
+            RecurrenceRule('weekly', 1, None, None, date(2026, 1, 8), date(2026, 1, 7), None, 0),
+            RecurrenceRule('weekly', 3, ('SU', 'TU'), None, date(2026, 2, 3), date(2030, 1, 1), 40, 0),
+            RecurrenceRule('monthly', 1, None, None, date(2026, 1, 31), date(2041, 3, 30), None, 0),
+            RecurrenceRule('monthly', 1, None, (29, 30, 31), date(2026, 1, 30), date(2045, 2, 28), None, 0),
+            RecurrenceRule('monthly', 3, None, None, date(2024, 2, 29), date(2036, 5, 29), None, 0),
+            RecurrenceRule('monthly', 12, None, (28, 29), date(2025, 2, 1), date(2101, 2, 28), None, 0),
+            RecurrenceRule('monthly', 5, None, (1, 15), date(2026, 1, 15), date(2038, 1, 1), None, 0),
+            RecurrenceRule('monthly', 2, None, None, date(2026, 1, 10), date(2040, 1, 1), 30, 0),
+        ]
+        for rule in rules:
+            with self.subTest(rule=rule):
+                expected = len(recurrence_engine.ordinals(rule, recurrence_engine.MAX_ORDINAL))
+                self.assertEqual(recurrence.count_occurrences(rule, 100000), (expected, False))
+        yearly = RecurrenceRule('yearly', 1, None, None, date(2026, 1, 1), None, 5000, 0)
+        self.assertEqual(recurrence.count_occurrences(yearly, 10000), (5000, False))
+        self.assertEqual(recurrence.count_occurrences(yearly, 100), (100, True))
+
+    def test_has_occurrences_after_matches_rrule(self):
+        """Test has_occurrences_after coincide con rrule, también con count"""
+        rules = self.RULES + [
+            RecurrenceRule('yearly', 1, None, None, date(2026, 3, 1), None, 3, 0),
+        ]
+        days = [date(2025, 12, 1), date(2026, 1, 30), date(2026, 3, 9), date(2026, 5, 20), date(2027, 1, 1), date(2029, 6, 1)]
+        for rule in rules:
+            for day in days:
+                with self.subTest(rule=rule, day=day):
+                    self.assertEqual(
+                        recurrence.has_occurrences_after(rule, day),
+                        to_rrule(rule).after(datetime.combine(day, time.max)) is not None
+                    )
+
+    def test_parse_count_must_be_positive(self):
+        """Test count menor que 1 es inválido"""
+        for count in (-3, '-1'):
+            with self.subTest(count=count), self.assertRaises(ValueError):
+                parse_recurrence({'frequency': 'yearly', 'endType': 'count', 'count': count},
+                                 date(2026, 1, 1), date(2026, 1, 1), 'diaria')
+
+    def test_parse_monthdays(self):
+        """Test validación de monthdays en el payload"""
+        rule = parse_recurrence({'frequency': 'monthly', 'monthdays': [31, 1, 31]}, date(2026, 1, 1), date(2026, 1, 1), 'diaria')
+        self.assertEqual(rule.monthdays, (1, 31))
+        with self.assertRaises(ValueError):
+            parse_recurrence({'frequency': 'monthly', 'monthdays': [0]}, date(2026, 1, 1), date(2026, 1, 1), 'diaria')
+
+
+class TestRecurrenceCacheHealth(unittest.TestCase):
+    """Tests para las estadísticas de la caché en /api/health"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_create_task_with_monthdays(self):
+        """Test POST /api/tasks/ respeta recurrence.monthdays"""
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'Pagar facturas',
+            'fecha_inicio': '2027-01-10',
+            'fecha_fin': '2027-01-10',
+            'recurrence': {'enabled': True, 'frequency': 'monthly', 'monthdays': [1, 31], 'endType': 'count', 'count': 4}
+        })
+        self.assertEqual(response.status_code, 201)
+        with self.app_instance.app_context():
+            fechas = [task.fecha_inicio for task in Task.query.order_by(Task.fecha_inicio)]
+        self.assertEqual(fechas, [date(2027, 1, 31), date(2027, 2, 1), date(2027, 2, 28), date(2027, 3, 1)])
+
+    def test_health_reports_cache_stats(self):
+        """Test /api/health incluye aciertos y fallos de la caché"""
+        self.app.post('/api/series/', json={
+            'titulo': 'Daily',
+            'fecha_inicio': '2026-01-01',
+            'fecha_fin': '2026-01-01',
+            'recurrence': {'enabled': True, 'frequency': 'daily', 'endType': 'count', 'count': 10}
+        })
+        recurrence.cache_clear()
+        self.app.get('/api/series/occurrences?from=2026-01-01&to=2026-01-31')
+        self.app.get('/api/series/occurrences?from=2026-01-01&to=2026-01-31')
+
+        stats = self.app.get('/api/health').get_json()['recurrence_cache']['between']
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['maxsize'], recurrence.EXPANSION_CACHE_SIZE)
+
+
+
+class TestRecurrencePreview(unittest.TestCase):
+    """Tests para POST /api/tasks/recurrence/preview"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _preview(self, recurrence, **extra):
+        return self.app.post('/api/tasks/recurrence/preview', json=dict(
+            {'fecha_inicio': '2026-01-01', 'fecha_fin': '2026-01-01', 'recurrence': recurrence}, **extra
+        ))
+
+    def test_preview_with_end_date(self):
+        """Test primeras fechas y total de una regla con fecha fin"""
+        response = self._preview(
+            {'frequency': 'weekly', 'weekdays': ['MO', 'TH'], 'endType': 'date', 'endDate': '2026-01-31'},
+            limit=3
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['dates'], ['2026-01-01', '2026-01-05', '2026-01-08'])
+        self.assertEqual(data['total'], 9)
+        self.assertFalse(data['total_capped'])
+
+    def test_preview_open_ended(self):
+        """Test una regla sin fin no tiene total"""
+        data = self._preview({'frequency': 'daily'}).get_json()
+        self.assertEqual(len(data['dates']), 10)
+        self.assertIsNone(data['total'])
+
+    def test_preview_total_capped(self):
+        """Test el total se cuenta como máximo hasta el límite"""
+        data = self._preview({'frequency': 'weekly', 'endType': 'count', 'count': 50000}).get_json()
+        self.assertEqual(data['total'], 10000)
+        self.assertTrue(data['total_capped'])
+
+    def test_preview_does_not_create_tasks(self):
+        """Test la vista previa no escribe en la base de datos"""
+        self._preview({'frequency': 'daily', 'endType': 'count', 'count': 5})
+        with self.app_instance.app_context():
+            self.assertEqual(Task.query.count(), 0)
+
+    def test_preview_validation(self):
+        """Test validaciones de la vista previa"""
+        self.assertEqual(self._preview({'frequency': 'hourly'}).status_code, 400)
+        self.assertEqual(self._preview({'frequency': 'yearly', 'endType': 'count', 'count': -3}).status_code, 400)
+        self.assertEqual(self._preview('daily').status_code, 400)
+        self.assertEqual(self.app.post('/api/tasks/recurrence/preview', json=['2026-01-01']).status_code, 400)
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'X', 'fecha_inicio': '2026-01-01', 'fecha_fin': '2026-01-01', 'recurrence': 'daily'
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self._preview({'frequency': 'daily'}, limit=1000).status_code, 400)
+        self.assertEqual(self.app.post('/api/tasks/recurrence/preview', json={'recurrence': {}}).status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,9 @@ import unittest
 import sys
 import os
 import json
-from datetime import date, time, timedelta
+from unittest import mock
+from datetime import date, time, datetime, timedelta, timezone
+from sqlalchemy import event
 
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
@@ -15,6 +17,7 @@ from app import create_app
 from database.db import db
 from models.task import Task
 from models.subtask import Subtask
+from services.pagination import encode_cursor
 
 
 class TestTaskRoutes(unittest.TestCase):
@@ -573,6 +576,646 @@ class TestTaskFilters(unittest.TestCase):
         tasks = response.get_json()['tasks']
         self.assertEqual(len(tasks), 3)
 
+    def test_get_tasks_date_window(self):
+        """Test filtrar tareas por ventana ?from=&to="""
+        today = date.today().isoformat()
+        response = self.app.get(f'/api/tasks/?from={today}&to={today}')
+        self.assertEqual(response.status_code, 200)
+        titles = [t['titulo'] for t in response.get_json()['tasks']]
+        self.assertEqual(titles, ['Task Today'])
+
+    def test_get_tasks_date_window_overlap(self):
+        """Test que una tarea de varios días aparece si se solapa con la ventana"""
+        today = date.today()
+        with self.app_instance.app_context():
+            db.session.add(Task(titulo='Long Task', fecha_inicio=today - timedelta(days=10),
+                                fecha_fin=today + timedelta(days=10)))
+            db.session.commit()
+
+        start = (today + timedelta(days=5)).isoformat()
+        end = (today + timedelta(days=6)).isoformat()
+        response = self.app.get(f'/api/tasks/?from={start}&to={end}')
+        titles = [t['titulo'] for t in response.get_json()['tasks']]
+        self.assertEqual(titles, ['Long Task'])
+
+    def test_get_tasks_date_window_bounded_by_longest_task(self):
+        """Test que la cota inferior de fecha_inicio usa la duración de la tarea más larga"""
+        today = date.today()
+        with self.app_instance.app_context():
+            old = Task(titulo='Old Task', fecha_inicio=today - timedelta(days=400), fecha_fin=today - timedelta(days=400))
+            db.session.add(old)
+            db.session.commit()
+            old_id = old.id
+
+        day = (today + timedelta(days=30)).isoformat()
+        self.assertEqual(self.app.get(f'/api/tasks/date/{day}').get_json()['tasks'], [])
+
+        # Al alargarla pasa a ser la tarea más larga y la ventana la incluye
+        self.app.put(f'/api/tasks/{old_id}', json={'fecha_fin': day})
+        titles = [t['titulo'] for t in self.app.get(f'/api/tasks/date/{day}').get_json()['tasks']]
+        self.assertEqual(titles, ['Old Task'])
+        response = self.app.get(f'/api/tasks/?from={day}&to={day}')
+        self.assertEqual([t['titulo'] for t in response.get_json()['tasks']], ['Old Task'])
+
+    def test_get_tasks_date_window_open_ended(self):
+        """Test ventana con solo uno de los extremos"""
+        today = date.today().isoformat()
+        response = self.app.get(f'/api/tasks/?from={today}')
+        titles = {t['titulo'] for t in response.get_json()['tasks']}
+        self.assertEqual(titles, {'Task Today', 'Task Tomorrow'})
+
+        response = self.app.get(f'/api/tasks/?to={today}')
+        titles = {t['titulo'] for t in response.get_json()['tasks']}
+        self.assertEqual(titles, {'Task Today', 'Task Yesterday'})
+
+    def test_get_tasks_date_window_invalid(self):
+        """Test ventana con formato inválido o invertida"""
+        response = self.app.get('/api/tasks/?from=2025-13-01')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.app.get('/api/tasks/?from=2025-02-01&to=2025-01-01')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestTaskPagination(unittest.TestCase):
+    """Tests para la paginación por cursor de GET /api/tasks/"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+            # Dos tareas por día para probar el desempate por id
+            for i in range(10):
+                day = date(2025, 1, 1) + timedelta(days=i // 2)
+                db.session.add(Task(titulo=f'Task {i}', fecha_inicio=day, fecha_fin=day))
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_without_limit_returns_everything(self):
+        """Test que sin limit se devuelve todo y no hay cursor"""
+        data = self.app.get('/api/tasks/').get_json()
+        self.assertEqual(len(data['tasks']), 10)
+        self.assertIsNone(data['next_cursor'])
+
+    def test_walk_all_pages(self):
+        """Test recorrer todas las páginas con next_cursor"""
+        full = [t['id'] for t in self.app.get('/api/tasks/').get_json()['tasks']]
+
+        seen = []
+        url = '/api/tasks/?limit=3'
+        while True:
+            data = self.app.get(url).get_json()
+            self.assertLessEqual(len(data['tasks']), 3)
+            seen.extend(t['id'] for t in data['tasks'])
+            if not data['next_cursor']:
+                break
+            url = f"/api/tasks/?limit=3&cursor={data['next_cursor']}"
+
+        self.assertEqual(seen, full)
+
+    def test_last_page_has_no_cursor(self):
+        """Test que la última página no devuelve cursor"""
+        data = self.app.get('/api/tasks/?limit=10').get_json()
+        self.assertEqual(len(data['tasks']), 10)
+        self.assertIsNone(data['next_cursor'])
+
+    def test_pagination_with_date_window(self):
+        """Test que el cursor se combina con la ventana de fechas"""
+        first = self.app.get('/api/tasks/?from=2025-01-02&to=2025-01-03&limit=3').get_json()
+        self.assertEqual(len(first['tasks']), 3)
+        second = self.app.get(
+            f"/api/tasks/?from=2025-01-02&to=2025-01-03&limit=3&cursor={first['next_cursor']}"
+        ).get_json()
+        self.assertEqual(len(second['tasks']), 1)
+        self.assertIsNone(second['next_cursor'])
+
+    def test_invalid_limit(self):
+        """Test limit inválido"""
+        for value in ['0', '-1', 'abc', '100000']:
+            response = self.app.get(f'/api/tasks/?limit={value}')
+            self.assertEqual(response.status_code, 400)
+
+    def test_invalid_cursor(self):
+        """Test cursor corrupto"""
+        response = self.app.get('/api/tasks/?limit=2&cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestTaskFieldSelection(unittest.TestCase):
+    """Tests para ?fields= e ?include=subtasks"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+            task = Task(titulo='Task 1', descripcion='Descripción larga',
+                        fecha_inicio=date(2025, 1, 1), fecha_fin=date(2025, 1, 2))
+            task.subtasks = [Subtask(titulo='Sub 1')]
+            db.session.add(task)
+            db.session.commit()
+            self.task_id = task.id
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _get_with_statements(self, url):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with self.app_instance.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = self.app.get(url)
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+        return response, statements
+
+    def test_fields_subset(self):
+        """Test que fields limita las claves y no incluye subtareas"""
+        response, statements = self._get_with_statements('/api/tasks/?fields=titulo,fecha_inicio,completada')
+        self.assertEqual(response.status_code, 200)
+        task = response.get_json()['tasks'][0]
+        self.assertEqual(set(task), {'id', 'titulo', 'fecha_inicio', 'completada'})
+        self.assertEqual(task['fecha_inicio'], '2025-01-01')
+
+        # Solo se seleccionan las columnas pedidas y no se consultan subtareas
+        self.assertEqual(len(statements), 1)
+        self.assertNotIn('descripcion', statements[0])
+
+    def test_fields_with_include_subtasks(self):
+        """Test include=subtasks junto con fields"""
+        response = self.app.get('/api/tasks/?fields=titulo&include=subtasks')
+        task = response.get_json()['tasks'][0]
+        self.assertEqual(set(task), {'id', 'titulo', 'subtasks'})
+        self.assertEqual(task['subtasks'][0]['titulo'], 'Sub 1')
+
+    def test_fields_with_pagination(self):
+        """Test que el cursor funciona aunque fecha_inicio no se pida"""
+        with self.app_instance.app_context():
+            db.session.add(Task(titulo='Task 2', fecha_inicio=date(2025, 1, 5), fecha_fin=date(2025, 1, 5)))
+            db.session.commit()
+
+        first = self.app.get('/api/tasks/?fields=titulo&limit=1').get_json()
+        self.assertEqual([t['titulo'] for t in first['tasks']], ['Task 2'])
+        self.assertNotIn('fecha_inicio', first['tasks'][0])
+        second = self.app.get(f"/api/tasks/?fields=titulo&limit=1&cursor={first['next_cursor']}").get_json()
+        self.assertEqual([t['titulo'] for t in second['tasks']], ['Task 1'])
+
+    def test_single_task_fields(self):
+        """Test fields en GET /api/tasks/<id>"""
+        response = self.app.get(f'/api/tasks/{self.task_id}?fields=color')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.get_json()['task']), {'id', 'color'})
+
+    def test_default_response_is_complete(self):
+        """Test que sin fields la respuesta es la completa"""
+        task = self.app.get('/api/tasks/').get_json()['tasks'][0]
+        self.assertIn('descripcion', task)
+        self.assertEqual(len(task['subtasks']), 1)
+
+    def test_invalid_fields(self):
+        """Test campos o include desconocidos"""
+        self.assertEqual(self.app.get('/api/tasks/?fields=password').status_code, 400)
+        self.assertEqual(self.app.get('/api/tasks/?include=comments').status_code, 400)
+        self.assertEqual(self.app.get(f'/api/tasks/{self.task_id}?fields=nope').status_code, 400)
+
+
+class TestConditionalGet(unittest.TestCase):
+    """Tests para ETag / If-None-Match en las lecturas de tareas"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+            task = Task(titulo='Task 1', fecha_inicio=date.today(), fecha_fin=date.today())
+            db.session.add(task)
+            db.session.commit()
+            self.task_id = task.id
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_list_returns_etag(self):
+        """Test que el listado devuelve ETag"""
+        response = self.app.get('/api/tasks/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.headers.get('ETag'))
+
+    def test_not_modified_without_queries(self):
+        """Test 304 con If-None-Match sin consultar la base de datos"""
+        etag = self.app.get('/api/tasks/').headers['ETag']
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with self.app_instance.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = self.app.get('/api/tasks/', headers={'If-None-Match': etag})
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(statements, [])
+
+    def test_stream_has_its_own_etag(self):
+        """Test que JSON y NDJSON tienen ETag distintos y varían según Accept"""
+        json_response = self.app.get('/api/tasks/')
+        stream_response = self.app.get('/api/tasks/', headers={'Accept': 'application/x-ndjson'})
+        self.assertEqual(stream_response.mimetype, 'application/x-ndjson')
+        self.assertNotEqual(json_response.headers['ETag'], stream_response.headers['ETag'])
+        for response in (json_response, stream_response):
+            self.assertIn('Accept', response.vary)
+
+        # El ETag de una representación no valida la otra
+        response = self.app.get('/api/tasks/', headers={
+            'Accept': 'application/x-ndjson', 'If-None-Match': json_response.headers['ETag']
+        })
+        self.assertEqual(response.status_code, 200)
+        response = self.app.get('/api/tasks/?stream=1', headers={'If-None-Match': stream_response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('Accept', response.vary)
+
+    def test_etag_changes_after_mutations(self):
+        """Test que crear, alternar y eliminar cambian el ETag"""
+        etag = self.app.get('/api/tasks/').headers['ETag']
+
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'New', 'fecha_inicio': date.today().isoformat(), 'fecha_fin': date.today().isoformat()
+        })
+        new_id = response.get_json()['task']['id']
+        response = self.app.get('/api/tasks/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+
+        self.app.patch(f'/api/tasks/{new_id}/toggle')
+        response = self.app.get('/api/tasks/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+
+        self.app.delete(f'/api/tasks/{new_id}')
+        response = self.app.get('/api/tasks/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_failed_mutation_keeps_etag(self):
+        """Test que una petición rechazada no cambia el ETag"""
+        etag = self.app.get('/api/tasks/').headers['ETag']
+        self.app.post('/api/tasks/', json={'titulo': ''})
+        self.app.put('/api/tasks/9999', json={'titulo': 'x'})
+        response = self.app.get('/api/tasks/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_single_task_conditional(self):
+        """Test ETag en GET /api/tasks/<id>"""
+        response = self.app.get(f'/api/tasks/{self.task_id}')
+        etag = response.headers['ETag']
+        response = self.app.get(f'/api/tasks/{self.task_id}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        self.app.put(f'/api/tasks/{self.task_id}', json={'titulo': 'Renamed'})
+        response = self.app.get(f'/api/tasks/{self.task_id}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['task']['titulo'], 'Renamed')
+
+
+class TestTaskChanges(unittest.TestCase):
+    """Tests para la sincronización por deltas GET /api/tasks/changes"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+            old = Task(titulo='Old', fecha_inicio=date(2025, 1, 1), fecha_fin=date(2025, 1, 1),
+                       updated_at=datetime(2020, 1, 1))
+            old.subtasks = [Subtask(titulo='Old sub')]
+            db.session.add(old)
+            db.session.commit()
+            self.old_id = old.id
+            self.old_subtask_id = old.subtasks[0].id
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _token(self, moment):
+        return encode_cursor([moment.isoformat()])
+
+    def test_initial_sync_returns_everything(self):
+        """Test que sin since se devuelven todas las tareas y un token"""
+        data = self.app.get('/api/tasks/changes').get_json()
+        self.assertEqual([t['id'] for t in data['tasks']], [self.old_id])
+        self.assertEqual(data['deleted'], [])
+        self.assertTrue(data['sync_token'])
+
+    def test_only_changed_tasks_are_returned(self):
+        """Test que solo se devuelven tareas modificadas después del token"""
+        since = self._token(datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=1))
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'New', 'fecha_inicio': '2025-02-01', 'fecha_fin': '2025-02-01'
+        })
+        new_id = response.get_json()['task']['id']
+
+        data = self.app.get(f'/api/tasks/changes?since={since}').get_json()
+        self.assertEqual([t['id'] for t in data['tasks']], [new_id])
+        self.assertIn('updated_at', data['tasks'][0])
+
+    def test_subtask_toggle_marks_parent_changed(self):
+        """Test que alternar una subtarea incluye la tarea en el delta"""
+        since = self._token(datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=1))
+        self.app.patch(f'/api/tasks/{self.old_id}/subtasks/{self.old_subtask_id}/toggle')
+        data = self.app.get(f'/api/tasks/changes?since={since}').get_json()
+        self.assertEqual([t['id'] for t in data['tasks']], [self.old_id])
+        self.assertTrue(data['tasks'][0]['subtasks'][0]['completada'])
+
+    def test_deletes_are_reported_as_tombstones(self):
+        """Test que los borrados de tareas y subtareas aparecen en deleted"""
+        since = self._token(datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=1))
+        self.app.delete(f'/api/tasks/{self.old_id}')
+        data = self.app.get(f'/api/tasks/changes?since={since}').get_json()
+        self.assertEqual(data['tasks'], [])
+        self.assertIn({'entity': 'task', 'id': self.old_id, 'task_id': None}, data['deleted'])
+        self.assertIn({'entity': 'subtask', 'id': self.old_subtask_id, 'task_id': self.old_id}, data['deleted'])
+
+    def test_deleted_ids_are_not_reused(self):
+        """Test que una tarea o subtarea nueva no recibe el id de una borrada"""
+        since = self._token(datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=1))
+        self.app.delete(f'/api/tasks/{self.old_id}')
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'B', 'fecha_inicio': '2025-02-01', 'fecha_fin': '2025-02-01', 'subtasks': [{'titulo': 'Sub'}]
+        })
+        task = response.get_json()['task']
+        self.assertNotEqual(task['id'], self.old_id)
+        self.assertNotEqual(task['subtasks'][0]['id'], self.old_subtask_id)
+
+        data = self.app.get(f'/api/tasks/changes?since={since}').get_json()
+        live = {('task', t['id']) for t in data['tasks']}
+        live |= {('subtask', s['id']) for t in data['tasks'] for s in t['subtasks']}
+        self.assertFalse(live & {(tombstone['entity'], tombstone['id']) for tombstone in data['deleted']})
+
+    def test_replaced_subtasks_are_reported(self):
+        """Test que reemplazar subtareas en PUT deja tombstones"""
+        since = self._token(datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=1))
+        self.app.put(f'/api/tasks/{self.old_id}', json={'subtasks': [{'titulo': 'New sub'}]})
+        data = self.app.get(f'/api/tasks/changes?since={since}').get_json()
+        self.assertEqual([s['titulo'] for s in data['tasks'][0]['subtasks']], ['New sub'])
+        self.assertEqual(data['deleted'], [
+            {'entity': 'subtask', 'id': self.old_subtask_id, 'task_id': self.old_id}
+        ])
+
+    def test_token_round_trip(self):
+        """Test que el token devuelto sirve para la siguiente petición"""
+        token = self.app.get('/api/tasks/changes').get_json()['sync_token']
+        response = self.app.get(f'/api/tasks/changes?since={token}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['tasks'], [])
+
+    def test_invalid_and_expired_tokens(self):
+        """Test tokens inválidos o más antiguos que la retención de borrados"""
+        self.assertEqual(self.app.get('/api/tasks/changes?since=garbage').status_code, 400)
+        expired = self._token(datetime(2000, 1, 1))
+        self.assertEqual(self.app.get(f'/api/tasks/changes?since={expired}').status_code, 410)
+
+
+class TestTaskStreaming(unittest.TestCase):
+    """Tests para el modo streaming NDJSON del listado"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+            for i in range(5):
+                task = Task(titulo=f'Task {i}', fecha_inicio=date(2025, 1, 1 + i), fecha_fin=date(2025, 1, 1 + i))
+                task.subtasks = [Subtask(titulo=f'Sub {i}')]
+                db.session.add(task)
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _lines(self, response):
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    def test_stream_matches_json_listing(self):
+        """Test que cada línea NDJSON coincide con el listado JSON"""
+        expected = self.app.get('/api/tasks/').get_json()['tasks']
+        response = self.app.get('/api/tasks/?stream=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(self._lines(response), expected)
+
+    def test_stream_with_accept_header(self):
+        """Test selección del modo streaming con la cabecera Accept"""
+        response = self.app.get('/api/tasks/', headers={'Accept': 'application/x-ndjson'})
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(len(self._lines(response)), 5)
+
+        response = self.app.get('/api/tasks/', headers={'Accept': '*/*'})
+        self.assertEqual(response.mimetype, 'application/json')
+
+    def test_stream_in_small_batches(self):
+        """Test que el resultado es el mismo con lotes más pequeños que el total"""
+        with mock.patch('controllers.task_controller.STREAM_BATCH_SIZE', 2):
+            lines = self._lines(self.app.get('/api/tasks/?stream=1'))
+        self.assertEqual([t['titulo'] for t in lines], [f'Task {i}' for i in reversed(range(5))])
+        self.assertEqual([t['subtasks'][0]['titulo'] for t in lines], [f'Sub {i}' for i in reversed(range(5))])
+
+    def test_stream_with_filters_and_fields(self):
+        """Test streaming combinado con ventana de fechas y fields"""
+        response = self.app.get('/api/tasks/?stream=1&from=2025-01-02&to=2025-01-03&fields=titulo')
+        self.assertEqual(self._lines(response), [
+            {'id': 3, 'titulo': 'Task 2'},
+            {'id': 2, 'titulo': 'Task 1'},
+        ])
+
+    def test_stream_rejects_pagination(self):
+        """Test que limit/cursor no se combinan con streaming"""
+        response = self.app.get('/api/tasks/?stream=1&limit=2')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestPendingAndDateRoutes(unittest.TestCase):
+    """Tests para GET /api/tasks/pending y GET /api/tasks/date/<fecha>"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+            db.session.add_all([
+                Task(titulo='Jan 2 10:00', fecha_inicio=date(2025, 1, 2), fecha_fin=date(2025, 1, 2),
+                     hora=time(10, 0)),
+                Task(titulo='Jan 2 sin hora', fecha_inicio=date(2025, 1, 2), fecha_fin=date(2025, 1, 2)),
+                Task(titulo='Jan 2 08:00', fecha_inicio=date(2025, 1, 2), fecha_fin=date(2025, 1, 2),
+                     hora=time(8, 0)),
+                Task(titulo='Jan 1 hecha', fecha_inicio=date(2025, 1, 1), fecha_fin=date(2025, 1, 1),
+                     completada=True),
+                Task(titulo='Jan 1-3', fecha_inicio=date(2025, 1, 1), fecha_fin=date(2025, 1, 3)),
+                Task(titulo='Jan 5', fecha_inicio=date(2025, 1, 5), fecha_fin=date(2025, 1, 5)),
+            ])
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _titles(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [t['titulo'] for t in response.get_json()['tasks']]
+
+    def test_pending_ordered_by_date_and_time(self):
+        """Test tareas pendientes ordenadas por fecha y hora"""
+        titles = self._titles(self.app.get('/api/tasks/pending'))
+        self.assertEqual(titles, ['Jan 1-3', 'Jan 2 sin hora', 'Jan 2 08:00', 'Jan 2 10:00', 'Jan 5'])
+
+    def test_pending_pagination(self):
+        """Test recorrer las pendientes por páginas"""
+        seen = []
+        url = '/api/tasks/pending?limit=2'
+        while url:
+            data = self.app.get(url).get_json()
+            seen.extend(t['titulo'] for t in data['tasks'])
+            url = f"/api/tasks/pending?limit=2&cursor={data['next_cursor']}" if data['next_cursor'] else None
+        self.assertEqual(seen, self._titles(self.app.get('/api/tasks/pending')))
+
+    def test_pending_fields(self):
+        """Test selección de campos en pendientes"""
+        data = self.app.get('/api/tasks/pending?fields=titulo').get_json()
+        self.assertEqual(set(data['tasks'][0]), {'id', 'titulo'})
+
+    def test_tasks_by_date(self):
+        """Test tareas de un día, incluidas las de varios días que lo cubren"""
+        titles = self._titles(self.app.get('/api/tasks/date/2025-01-02'))
+        self.assertEqual(titles, ['Jan 1-3', 'Jan 2 sin hora', 'Jan 2 08:00', 'Jan 2 10:00'])
+
+        titles = self._titles(self.app.get('/api/tasks/date/2025-01-01'))
+        self.assertEqual(set(titles), {'Jan 1 hecha', 'Jan 1-3'})
+
+    def test_tasks_by_date_pagination(self):
+        """Test paginación en tareas por fecha"""
+        first = self.app.get('/api/tasks/date/2025-01-02?limit=3').get_json()
+        second = self.app.get(f"/api/tasks/date/2025-01-02?limit=3&cursor={first['next_cursor']}").get_json()
+        self.assertEqual([t['titulo'] for t in second['tasks']], ['Jan 2 10:00'])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_tasks_by_date_invalid(self):
+        """Test fecha con formato inválido"""
+        response = self.app.get('/api/tasks/date/02-01-2025')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestTaskListQueries(unittest.TestCase):
+    """Tests para el número de consultas SQL del listado de tareas"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _create_tasks(self, count):
+        with self.app_instance.app_context():
+            for i in range(count):
+                task = Task(titulo=f'Task {i}', fecha_inicio=date.today(), fecha_fin=date.today())
+                task.subtasks = [Subtask(titulo='A'), Subtask(titulo='B')]
+                db.session.add(task)
+            db.session.commit()
+
+    def _count_list_queries(self):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with self.app_instance.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = self.app.get('/api/tasks/')
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+        self.assertEqual(response.status_code, 200)
+        return len(statements), response.get_json()['tasks']
+
+    def test_list_query_count_is_constant(self):
+        """Test que el listado no hace una consulta por tarea (N+1)"""
+        self._create_tasks(3)
+        few_queries, tasks = self._count_list_queries()
+        self.assertEqual(len(tasks), 3)
+
+        self._create_tasks(50)
+        many_queries, tasks = self._count_list_queries()
+        self.assertEqual(len(tasks), 53)
+        self.assertEqual(few_queries, many_queries)
+        self.assertLessEqual(many_queries, 2)
+
+        for task in tasks:
+            self.assertEqual([s['titulo'] for s in task['subtasks']], ['A', 'B'])
+
 
 class TestValidation(unittest.TestCase):
     """Tests para validación de datos de entrada"""
@@ -639,6 +1282,375 @@ class TestValidation(unittest.TestCase):
         self.assertEqual(response.status_code, 404)
 
 
+class TestTaskBatch(unittest.TestCase):
+    """Tests para el lote de operaciones POST /api/tasks/batch"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+            tasks = [
+                Task(titulo=f'Task {i}', fecha_inicio=date(2025, 1, i), fecha_fin=date(2025, 1, i))
+                for i in range(1, 5)
+            ]
+            tasks[0].subtasks = [Subtask(titulo='Vieja')]
+            db.session.add_all(tasks)
+            db.session.commit()
+            self.ids = [task.id for task in tasks]
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _batch(self, operations):
+        return self.app.post('/api/tasks/batch', json={'operations': operations})
+
+    def test_mixed_batch(self):
+        """Test que create/update/delete/toggle se aplican y devuelven un resultado por operación"""
+        response = self._batch([
+            {'op': 'create', 'data': {'titulo': 'Nueva', 'fecha_inicio': '2025-02-01', 'fecha_fin': '2025-02-01',
+                                      'subtasks': [{'titulo': 'Paso'}]}},
+            {'op': 'update', 'id': self.ids[0], 'data': {'titulo': 'Editada', 'subtasks': [{'titulo': 'Nueva sub'}]}},
+            {'op': 'update', 'id': self.ids[1], 'data': {'prioridad': 'alta'}},
+            {'op': 'delete', 'id': self.ids[2]},
+            {'op': 'toggle', 'id': self.ids[3]},
+            {'op': 'create', 'data': {'titulo': 'Otra', 'fecha_inicio': '2025-02-02', 'fecha_fin': '2025-02-03'}}
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()['results']
+        self.assertEqual([result['index'] for result in results], list(range(6)))
+        self.assertEqual([result['status'] for result in results], [201, 200, 200, 200, 200, 201])
+        
+        self.assertEqual(results[0]['task']['titulo'], 'Nueva')
+        self.assertEqual([s['titulo'] for s in results[0]['task']['subtasks']], ['Paso'])
+        self.assertEqual(results[5]['task']['titulo'], 'Otra')
+        self.assertEqual(results[5]['task']['fecha_fin'], '2025-02-03')
+        self.assertEqual(results[1]['task']['titulo'], 'Editada')
+        self.assertEqual([s['titulo'] for s in results[1]['task']['subtasks']], ['Nueva sub'])
+        self.assertEqual(results[2]['task']['prioridad'], 'alta')
+        self.assertEqual(results[2]['task']['titulo'], 'Task 2')
+        self.assertNotIn('task', results[3])
+        self.assertTrue(results[4]['task']['completada'])
+        
+        with self.app_instance.app_context():
+            self.assertIsNone(db.session.get(Task, self.ids[2]))
+            self.assertEqual(Task.query.count(), 5)
+        
+        # Las bajas y las subtareas reemplazadas quedan para la sincronización
+        since = encode_cursor([(datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=1)).isoformat()])
+        changes = self.app.get(f'/api/tasks/changes?since={since}').get_json()
+        self.assertIn({'entity': 'task', 'id': self.ids[2], 'task_id': None}, changes['deleted'])
+        self.assertIn('subtask', {tombstone['entity'] for tombstone in changes['deleted']})
+
+    def test_invalid_operation_applies_nothing(self):
+        """Test que un lote con una operación inválida no aplica ninguna"""
+        response = self._batch([
+            {'op': 'toggle', 'id': self.ids[0]},
+            {'op': 'update', 'id': 9999, 'data': {'titulo': 'X'}},
+            {'op': 'create', 'data': {'titulo': '', 'fecha_inicio': '2025-01-01', 'fecha_fin': '2025-01-01'}},
+            {'op': 'update', 'id': self.ids[1], 'data': {'fecha_fin': '2024-12-01'}},
+            {'op': 'archive', 'id': self.ids[2]}
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.get_json()['errors']
+        self.assertEqual([(error['index'], error['status']) for error in errors],
+                         [(1, 404), (2, 400), (3, 400), (4, 400)])
+        
+        with self.app_instance.app_context():
+            self.assertFalse(db.session.get(Task, self.ids[0]).completada)
+            self.assertEqual(Task.query.count(), 4)
+
+    def test_create_with_null_defaults(self):
+        """Test que color y completada nulos toman el valor por defecto como en POST /api/tasks/"""
+        base = {'fecha_inicio': '2025-02-01', 'fecha_fin': '2025-02-01'}
+        response = self._batch([
+            {'op': 'create', 'data': dict(base, titulo='Sin color', color=None)},
+            {'op': 'create', 'data': dict(base, titulo='Sin estado', completada=None)},
+            {'op': 'create', 'data': dict(base, titulo='Completa', completada=True)}
+        ])
+        self.assertEqual(response.status_code, 200)
+        tasks = [result['task'] for result in response.get_json()['results']]
+        self.assertEqual([task['titulo'] for task in tasks], ['Sin color', 'Sin estado', 'Completa'])
+        self.assertEqual(tasks[0]['color'], '#1976d2')
+        self.assertEqual([task['completada'] for task in tasks], [False, False, True])
+
+    def test_wrong_types_rejected_per_operation(self):
+        """Test que los campos con tipos inesperados dan 400 en su operación, no 500"""
+        response = self._batch([
+            {'op': 'update', 'id': self.ids[0], 'data': {'prioridad': 3}},
+            {'op': 'update', 'id': self.ids[1], 'data': {'subtasks': [1]}},
+            {'op': 'create', 'data': {'titulo': 'X', 'fecha_inicio': '2025-01-01', 'fecha_fin': '2025-01-01',
+                                      'tipo': ['diaria']}},
+            {'op': 'toggle', 'id': self.ids[2]}
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.get_json()['errors']
+        self.assertEqual([(error['index'], error['status']) for error in errors], [(0, 400), (1, 400), (2, 400)])
+
+    def test_duplicate_task_rejected(self):
+        """Test que una tarea no puede aparecer dos veces en el lote"""
+        response = self._batch([
+            {'op': 'toggle', 'id': self.ids[0]},
+            {'op': 'delete', 'id': self.ids[0]}
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['errors'][0]['index'], 1)
+
+    def test_empty_or_malformed_batch(self):
+        """Test 400 sin lista de operaciones"""
+        self.assertEqual(self._batch([]).status_code, 400)
+        self.assertEqual(self.app.post('/api/tasks/batch', json=[{'op': 'toggle'}]).status_code, 400)
+        self.assertEqual(self.app.post('/api/tasks/batch', data='x', content_type='text/plain').status_code, 400)
+
+    def test_batch_with_recurrence(self):
+        """Test que un alta periódica del lote crea su serie"""
+        response = self._batch([{'op': 'create', 'data': {
+            'titulo': 'Hábito', 'fecha_inicio': '2025-03-01', 'fecha_fin': '2025-03-01',
+            'recurrence': {'enabled': True, 'frequency': 'daily', 'endType': 'count', 'count': 5}
+        }}])
+        self.assertEqual(response.status_code, 200)
+        result = response.get_json()['results'][0]
+        self.assertEqual(result['count'], 5)
+        self.assertIsNotNone(result['task']['group_id'])
+
+    def test_single_commit(self):
+        """Test que todo el lote se confirma en una sola transacción"""
+        commits = []
+
+        def on_commit(conn):
+            commits.append(conn)
+
+        with self.app_instance.app_context():
+            engine = db.engine
+        event.listen(engine, 'commit', on_commit)
+        try:
+            response = self._batch(
+                [{'op': 'toggle', 'id': task_id} for task_id in self.ids] +
+                [{'op': 'create', 'data': {'titulo': f'N{i}', 'fecha_inicio': '2025-05-01',
+                                           'fecha_fin': '2025-05-01'}} for i in range(10)]
+            )
+        finally:
+            event.remove(engine, 'commit', on_commit)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(commits), 1)
+        self.assertTrue(all(result['task']['completada'] for result in response.get_json()['results'][:4]))
+
+
+class TestBulkCompletion(unittest.TestCase):
+    """Tests para PATCH /api/tasks/completion"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+            old = datetime(2020, 1, 1)
+            tasks = [
+                Task(titulo='Hoy', fecha_inicio=date(2025, 1, 10), fecha_fin=date(2025, 1, 10), updated_at=old),
+                Task(titulo='Semana', fecha_inicio=date(2025, 1, 6), fecha_fin=date(2025, 1, 12),
+                     prioridad='alta', updated_at=old),
+                Task(titulo='Hecha', fecha_inicio=date(2025, 1, 10), fecha_fin=date(2025, 1, 10),
+                     completada=True, updated_at=old),
+                Task(titulo='Mañana', fecha_inicio=date(2025, 1, 11), fecha_fin=date(2025, 1, 11), updated_at=old)
+            ]
+            db.session.add_all(tasks)
+            db.session.commit()
+            self.ids = [task.id for task in tasks]
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_complete_day(self):
+        """Test que se completan las tareas del día y solo se devuelven las que cambian"""
+        response = self.app.patch('/api/tasks/completion', json={'fecha': '2025-01-10'})
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['task_ids'], self.ids[:2])
+        self.assertEqual(data['count'], 2)
+        
+        with self.app_instance.app_context():
+            tasks = {task.id: task for task in Task.query.all()}
+            self.assertTrue(tasks[self.ids[0]].completada)
+            self.assertGreater(tasks[self.ids[0]].updated_at, datetime(2020, 1, 1))
+            # La ya completada no cambia ni su updated_at
+            self.assertEqual(tasks[self.ids[2]].updated_at, datetime(2020, 1, 1))
+            self.assertFalse(tasks[self.ids[3]].completada)
+
+    def test_complete_day_with_filter(self):
+        """Test que los filtros restringen las tareas del día"""
+        response = self.app.patch('/api/tasks/completion', json={'fecha': '2025-01-10', 'prioridad': 'alta'})
+        self.assertEqual(response.get_json()['task_ids'], [self.ids[1]])
+
+    def test_uncomplete_by_ids(self):
+        """Test completada=false con una lista de ids"""
+        response = self.app.patch('/api/tasks/completion', json={
+            'ids': [self.ids[2], self.ids[3], 9999], 'completada': False
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['task_ids'], [self.ids[2]])
+
+    def test_single_statement(self):
+        """Test que el cambio se hace con un solo UPDATE, sin SELECT previos"""
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.split()[0])
+
+        with self.app_instance.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            self.app.patch('/api/tasks/completion', json={'ids': self.ids})
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+        self.assertEqual(statements, ['UPDATE'])
+
+    def test_invalid_payloads(self):
+        """Test 400 con payloads inválidos"""
+        for payload in ({}, {'ids': [1], 'fecha': '2025-01-10'}, {'ids': []}, {'ids': ['1']},
+                        {'fecha': '10/01/2025'}, {'fecha': '2025-01-10', 'tipo': 'x'},
+                        {'ids': [1], 'completada': 'si'}):
+            with self.subTest(payload=payload):
+                response = self.app.patch('/api/tasks/completion', json=payload)
+                self.assertEqual(response.status_code, 400)
+
+
+class TestMutationResponses(unittest.TestCase):
+    """Tests para Prefer: return=minimal y la representación completa sin relecturas"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+        
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'Task',
+            'fecha_inicio': '2025-01-01',
+            'fecha_fin': '2025-01-02',
+            'hora': '10:30',
+            'subtasks': [{'titulo': 'A'}, {'titulo': 'B', 'completada': True}]
+        })
+        self.task = response.get_json()['task']
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _statements(self, request):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.split()[0])
+
+        with self.app_instance.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = request()
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+        return response, statements
+
+    def _stored(self, task_id):
+        return self.app.get(f'/api/tasks/{task_id}').get_json()['task']
+
+    def test_full_representation_matches_stored_task(self):
+        """Test que las respuestas completas coinciden con lo guardado"""
+        task_id = self.task['id']
+        self.assertEqual(self.task, self._stored(task_id))
+        
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'Serie', 'fecha_inicio': '2025-01-01', 'fecha_fin': '2025-01-01',
+            'subtasks': [{'titulo': 'Paso'}],
+            'recurrence': {'enabled': True, 'frequency': 'weekly', 'weekdays': ['WE', 'FR'],
+                           'endType': 'count', 'count': 4}
+        })
+        created = response.get_json()['task']
+        self.assertEqual(created, self._stored(created['id']))
+        
+        subtasks = self.task['subtasks']
+        response = self.app.put(f'/api/tasks/{task_id}', json={
+            'titulo': 'Editada', 'hora': '11:00',
+            'subtasks': [subtasks[1], {'titulo': 'C'}, dict(subtasks[0], completada=True)]
+        })
+        self.assertEqual(response.get_json()['task'], self._stored(task_id))
+        
+        response = self.app.put(f'/api/tasks/{task_id}', json={'fecha_fin': '2025-01-05'})
+        self.assertEqual(response.get_json()['task'], self._stored(task_id))
+        
+        response = self.app.patch(f'/api/tasks/{task_id}/toggle')
+        self.assertEqual(response.get_json()['task'], self._stored(task_id))
+
+    def test_no_reads_after_write(self):
+        """Test que la representación no vuelve a leer la tarea tras escribirla"""
+        task_id = self.task['id']
+        _, statements = self._statements(lambda: self.app.post('/api/tasks/', json={
+            'titulo': 'Nueva', 'fecha_inicio': '2025-01-01', 'fecha_fin': '2025-01-01',
+            'subtasks': [{'titulo': 'A'}]
+        }))
+        self.assertEqual(statements, ['INSERT', 'INSERT'])
+        
+        _, statements = self._statements(lambda: self.app.put(f'/api/tasks/{task_id}', json={'titulo': 'X'}))
+        self.assertEqual(statements, ['SELECT', 'UPDATE'])
+        
+        _, statements = self._statements(lambda: self.app.patch(f'/api/tasks/{task_id}/toggle'))
+        self.assertEqual(statements, ['UPDATE', 'SELECT'])
+
+    def test_return_minimal(self):
+        """Test que Prefer: return=minimal devuelve solo id y versión"""
+        headers = {'Prefer': 'return=minimal'}
+        task_id = self.task['id']
+        
+        response, statements = self._statements(
+            lambda: self.app.patch(f'/api/tasks/{task_id}/toggle', headers=headers)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(statements, ['UPDATE'])
+        self.assertEqual(response.headers['Preference-Applied'], 'return=minimal')
+        data = response.get_json()
+        self.assertEqual(set(data), {'id', 'version'})
+        self.assertEqual(data['id'], task_id)
+        # La versión es el ETag de la colección tras el cambio
+        self.assertEqual(f'"{data["version"]}"', self.app.get('/api/tasks/').headers['ETag'])
+        self.assertTrue(self._stored(task_id)['completada'])
+        
+        response = self.app.put(f'/api/tasks/{task_id}', json={'titulo': 'Mínima'}, headers=headers)
+        self.assertEqual(response.get_json()['id'], task_id)
+        self.assertEqual(self._stored(task_id)['titulo'], 'Mínima')
+        
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'Nueva', 'fecha_inicio': '2025-01-01', 'fecha_fin': '2025-01-01'
+        }, headers=headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self._stored(response.get_json()['id'])['titulo'], 'Nueva')
+
+    def test_toggle_not_found(self):
+        """Test 404 al alternar una tarea inexistente"""
+        response = self.app.patch('/api/tasks/9999/toggle', headers={'Prefer': 'return=minimal'})
+        self.assertEqual(response.status_code, 404)
+
+
 class TestCORS(unittest.TestCase):
     """Tests para CORS"""
     
@@ -5,7 +5,8 @@ Prueba CRUD de subtareas, toggle y operaciones relacionadas.
 import unittest
 import sys
 import os
-from datetime import date
+from datetime import date, datetime
+from sqlalchemy import event
 
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
@@ -254,6 +255,75 @@ class TestSubtasksUpdate(unittest.TestCase):
         self.assertEqual(len(task['subtasks']), 0)
 
 
+    def _create_with_subtasks(self, titles):
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'Task',
+            'fecha_inicio': date.today().isoformat(),
+            'fecha_fin': date.today().isoformat(),
+            'subtasks': [{'titulo': title} for title in titles]
+        })
+        return response.get_json()['task']
+
+    def test_update_task_keeps_subtask_ids(self):
+        """Test que las subtareas enviadas con id se actualizan en su sitio"""
+        task = self._create_with_subtasks(['A', 'B', 'C'])
+        a, b, c = task['subtasks']
+        
+        response = self.app.put(f"/api/tasks/{task['id']}", json={'subtasks': [
+            a,
+            dict(b, completada=True),
+            {'titulo': 'D'}
+        ]})
+        self.assertEqual(response.status_code, 200)
+        
+        subtasks = response.get_json()['task']['subtasks']
+        self.assertEqual([s['titulo'] for s in subtasks], ['A', 'B', 'D'])
+        self.assertEqual([s['id'] for s in subtasks[:2]], [a['id'], b['id']])
+        self.assertTrue(subtasks[1]['completada'])
+        self.assertNotIn(c['id'], [s['id'] for s in subtasks])
+
+    def test_update_task_only_writes_changes(self):
+        """Test que marcar una subtarea solo emite un UPDATE de subtareas"""
+        task = self._create_with_subtasks(['A', 'B', 'C'])
+        subtasks = task['subtasks']
+        subtasks[1]['completada'] = True
+        
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with self.app_instance.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = self.app.put(f"/api/tasks/{task['id']}", json={'subtasks': subtasks})
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+        self.assertEqual(response.status_code, 200)
+        
+        writes = [statement.split()[0] + ' ' + statement.split()[1] for statement in statements
+                  if not statement.startswith('SELECT')]
+        self.assertEqual(writes.count('UPDATE subtasks'), 1)
+        self.assertNotIn('DELETE FROM', writes)
+        self.assertNotIn('INSERT INTO', writes)
+
+    def test_update_task_foreign_subtask_id_is_new(self):
+        """Test que un id de subtarea de otra tarea se trata como subtarea nueva"""
+        other = self._create_with_subtasks(['Ajena'])
+        task = self._create_with_subtasks(['Propia'])
+        foreign = other['subtasks'][0]
+        
+        response = self.app.put(f"/api/tasks/{task['id']}", json={'subtasks': [foreign]})
+        subtasks = response.get_json()['task']['subtasks']
+        self.assertEqual([s['titulo'] for s in subtasks], ['Ajena'])
+        self.assertNotEqual(subtasks[0]['id'], foreign['id'])
+        
+        # La subtarea de la otra tarea no se toca
+        other = self.app.get(f"/api/tasks/{other['id']}").get_json()['task']
+        self.assertEqual([s['id'] for s in other['subtasks']], [foreign['id']])
+
+
 class TestSubtasksDelete(unittest.TestCase):
     """Tests para eliminación de subtareas (cascade)"""
     
@@ -397,5 +467,114 @@ class TestSubtasksRetrieval(unittest.TestCase):
         self.assertEqual(subtask['task_id'], task['id'])
 
 
+class TestSubtaskEndpoints(unittest.TestCase):
+    """Tests para los endpoints de subtareas sueltas (crear, editar, borrar, reordenar, completar)"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.app = self.app_instance.test_client()
+        
+        with self.app_instance.app_context():
+            db.create_all()
+        
+        response = self.app.post('/api/tasks/', json={
+            'titulo': 'Checklist',
+            'fecha_inicio': date.today().isoformat(),
+            'fecha_fin': date.today().isoformat(),
+            'subtasks': [{'titulo': 'A'}, {'titulo': 'B', 'completada': True}, {'titulo': 'C'}]
+        })
+        self.task = response.get_json()['task']
+        self.subtask_ids = [subtask['id'] for subtask in self.task['subtasks']]
+
+    def tearDown(self):
+        with self.app_instance.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _subtasks(self):
+        return self.app.get(f"/api/tasks/{self.task['id']}").get_json()['task']['subtasks']
+
+    def test_positions_follow_payload_order(self):
+        """Test que las subtareas creadas con la tarea guardan su posición"""
+        self.assertEqual([s['posicion'] for s in self.task['subtasks']], [0, 1, 2])
+
+    def test_create_subtask_appends(self):
+        """Test que POST añade la subtarea al final sin tocar las demás"""
+        response = self.app.post(f"/api/tasks/{self.task['id']}/subtasks", json={'titulo': ' D '})
+        self.assertEqual(response.status_code, 201)
+        subtask = response.get_json()['subtask']
+        self.assertEqual((subtask['titulo'], subtask['posicion'], subtask['completada']), ('D', 3, False))
+        self.assertEqual([s['id'] for s in self._subtasks()], self.subtask_ids + [subtask['id']])
+
+    def test_create_subtask_errors(self):
+        """Test 404 para una tarea inexistente y 400 sin título"""
+        self.assertEqual(self.app.post('/api/tasks/9999/subtasks', json={'titulo': 'X'}).status_code, 404)
+        self.assertEqual(self.app.post(f"/api/tasks/{self.task['id']}/subtasks", json={'titulo': ''}).status_code, 400)
+
+    def test_update_subtask(self):
+        """Test que PATCH cambia solo los campos enviados"""
+        url = f"/api/tasks/{self.task['id']}/subtasks/{self.subtask_ids[0]}"
+        response = self.app.patch(url, json={'completada': True})
+        self.assertEqual(response.status_code, 200)
+        subtask = response.get_json()['subtask']
+        self.assertEqual((subtask['titulo'], subtask['completada']), ('A', True))
+        
+        self.assertEqual(self.app.patch(url, json={}).status_code, 400)
+        self.assertEqual(self.app.patch(url, json={'completada': 'si'}).status_code, 400)
+        # Una subtarea de otra tarea no se encuentra
+        other = f"/api/tasks/9999/subtasks/{self.subtask_ids[0]}"
+        self.assertEqual(self.app.patch(other, json={'titulo': 'X'}).status_code, 404)
+
+    def test_update_subtask_marks_task_changed(self):
+        """Test que editar una subtarea actualiza updated_at de la tarea"""
+        with self.app_instance.app_context():
+            db.session.execute(db.update(Task).values(updated_at=datetime(2020, 1, 1)))
+            db.session.commit()
+        self.app.patch(f"/api/tasks/{self.task['id']}/subtasks/{self.subtask_ids[0]}", json={'titulo': 'Z'})
+        with self.app_instance.app_context():
+            self.assertGreater(db.session.get(Task, self.task['id']).updated_at, datetime(2020, 1, 1))
+
+    def test_delete_subtask(self):
+        """Test que DELETE elimina solo esa subtarea"""
+        url = f"/api/tasks/{self.task['id']}/subtasks/{self.subtask_ids[1]}"
+        self.assertEqual(self.app.delete(url).status_code, 200)
+        self.assertEqual([s['id'] for s in self._subtasks()], [self.subtask_ids[0], self.subtask_ids[2]])
+        self.assertEqual(self.app.delete(url).status_code, 404)
+
+    def test_set_completion(self):
+        """Test que completar todas solo devuelve las que cambian"""
+        url = f"/api/tasks/{self.task['id']}/subtasks/completion"
+        response = self.app.patch(url, json={'completada': True})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['subtask_ids'], [self.subtask_ids[0], self.subtask_ids[2]])
+        self.assertTrue(all(s['completada'] for s in self._subtasks()))
+        
+        self.assertEqual(self.app.patch(url, json={'completada': True}).get_json()['count'], 0)
+        self.assertEqual(self.app.patch('/api/tasks/9999/subtasks/completion', json={}).status_code, 404)
+
+    def test_reorder_subtasks(self):
+        """Test que reordenar solo actualiza las posiciones que cambian"""
+        a, b, c = self.subtask_ids
+        url = f"/api/tasks/{self.task['id']}/subtasks/order"
+        response = self.app.put(url, json={'ids': [c, b, a]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['count'], 2)
+        self.assertEqual([s['id'] for s in self._subtasks()], [c, b, a])
+        
+        self.assertEqual(self.app.put(url, json={'ids': [a, b]}).status_code, 400)
+        self.assertEqual(self.app.put(url, json={'ids': [a, a, b]}).status_code, 400)
+        self.assertEqual(self.app.put('/api/tasks/9999/subtasks/order', json={'ids': []}).status_code, 404)
+
+    def test_update_task_reorders_by_payload(self):
+        """Test que el orden de la lista de PUT /tasks/<id> se guarda como posición"""
+        a, b, c = self.task['subtasks']
+        response = self.app.put(f"/api/tasks/{self.task['id']}", json={'subtasks': [c, a, b]})
+        self.assertEqual([s['id'] for s in response.get_json()['task']['subtasks']], [c['id'], a['id'], b['id']])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,85 @@
+"""
+Tests para la lectura rápida de tareas (services/task_reader.py).
+Comprueba que la salida es idéntica a Task.to_dict() / Subtask.to_dict().
+"""
+import unittest
+import sys
+import os
+from datetime import date, time, datetime
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from app import create_app
+from database.db import db
+from models.task import Task
+from models.subtask import Subtask
+from services import task_reader
+
+
+class TestTaskReader(unittest.TestCase):
+    """Tests para task_reader frente a to_dict()"""
+    
+    def setUp(self):
+        self.app_instance = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+        self.ctx = self.app_instance.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        full = Task(
+            titulo='Full Task',
+            descripcion='Descripción con acentos y "comillas"',
+            fecha_inicio=date(2025, 1, 1),
+            fecha_fin=date(2025, 1, 7),
+            hora=time(10, 30, 15),
+            completada=True,
+            prioridad='alta',
+            tipo='semanal',
+            color='#ff5722',
+            group_id='abc-123'
+        )
+        full.subtasks = [Subtask(titulo='Sub 1'), Subtask(titulo='Sub 2', completada=True)]
+        minimal = Task(titulo='Minimal', fecha_inicio=date(2025, 2, 1), fecha_fin=date(2025, 2, 1),
+                       updated_at=datetime(2025, 2, 1, 8, 0, 0))
+        db.session.add_all([full, minimal])
+        db.session.commit()
+        db.session.expire_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _dumps(self, value):
+        return self.app_instance.json.dumps(value)
+
+    def test_output_is_identical_to_to_dict(self):
+        """Test que el JSON generado es byte a byte el de to_dict()"""
+        stmt = task_reader.select_tasks().order_by(Task.id)
+        _, items = task_reader.read_tasks(stmt)
+        expected = [task.to_dict() for task in Task.query.order_by(Task.id)]
+        self.assertEqual(self._dumps(items), self._dumps(expected))
+
+    def test_fields_subset_matches_to_dict(self):
+        """Test que con fields la salida coincide con to_dict(fields)"""
+        fields = ('id', 'titulo', 'hora', 'updated_at')
+        stmt = task_reader.select_tasks(fields, 'fecha_inicio').order_by(Task.id)
+        _, items = task_reader.read_tasks(stmt, fields, include_subtasks=False)
+        expected = [task.to_dict(fields, include_subtasks=False) for task in Task.query.order_by(Task.id)]
+        self.assertEqual(self._dumps(items), self._dumps(expected))
+
+    def test_stream_batches_match_read(self):
+        """Test que el generador por lotes produce las mismas filas"""
+        stmt = task_reader.select_tasks().order_by(Task.id)
+        _, items = task_reader.read_tasks(stmt)
+        batches = list(task_reader.stream_tasks(stmt, batch_size=1))
+        self.assertEqual(len(batches), 2)
+        self.assertEqual([item for batch in batches for item in batch], items)
+
+
+if __name__ == '__main__':
+    unittest.main()